@@ -34,6 +34,9 @@ watchlist_repo = WatchlistRepository()
 data_service = DataService(data_repo, watchlist_repo)
 watchlist_service = WatchlistService(watchlist_repo, data_repo)
 
+# Build the autocomplete index up front so the first keystroke doesn't pay for it
+data_service.search_index.refresh()
+
 api_controller = ApiController(data_service, watchlist_service)
 
 # API Routes
@@ -44,8 +47,17 @@ def search_ticker(query):
 
 @app.route('/api/search_suggestions/<query>')
 def search_suggestions(query):
-    """API endpoint to get search suggestions."""
-    return api_controller.get_search_suggestions(query)
+    """
+    API endpoint to get search suggestions.
+
+    Query parameters: mode ('prefix' or 'fulltext'), sector, industry.
+    """
+    return api_controller.get_search_suggestions(
+        query,
+        mode=request.args.get('mode', 'prefix'),
+        sector=request.args.get('sector'),
+        industry=request.args.get('industry')
+    )
 
 @app.route('/api/metrics/<ticker>')
 def get_metrics_api(ticker):
@@ -67,6 +79,11 @@ def get_watchlist_api():
     """Get all tickers in watchlist."""
     return api_controller.get_watchlist()
 
+@app.route('/api/watchlist/schedule_missing', methods=['POST'])
+def schedule_missing_watchlist_data_api():
+    """Queue background fetches for missing watchlist data."""
+    return api_controller.schedule_missing_watchlist_data()
+
 @app.route('/api/watchlist/add/<ticker>', methods=['POST'])
 def add_to_watchlist_api(ticker):
     """Add a ticker to the watchlist."""
@@ -102,6 +119,22 @@ def calculate_missing_adjusted_pe_api():
     """Calculate missing adjusted PE data for all watchlist stocks."""
     return api_controller.calculate_missing_adjusted_pe()
 
+@app.route('/api/jobs', methods=['GET'])
+def get_jobs_api():
+    """Inspect queued and running background jobs."""
+    return api_controller.get_job_status()
+
+@app.route('/api/finviz/<ticker>', methods=['GET'])
+def get_finviz_snapshot_api(ticker):
+    """Get every Finviz snapshot field for a ticker, scraping only if the stored snapshot is stale."""
+    refresh = request.args.get('refresh', '').lower() in ('1', 'true', 'yes')
+    return api_controller.get_finviz_snapshot(ticker, refresh=refresh)
+
+@app.route('/api/cache_stats', methods=['GET'])
+def get_cache_stats_api():
+    """Inspect hit/miss statistics of the per-ticker record cache."""
+    return api_controller.get_cache_stats()
+
 # Serve React App
 @app.route('/')
 def serve_home():
@@ -16,6 +16,9 @@ from services.data_service import DataService
 from services.watchlist_service import WatchlistService
 from services.peers_service import PeersService
 from services.adjusted_pe_service import AdjustedPEService
+from services.job_executor import get_job_executor, PRIORITY_HIGH
+from services.finviz_snapshot_service import get_finviz_snapshot_service
+from utils.scrapers.scrape_engine import get_scrape_engine
 from repositories.peers_repository import PeersRepository
 from repositories.data_repository import DataRepository
 from repositories.adjusted_pe_repository import AdjustedPERepository
@@ -33,8 +36,8 @@ class ApiController:
         data_repo = DataRepository()
         self.peers_service = PeersService(peers_repo, data_repo)
 
-        # Track ongoing peer finding operations to prevent duplicate requests
-        self.ongoing_peer_finding = set()
+        # Background peer finding runs on the shared executor, which dedups by ticker
+        self.executor = get_job_executor()
 
     def search_ticker(self, query: str):
         """Handle ticker search requests."""
@@ -42,9 +45,9 @@ class ApiController:
         status_code = 404 if not result['success'] else 200
         return jsonify(result), status_code
 
-    def get_search_suggestions(self, query: str):
+    def get_search_suggestions(self, query: str, mode: str = 'prefix', sector: str = None, industry: str = None):
         """Handle search suggestions requests."""
-        result = self.data_service.get_search_suggestions(query)
+        result = self.data_service.get_search_suggestions(query, mode=mode, sector=sector, industry=industry)
         status_code = 400 if not result['success'] else 200
         return jsonify(result), status_code
 
@@ -68,6 +71,14 @@ class ApiController:
         except Exception as e:
             return jsonify({'success': False, 'message': str(e)}), 500
 
+    def schedule_missing_watchlist_data(self):
+        """Handle requests to queue fetches for missing watchlist data."""
+        try:
+            result = self.watchlist_service.schedule_missing()
+            return jsonify(result)
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
     def add_to_watchlist(self, ticker: str):
         """Handle add to watchlist requests."""
         try:
@@ -156,7 +167,7 @@ class ApiController:
 
         # If no peers found, automatically trigger peer finding (but only once per ticker)
         if not result['success'] and 'No peer analysis found' in result.get('message', ''):
-            if ticker.upper() in self.ongoing_peer_finding:
+            if self.executor.is_active('peers', ticker):
                 # Peer finding already in progress for this ticker
                 print(f"Peer finding already in progress for {ticker}")
                 return jsonify({
@@ -175,25 +186,18 @@ class ApiController:
                 }), 202
 
             print(f"No existing peers found for {ticker}, triggering automatic peer finding...")
-            # Mark peer finding as in progress
-            self.ongoing_peer_finding.add(ticker.upper())
 
             # Trigger peer finding in background
             try:
-                import threading
                 def find_peers_background():
                     try:
                         self.peers_service.find_peers(ticker)
                         print(f"Background peer finding completed for {ticker}")
                     except Exception as e:
                         print(f"Background peer finding failed for {ticker}: {e}")
-                    finally:
-                        # Remove from ongoing set regardless of success/failure
-                        self.ongoing_peer_finding.discard(ticker.upper())
 
-                # Start background peer finding
-                thread = threading.Thread(target=find_peers_background, daemon=True)
-                thread.start()
+                # Queue background peer finding
+                self.executor.submit('peers', ticker, find_peers_background, priority=PRIORITY_HIGH)
 
                 # Return a "finding peers" response
                 return jsonify({
@@ -213,8 +217,6 @@ class ApiController:
 
             except Exception as e:
                 print(f"Failed to start background peer finding: {e}")
-                # Remove from ongoing set if thread creation failed
-                self.ongoing_peer_finding.discard(ticker.upper())
                 return jsonify({
                     'success': False,
                     'message': f'Failed to find peers: {str(e)}'
@@ -241,3 +243,36 @@ class ApiController:
 
         except Exception as e:
             return jsonify({'success': False, 'message': str(e)}), 500
+
+    def get_job_status(self):
+        """Handle request to inspect background jobs."""
+        try:
+            return jsonify({
+                'success': True,
+                'pools': self.executor.get_status(),
+                'jobs': self.executor.list_jobs(),
+                'leases': self.executor.list_leases()
+            }), 200
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    def get_finviz_snapshot(self, ticker: str, refresh: bool = False):
+        """Handle requests for a ticker's stored Finviz snapshot fields."""
+        try:
+            service = get_finviz_snapshot_service(self.data_service.data_repo.db_path)
+            result = service.get_snapshot_data(ticker, refresh=refresh)
+            status_code = 404 if not result['success'] else 200
+            return jsonify(result), status_code
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    def get_cache_stats(self):
+        """Handle request to inspect the per-ticker record cache and the scrapers' HTTP cache."""
+        try:
+            return jsonify({
+                'success': True,
+                'record_cache': self.data_service.data_repo.get_cache_stats(),
+                'http_cache': get_scrape_engine().get_stats().get('cache')
+            }), 200
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
@@ -0,0 +1,402 @@
+"""
+Memory-mapped columnar cache of the quarterly fundamentals.
+
+The JSONL fundamentals files are compiled once into a directory of .npy files:
+one float64 array (stocks x quarters) per field with a matching presence mask,
+a symbol index and a period-date table. Opening the cache maps the arrays
+read-only, so score calculations, backtests and lookups skip JSON parsing and
+only touch the pages they read.
+
+Layout:
+    <cache_dir>/manifest.json       - format version, current build, source file
+                                      fingerprints, fields and counts
+    <cache_dir>/<build>/*.npy       - arrays of one build
+
+A rebuild writes a new build directory and then replaces the manifest, so
+readers never see a half-written cache and keep working with the files they
+already mapped.
+"""
+import hashlib
+import json
+import math
+import os
+import shutil
+import uuid
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .vectorized_metrics import FIELDS, QuarterlyPanel, _to_row
+except ImportError:
+    from vectorized_metrics import FIELDS, QuarterlyPanel, _to_row
+
+CACHE_VERSION = 2
+MANIFEST_FILE = "manifest.json"
+
+# Stored in place of a field length when a stock has no list for the field:
+# NOT_A_LIST for a truthy non-list value, MISSING when absent, null or empty-ish
+NOT_A_LIST = -1
+MISSING = -2
+
+
+def fingerprint_file(filename: str) -> Dict:
+    """Size, mtime and SHA-256 of a source file (all None if it doesn't exist)."""
+    if not os.path.exists(filename):
+        return {"path": os.path.abspath(filename), "size": None, "mtime_ns": None, "sha256": None}
+    stat = os.stat(filename)
+    return {
+        "path": os.path.abspath(filename),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": _hash_file(filename),
+    }
+
+
+def _hash_file(filename: str) -> str:
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_is_unchanged(source: Dict) -> bool:
+    """Compare a recorded fingerprint with the file on disk; the hash settles mtime-only changes."""
+    path = source["path"]
+    if not os.path.exists(path):
+        return source["size"] is None
+    stat = os.stat(path)
+    if stat.st_size != source["size"]:
+        return False
+    if stat.st_mtime_ns == source["mtime_ns"]:
+        return True
+    return _hash_file(path) == source["sha256"]
+
+
+def write_cache(cache_dir: str, stocks: Iterable[Tuple[Dict, str]], sources: List[str],
+                get_period_dates: Callable[[Dict], Optional[List]],
+                fields: Optional[Iterable[str]] = None) -> "ColumnarCache":
+    """
+    Compile (stock_data, exchange) pairs into a columnar cache.
+
+    Args:
+        cache_dir: Directory holding the cache
+        stocks: Stocks to store, in order
+        sources: Files the stocks come from, fingerprinted for freshness checks.
+                 They are fingerprinted before reading so a concurrent edit marks
+                 the cache stale rather than being missed.
+        get_period_dates: Extracts the period date list from a stock's "data"
+        fields: Data fields to store (None stores every list-valued field)
+
+    Returns:
+        The freshly written cache, opened
+    """
+    fingerprints = [fingerprint_file(filename) for filename in sources]
+    wanted = None if fields is None else list(dict.fromkeys(fields))
+
+    symbols, company_names, exchanges, market_caps, period_dates, has_data = [], [], [], [], [], []
+    market_cap_is_int = []
+    rows: List[Dict[str, object]] = []
+    found_fields = {}
+    for stock_data, exchange in stocks:
+        symbol = stock_data.get("symbol")
+        company_name = stock_data.get("company_name", symbol)
+        symbols.append("" if symbol is None else str(symbol))
+        company_names.append("" if company_name is None else str(company_name))
+        exchanges.append(exchange)
+
+        data = stock_data.get("data") if "data" in stock_data else None
+        has_data.append(isinstance(data, dict))
+        if not isinstance(data, dict):
+            data = {}
+        dates = get_period_dates(data)
+        period_dates.append([str(d) for d in dates] if isinstance(dates, list) else [])
+        market_cap, is_int = _latest_market_cap(data)
+        market_caps.append(market_cap)
+        market_cap_is_int.append(is_int)
+
+        row = {}
+        for field in (data if wanted is None else wanted):
+            value = data.get(field)
+            if isinstance(value, list):
+                row[field] = _to_row(value) if value else (np.zeros(0), None)
+                found_fields[field] = True
+            elif value:
+                # Truthy non-list values are invalid series; remember them as such
+                row[field] = NOT_A_LIST
+        rows.append(row)
+
+    stored_fields = wanted if wanted is not None else sorted(found_fields)
+    n = len(rows)
+    lengths = np.full((n, len(stored_fields)), MISSING, dtype=np.int64)
+    for i, row in enumerate(rows):
+        for k, field in enumerate(stored_fields):
+            entry = row.get(field)
+            if entry is NOT_A_LIST:
+                lengths[i, k] = NOT_A_LIST
+            elif entry is not None:
+                lengths[i, k] = len(entry[0])
+    period_counts = np.array([len(p) for p in period_dates], dtype=np.int64)
+    width = max(1, int(period_counts.max(initial=0)), int(lengths.max(initial=0)))
+
+    build = uuid.uuid4().hex[:12]
+    build_dir = os.path.join(cache_dir, build)
+    os.makedirs(build_dir)
+    try:
+        _save(build_dir, "symbols", np.array(symbols, dtype=np.str_).reshape(n))
+        _save(build_dir, "symbol_index", np.argsort(np.array(symbols, dtype=np.str_).reshape(n), kind="stable"))
+        _save(build_dir, "company_names", np.array(company_names, dtype=np.str_).reshape(n))
+        _save(build_dir, "exchanges", np.array(exchanges, dtype=np.str_).reshape(n))
+        _save(build_dir, "market_cap", np.array(market_caps, dtype=np.float64).reshape(n))
+        _save(build_dir, "market_cap_is_int", np.array(market_cap_is_int, dtype=bool).reshape(n))
+        _save(build_dir, "has_data", np.array(has_data, dtype=bool).reshape(n))
+        _save(build_dir, "period_counts", period_counts)
+        _save(build_dir, "lengths", lengths)
+
+        dates_width = max([1] + [len(d) for p in period_dates for d in p])
+        table = np.zeros((n, width), dtype=f"<U{dates_width}")
+        for i, dates in enumerate(period_dates):
+            table[i, :len(dates)] = dates
+        _save(build_dir, "period_dates", table)
+
+        for k, field in enumerate(stored_fields):
+            values = np.zeros((n, width), dtype=np.float64)
+            present = np.zeros((n, width), dtype=bool)
+            for i, row in enumerate(rows):
+                entry = row.get(field)
+                if entry is None or entry is NOT_A_LIST or not len(entry[0]):
+                    continue
+                row_values, row_present = entry
+                values[i, :len(row_values)] = row_values
+                present[i, :len(row_values)] = True if row_present is None else row_present
+            _save(build_dir, f"field_{k}", values)
+            _save(build_dir, f"present_{k}", present)
+    except Exception:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+
+    counts: Dict[str, int] = {}
+    for exchange in exchanges:
+        counts[exchange] = counts.get(exchange, 0) + 1
+    manifest = {
+        "version": CACHE_VERSION,
+        "build": build,
+        "sources": fingerprints,
+        "fields": stored_fields,
+        "all_fields": wanted is None,
+        "stocks": n,
+        "width": width,
+        "counts": counts,
+    }
+    previous = _read_manifest(cache_dir)
+    tmp_path = os.path.join(cache_dir, f"{MANIFEST_FILE}.{build}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(cache_dir, MANIFEST_FILE))
+
+    # Open mappings of the old build stay valid after unlinking on POSIX
+    if previous and previous.get("build") and previous["build"] != build:
+        shutil.rmtree(os.path.join(cache_dir, previous["build"]), ignore_errors=True)
+
+    return ColumnarCache(cache_dir, manifest)
+
+
+def _latest_market_cap(data: Dict) -> Tuple[float, bool]:
+    """
+    Most recent non-null market cap like _new_stock_entry picks it, NaN if none,
+    and whether the source value was an integer.
+    """
+    market_caps = data.get("market_cap", [])
+    if isinstance(market_caps, list):
+        for value in reversed(market_caps):
+            if value is not None:
+                try:
+                    return float(value), isinstance(value, int) and not isinstance(value, bool)
+                except (TypeError, ValueError, OverflowError):
+                    return float("nan"), False
+    return float("nan"), False
+
+
+def _save(build_dir: str, name: str, array: np.ndarray) -> None:
+    np.save(os.path.join(build_dir, f"{name}.npy"), array, allow_pickle=False)
+
+
+def _read_manifest(cache_dir: str) -> Optional[Dict]:
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class ColumnarCache:
+    """
+    Read-only view of a compiled cache.
+
+    Arrays are memory-mapped on first use. Missing text values (symbol, company
+    name) are stored as empty strings and read back as None; a missing market cap
+    is NaN. Series values are float64, so integers read back as floats, and
+    records without a "data" dictionary read back without one.
+    """
+
+    def __init__(self, cache_dir: str, manifest: Dict):
+        self.cache_dir = cache_dir
+        self.manifest = manifest
+        self.build_dir = os.path.join(cache_dir, manifest["build"])
+        self.fields: List[str] = list(manifest["fields"])
+        self._field_index = {field: k for k, field in enumerate(self.fields)}
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def open(cls, cache_dir: str) -> Optional["ColumnarCache"]:
+        """Open the cache in cache_dir, or return None if there is no usable cache."""
+        manifest = _read_manifest(cache_dir)
+        if not manifest or manifest.get("version") != CACHE_VERSION:
+            return None
+        if not os.path.isdir(os.path.join(cache_dir, manifest.get("build", ""))):
+            return None
+        return cls(cache_dir, manifest)
+
+    def __len__(self) -> int:
+        return self.manifest["stocks"]
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        """Number of stocks per exchange."""
+        return dict(self.manifest.get("counts", {}))
+
+    def is_fresh(self, sources: Optional[List[str]] = None, fields: Iterable[str] = (),
+                 all_fields: bool = False) -> bool:
+        """
+        Check that the cache still matches its source files.
+
+        Args:
+            sources: Files the cache must have been compiled from (default: the recorded ones)
+            fields: Data fields the caller needs
+            all_fields: Whether the caller needs every field of the source records
+        """
+        recorded = self.manifest["sources"]
+        if sources is not None and [os.path.abspath(s) for s in sources] != [s["path"] for s in recorded]:
+            return False
+        if not self.manifest.get("all_fields"):
+            if all_fields or not set(fields) <= set(self.fields):
+                return False
+        return all(_source_is_unchanged(source) for source in recorded)
+
+    def array(self, name: str) -> np.ndarray:
+        """Memory-map one of the cache arrays (read-only)."""
+        array = self._arrays.get(name)
+        if array is None:
+            array = np.load(os.path.join(self.build_dir, f"{name}.npy"), mmap_mode='r', allow_pickle=False)
+            self._arrays[name] = array
+        return array
+
+    def values(self, field: str) -> np.ndarray:
+        """Stocks x quarters values of a field (0.0 where missing)."""
+        return self.array(f"field_{self._field_index[field]}")
+
+    def present(self, field: str) -> np.ndarray:
+        """Stocks x quarters mask, True where a field has a value."""
+        return self.array(f"present_{self._field_index[field]}")
+
+    def find(self, symbol: str) -> Optional[int]:
+        """Row of a symbol via binary search over the symbol index, or None."""
+        symbols = self.array("symbols")
+        order = self.array("symbol_index")
+        if not len(order):
+            return None
+        position = int(np.searchsorted(symbols[order], symbol))
+        if position < len(order) and symbols[order[position]] == symbol:
+            return int(order[position])
+        return None
+
+    def get_stock(self, i: int) -> Dict:
+        """Rebuild the stock record of row i from the stored fields."""
+        symbol = str(self.array("symbols")[i]) or None
+        company_name = str(self.array("company_names")[i]) or None
+        if not self.array("has_data")[i]:
+            return {"symbol": symbol, "company_name": company_name}
+        count = int(self.array("period_counts")[i])
+        data = {"period_end_date": [str(d) for d in self.array("period_dates")[i, :count]]}
+
+        lengths = self.array("lengths")[i]
+        for k, field in enumerate(self.fields):
+            length = int(lengths[k])
+            if length == MISSING:
+                continue
+            if length == NOT_A_LIST:
+                # The original value is gone; any truthy non-list is rejected the same way
+                data[field] = True
+                continue
+            row_values = self.values(field)[i, :length]
+            row_present = self.present(field)[i, :length]
+            data[field] = [float(v) if p else None for v, p in zip(row_values, row_present)]
+
+        # The score entry takes the latest market cap; keep its source type, and
+        # keep it at all when the full series isn't stored
+        market_cap = self.market_cap(i)
+        if market_cap is not None:
+            series = data.get("market_cap")
+            if isinstance(series, list) and any(v is not None for v in series):
+                latest = max(j for j, v in enumerate(series) if v is not None)
+                series[latest] = market_cap
+            elif "market_cap" not in data:
+                data["market_cap"] = [market_cap]
+
+        return {"symbol": symbol, "company_name": company_name, "data": data}
+
+    def market_cap(self, i: int):
+        """Latest market cap of row i as an int or float like the source value, None if missing."""
+        value = float(self.array("market_cap")[i])
+        if math.isnan(value):
+            return None
+        return int(value) if self.array("market_cap_is_int")[i] else value
+
+    def market_caps(self) -> List:
+        """Latest market cap of every row, as returned by market_cap()."""
+        values = self.array("market_cap").tolist()
+        is_int = self.array("market_cap_is_int").tolist()
+        return [None if math.isnan(v) else (int(v) if as_int else v) for v, as_int in zip(values, is_int)]
+
+    def lookup(self, symbol: str) -> Optional[Dict]:
+        """Get the stock record for a symbol, or None if it isn't cached."""
+        i = self.find(symbol)
+        return None if i is None else self.get_stock(i)
+
+    def iter_stocks(self) -> Iterator[Tuple[Dict, str]]:
+        """Yield (stock_data, exchange) for every row, in compile order."""
+        exchanges = self.array("exchanges")
+        for i in range(len(self)):
+            yield self.get_stock(i), str(exchanges[i])
+
+    def to_panel(self) -> QuarterlyPanel:
+        """Build a QuarterlyPanel over the mapped arrays for the vectorized metrics."""
+        n, width = len(self), self.manifest["width"]
+        values, present = {}, {}
+        for field in FIELDS:
+            if field == "cost_of_goods_sold":
+                values[field], present[field] = self._cogs_columns()
+            elif field in self._field_index:
+                values[field], present[field] = self.values(field), self.present(field)
+            else:
+                values[field] = np.zeros((n, width))
+                present[field] = np.zeros((n, width), dtype=bool)
+        return QuarterlyPanel.from_arrays(self.array("period_dates"), self.array("period_counts"), values, present)
+
+    def _cogs_columns(self) -> Tuple[np.ndarray, np.ndarray]:
+        """COGS with the same fallback as _calc_gross_margin: "cogs" when "cost_of_goods_sold" is empty."""
+        n, width = len(self), self.manifest["width"]
+        columns = []
+        for field in ("cost_of_goods_sold", "cogs"):
+            if field in self._field_index:
+                columns.append((self.values(field), self.present(field),
+                                self.array("lengths")[:, self._field_index[field]]))
+            else:
+                columns.append((np.zeros((n, width)), np.zeros((n, width), dtype=bool),
+                                np.full(n, MISSING, dtype=np.int64)))
+        (primary_values, primary_present, primary_lengths), (fallback_values, fallback_present, _) = columns
+        # A non-empty list or any truthy non-list wins, as with `or`
+        use_primary = ((primary_lengths > 0) | (primary_lengths == NOT_A_LIST))[:, None]
+        return (np.where(use_primary, primary_values, fallback_values),
+                np.where(use_primary, primary_present, fallback_present))
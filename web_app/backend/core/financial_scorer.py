@@ -4,16 +4,41 @@ Uses a metric-based architecture that makes it easy to add new metrics.
 
 Usage:
     python scorer.py calc              - Calculate and save scores for all stocks
+    python scorer.py calc [W]          - Calculate using W worker processes (0 = one per CPU core)
+    python scorer.py calc [W] inc      - Only recompute metrics for stocks whose data changed
+    python scorer.py compile           - Rebuild the columnar cache of the JSONL files used by calc
+    python scorer.py publish           - Write scores.json into the web app's financial_scores table
     python scorer.py <symbol>         - Look up percentile rank for a specific stock (e.g., AAPL)
     python scorer.py view [N]         - View all stocks ranked by percentile (optionally show top N)
     python scorer.py view [N] over [X] - View top N stocks with market cap over X billion (e.g., view 50 over 10)
 """
+import hashlib
 import json
 import math
 import os
+import pickle
+import sqlite3
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Callable, Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Scoring engine used by calculate_scores_for_all_stocks: "numpy" computes every
+# metric with whole-array operations (see vectorized_metrics.py), "python" runs
+# each calculator stock by stock. Both give identical results.
+try:
+    import numpy  # noqa: F401
+    DEFAULT_ENGINE = "numpy"
+except ImportError:
+    DEFAULT_ENGINE = "python"
+
+# Faster JSON decoder for the fundamentals files, used when installed
+try:
+    import orjson
+    _fast_json_loads = orjson.loads
+except ImportError:
+    _fast_json_loads = None
 
 # ============================================================================
 # METRIC DEFINITIONS
@@ -29,11 +54,15 @@ class MetricConfig:
     calculator: Callable[[Dict], Optional[Tuple[str, str, float, str]]]  # Function that calculates the metric
     sort_descending: bool = True  # True if higher values are better, False if lower values are better
     include_in_total: bool = True  # Whether to include in total percentile calculation
+    fields: Tuple[str, ...] = ()  # Data fields the calculator reads (empty = unknown, load every field)
+
+# Keys that may hold the period dates, in order of preference
+PERIOD_DATE_KEYS = ("period_end_date", "fiscal_quarter_key", "original_filing_date")
 
 # Helper function to extract period dates from stock data
 def _get_period_dates(data: Dict) -> Optional[List]:
     """Extract period dates from data dictionary"""
-    for date_key in ["period_end_date", "fiscal_quarter_key", "original_filing_date"]:
+    for date_key in PERIOD_DATE_KEYS:
         if date_key in data and data[date_key]:
             return data[date_key]
     return None
@@ -434,7 +463,8 @@ METRICS: List[MetricConfig] = [
         description="EBIT/PPE = Operating Income / PPE (most recent quarter)",
         calculator=_calc_ebit_ppe,
         sort_descending=True,
-        include_in_total=True
+        include_in_total=True,
+        fields=("operating_income", "ppe_net")
     ),
     MetricConfig(
         key="gross_margin",
@@ -442,7 +472,8 @@ METRICS: List[MetricConfig] = [
         description="Gross Margin = (Revenue - Cost of Goods Sold) / Revenue (most recent quarter)",
         calculator=_calc_gross_margin,
         sort_descending=True,
-        include_in_total=True
+        include_in_total=True,
+        fields=("revenue", "cost_of_goods_sold", "cogs")
     ),
     MetricConfig(
         key="operating_margin",
@@ -450,7 +481,8 @@ METRICS: List[MetricConfig] = [
         description="Operating Margin = Operating Income / Revenue (most recent quarter)",
         calculator=_calc_operating_margin,
         sort_descending=True,
-        include_in_total=True
+        include_in_total=True,
+        fields=("operating_income", "revenue")
     ),
     MetricConfig(
         key="revenue_growth",
@@ -458,7 +490,8 @@ METRICS: List[MetricConfig] = [
         description="Revenue Growth = (Sum of last 10 quarters revenue) / (Sum of first 10 quarters revenue) over 20 quarters (5 years)",
         calculator=_calc_revenue_growth,
         sort_descending=True,
-        include_in_total=True
+        include_in_total=True,
+        fields=("revenue",)
     ),
     MetricConfig(
         key="growth_consistency",
@@ -466,7 +499,8 @@ METRICS: List[MetricConfig] = [
         description="Growth Consistency = Standard deviation of year-over-year revenue growth rates over 20 quarters (5 years). Lower is better (more consistent).",
         calculator=_calc_growth_consistency,
         sort_descending=False,  # Lower stdev is better
-        include_in_total=True
+        include_in_total=True,
+        fields=("revenue",)
     ),
     MetricConfig(
         key="operating_margin_growth",
@@ -474,7 +508,8 @@ METRICS: List[MetricConfig] = [
         description="Operating Margin Growth = (Operating Margin of last 10 quarters) / (Operating Margin of first 10 quarters) over 20 quarters (5 years). Operating Margin = Total Operating Income / Total Revenue for each 10-quarter period.",
         calculator=_calc_operating_margin_growth,
         sort_descending=True,
-        include_in_total=True
+        include_in_total=True,
+        fields=("operating_income", "revenue")
     ),
     MetricConfig(
         key="operating_margin_consistency",
@@ -482,7 +517,8 @@ METRICS: List[MetricConfig] = [
         description="Operating Margin Consistency = Standard deviation of operating margins over 20 quarters (5 years). Lower is better (more consistent).",
         calculator=_calc_operating_margin_consistency,
         sort_descending=False,  # Lower stdev is better
-        include_in_total=True
+        include_in_total=True,
+        fields=("operating_income", "revenue")
     ),
     MetricConfig(
         key="net_debt_to_ttm_operating_income",
@@ -490,38 +526,109 @@ METRICS: List[MetricConfig] = [
         description="Net Debt to TTM Operating Income = Net Debt / (Sum of Operating Income for last 4 quarters). Lower is better. Edge cases: negative net debt set to 0, negative operating income set to 1000, both negative set to 0.",
         calculator=_calc_net_debt_to_ttm_operating_income,
         sort_descending=False,  # Lower debt is better
-        include_in_total=True
+        include_in_total=True,
+        fields=("net_debt", "operating_income")
     ),
 ]
 
+# How equal metric values are ranked: "ordinal" gives tied stocks consecutive
+# ranks in input order, "average" gives each of them the mean of those ranks
+RANK_TIES = "ordinal"
+RANK_TIE_MODES = ("ordinal", "average")
+
+# Stocks sent to a worker process per task in parallel mode
+PARALLEL_CHUNK_SIZE = 250
+
+# Directory of the memory-mapped columnar cache compiled from the JSONL files
+# (see columnar_cache.py)
+COLUMNAR_CACHE_DIR = "fundamentals_cache"
+
+# Per-stock metric values kept between runs for incremental re-scoring
+METRIC_CACHE_FILE = "metric_cache.json"
+
+# Bump when a built-in calculator changes so cached metric values are recomputed
+METRIC_CACHE_VERSION = 1
+
+# Built-in calculators that have a vectorized counterpart, keyed by the calculator
+# so a metric whose calculator is replaced falls back to the per-stock path
+_VECTORIZED_CALCULATOR_KEYS = {m.calculator: m.key for m in METRICS}
+
 # ============================================================================
 # CORE FUNCTIONS
 # ============================================================================
 
-def load_data_from_jsonl(filename: str) -> List[Dict]:
+def get_required_fields() -> Optional[List[str]]:
+    """Data fields the registered METRICS read, or None if any metric doesn't declare its fields"""
+    fields = set(PERIOD_DATE_KEYS) | {"market_cap"}
+    for metric in METRICS:
+        if not metric.fields:
+            return None
+        fields.update(metric.fields)
+    return sorted(fields)
+
+def _decode_json_line(line: bytes, fast_json: bool = True):
+    """Decode one JSONL line, preferring the fast decoder when installed"""
+    if fast_json and _fast_json_loads is not None:
+        try:
+            return _fast_json_loads(line)
+        except ValueError:
+            pass  # e.g. NaN literals or huge integers, which the standard decoder accepts
+    return json.loads(line)
+
+def _trim_stock_data(stock, fields: Optional[Iterable[str]]):
+    """Keep only the given fields in a stock's "data" dictionary"""
+    if fields is None or not isinstance(stock, dict) or not isinstance(stock.get("data"), dict):
+        return stock
+    data = stock["data"]
+    trimmed = dict(stock)
+    trimmed["data"] = {key: data[key] for key in fields if key in data}
+    return trimmed
+
+def _read_jsonl(filename: str, fields: Optional[Iterable[str]] = None, fast_json: bool = True) -> Iterator[Dict]:
+    """Yield stocks from a JSONL file, skipping invalid lines; read errors propagate"""
+    with open(filename, 'rb') as f:
+        for line_num, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                stock = _decode_json_line(line, fast_json)
+            except ValueError as e:
+                print(f"Warning: Skipping invalid JSON on line {line_num} in {filename}: {e}")
+                continue
+            yield _trim_stock_data(stock, fields)
+
+def iter_stocks_from_jsonl(filename: str, fields: Optional[Iterable[str]] = None,
+                           fast_json: bool = True) -> Iterator[Dict]:
+    """
+    Stream stocks from a JSONL file one at a time.
+    
+    Args:
+        filename: Path to the JSONL file
+        fields: Keep only these keys of each stock's "data" (None keeps everything);
+                get_required_fields() gives the ones the registered METRICS need
+        fast_json: Use orjson when it is installed
+    """
+    if not os.path.exists(filename):
+        print(f"Warning: {filename} not found")
+        return
+    
+    try:
+        yield from _read_jsonl(filename, fields, fast_json)
+    except Exception as e:
+        print(f"Error reading {filename}: {e}")
+
+def load_data_from_jsonl(filename: str, fields: Optional[Iterable[str]] = None) -> List[Dict]:
     """Load stock data from JSONL file"""
     if not os.path.exists(filename):
         print(f"Warning: {filename} not found")
         return []
     
-    stocks = []
     try:
-        with open(filename, 'r') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    stock = json.loads(line)
-                    stocks.append(stock)
-                except json.JSONDecodeError as e:
-                    print(f"Warning: Skipping invalid JSON on line {line_num} in {filename}: {e}")
-                    continue
+        return list(_read_jsonl(filename, fields))
     except Exception as e:
         print(f"Error reading {filename}: {e}")
         return []
-    
-    return stocks
 
 def calculate_percentile(rank: int, total: int) -> float:
     """Calculate percentile rank (0-100) for a given rank"""
@@ -531,35 +638,268 @@ def calculate_percentile(rank: int, total: int) -> float:
         return 100.0
     return (total - rank + 1) / total * 100.0
 
-def calculate_scores_for_all_stocks(nyse_stocks: List[Dict], nasdaq_stocks: List[Dict]) -> List[Dict]:
-    """Calculate all metrics and percentiles for all stocks"""
-    all_stock_data = []
+def calculate_scores_for_all_stocks(nyse_stocks: List[Dict], nasdaq_stocks: List[Dict],
+                                    engine: str = DEFAULT_ENGINE, ties: str = RANK_TIES,
+                                    workers: int = 1, chunk_size: int = PARALLEL_CHUNK_SIZE,
+                                    metric_cache: Optional["MetricValueCache"] = None) -> List[Dict]:
+    """
+    Calculate all metrics and percentiles for all stocks.
+    
+    With workers > 1 (or 0 for one per CPU core), per-stock metrics are computed in
+    a process pool, chunk_size stocks per task, and merged in input order before the
+    global ranking pass, so the output matches the serial run.
+    
+    With a metric_cache, only stocks whose inputs changed since the cached run are
+    recomputed; the others reuse their cached metric values and just get ranked.
+    """
+    print(f"Processing {len(nyse_stocks)} NYSE and {len(nasdaq_stocks)} NASDAQ stocks...")
+    stocks = [(s, "NYSE") for s in nyse_stocks] + [(s, "NASDAQ") for s in nasdaq_stocks]
+    return _score_stocks(stocks, engine, ties, workers, chunk_size, metric_cache)
+
+def calculate_scores_from_jsonl(nyse_filename: str, nasdaq_filename: str,
+                                engine: str = DEFAULT_ENGINE, ties: str = RANK_TIES,
+                                workers: int = 1, chunk_size: int = PARALLEL_CHUNK_SIZE,
+                                fast_json: bool = True,
+                                metric_cache: Optional["MetricValueCache"] = None) -> Tuple[List[Dict], Dict[str, int]]:
+    """
+    Calculate scores while streaming stocks from the NYSE and NASDAQ JSONL files.
+    
+    Stocks are read one at a time and trimmed to the fields the METRICS need, so
+    whole files are never held in memory. metric_cache works as in
+    calculate_scores_for_all_stocks.
+    
+    Returns:
+        (scores, number of stocks read per exchange)
+    """
+    fields = get_required_fields()
+    counts = {"NYSE": 0, "NASDAQ": 0}
+    
+    def stream():
+        for filename, exchange in ((nyse_filename, "NYSE"), (nasdaq_filename, "NASDAQ")):
+            print(f"Streaming {exchange} stocks from {filename}...")
+            for stock in iter_stocks_from_jsonl(filename, fields, fast_json):
+                counts[exchange] += 1
+                yield stock, exchange
+            print(f"Found {counts[exchange]} stock(s) in {filename}")
+    
+    scores = _score_stocks(stream(), engine, ties, workers, chunk_size, metric_cache)
+    return scores, counts
+
+def _cache_fields() -> Optional[List[str]]:
+    """Data fields the columnar cache must hold for METRICS, or None for every field"""
+    fields = get_required_fields()
+    return None if fields is None else [f for f in fields if f not in PERIOD_DATE_KEYS]
+
+def compile_columnar_cache(nyse_filename: str, nasdaq_filename: str,
+                           cache_dir: str = COLUMNAR_CACHE_DIR, fast_json: bool = True):
+    """
+    Compile the NYSE and NASDAQ JSONL files into the memory-mapped columnar cache.
+    
+    Returns:
+        The opened ColumnarCache
+    """
+    try:
+        from . import columnar_cache
+    except ImportError:
+        import columnar_cache
     
-    # Process NYSE stocks
-    print(f"Processing {len(nyse_stocks)} NYSE stocks...")
-    for stock_data in nyse_stocks:
-        stock_entry = _process_stock(stock_data, "NYSE")
-        if stock_entry:
-            all_stock_data.append(stock_entry)
+    fields = get_required_fields()
     
-    # Process NASDAQ stocks
-    print(f"Processing {len(nasdaq_stocks)} NASDAQ stocks...")
-    for stock_data in nasdaq_stocks:
-        stock_entry = _process_stock(stock_data, "NASDAQ")
-        if stock_entry:
-            all_stock_data.append(stock_entry)
+    def stream():
+        for filename, exchange in ((nyse_filename, "NYSE"), (nasdaq_filename, "NASDAQ")):
+            for stock in iter_stocks_from_jsonl(filename, fields, fast_json):
+                yield stock, exchange
     
+    os.makedirs(cache_dir, exist_ok=True)
+    return columnar_cache.write_cache(cache_dir, stream(), [nyse_filename, nasdaq_filename],
+                                      _get_period_dates, _cache_fields())
+
+def open_columnar_cache(nyse_filename: str, nasdaq_filename: str,
+                        cache_dir: str = COLUMNAR_CACHE_DIR, rebuild: bool = True):
+    """
+    Open the columnar cache if it is up to date with the JSONL files.
+    
+    Args:
+        rebuild: Recompile a missing or stale cache instead of returning None
+    """
+    try:
+        from . import columnar_cache
+    except ImportError:
+        import columnar_cache
+    
+    fields = _cache_fields()
+    cache = columnar_cache.ColumnarCache.open(cache_dir)
+    if cache is not None and cache.is_fresh([nyse_filename, nasdaq_filename], fields or (), fields is None):
+        return cache
+    if not rebuild:
+        return None
+    print(f"Compiling {nyse_filename} and {nasdaq_filename} into {cache_dir}...")
+    return compile_columnar_cache(nyse_filename, nasdaq_filename, cache_dir)
+
+def calculate_scores_from_cache(cache, engine: str = DEFAULT_ENGINE, ties: str = RANK_TIES,
+                                workers: int = 1, chunk_size: int = PARALLEL_CHUNK_SIZE) -> List[Dict]:
+    """
+    Calculate scores from a compiled columnar cache without parsing any JSON.
+    
+    The numpy engine works on the memory-mapped arrays directly in one process,
+    so workers is ignored (with a notice); the python engine rebuilds each stock
+    record from the cache.
+    """
+    if engine != "numpy":
+        return _score_stocks(cache.iter_stocks(), engine, ties, workers, chunk_size)
+    if workers != 1:
+        print(f"Note: worker count {workers} is ignored; the numpy engine scores the columnar cache "
+              f"in a single vectorized pass")
+    return _rank_all(_process_cache_vectorized(cache), ties)
+
+def _score_stocks(stocks: Iterable[Tuple[Dict, str]], engine: str, ties: str,
+                  workers: int, chunk_size: int,
+                  metric_cache: Optional["MetricValueCache"] = None) -> List[Dict]:
+    """Compute per-stock metrics for (stock_data, exchange) pairs, then rank them"""
+    if workers < 1:
+        workers = os.cpu_count() or 1
+    
+    if metric_cache is not None:
+        all_stock_data = _process_stocks_incremental(stocks, engine, workers, chunk_size, metric_cache)
+    else:
+        all_stock_data = _process_stocks(stocks, engine, workers, chunk_size)
+    
+    return _rank_all(all_stock_data, ties)
+
+def _process_stocks(stocks: Iterable[Tuple[Dict, str]], engine: str, workers: int,
+                    chunk_size: int, keep_empty: bool = False) -> List[Optional[Dict]]:
+    """Compute per-stock metrics with the chosen engine and worker count"""
+    if workers > 1:
+        print(f"Computing metrics across {workers} worker processes...")
+        return _process_stocks_parallel(stocks, engine, workers, chunk_size, keep_empty)
+    if engine == "numpy":
+        return _process_stocks_vectorized(stocks, keep_empty)
+    return _process_stocks_serial(stocks, keep_empty)
+
+def _process_stocks_incremental(stocks: Iterable[Tuple[Dict, str]], engine: str, workers: int,
+                                chunk_size: int, metric_cache: "MetricValueCache") -> List[Dict]:
+    """Recompute metrics only for stocks whose fingerprint isn't in the metric cache"""
+    fields = get_required_fields()
+    # Per stock: (True, cached entry or None) or (False, index into changed)
+    slots = []
+    changed = []
+    changed_keys = []
+    for stock_data, exchange in stocks:
+        key = _stock_cache_key(stock_data, exchange)
+        fingerprint = _stock_fingerprint(stock_data, fields)
+        hit, entry = metric_cache.lookup(key, fingerprint)
+        if hit:
+            slots.append((True, entry))
+        else:
+            slots.append((False, len(changed)))
+            changed.append((stock_data, exchange))
+            changed_keys.append((key, fingerprint))
+    
+    print(f"Reusing cached metrics for {len(slots) - len(changed)} stock(s), "
+          f"recomputing {len(changed)}...")
+    computed = _process_stocks(changed, engine, workers, chunk_size, keep_empty=True) if changed else []
+    for (key, fingerprint), entry in zip(changed_keys, computed):
+        metric_cache.store(key, fingerprint, entry)
+    
+    all_stock_data = []
+    for cached, value in slots:
+        entry = value if cached else computed[value]
+        if entry is not None:
+            # Ranking adds keys to the entry; keep the cached copy clean
+            all_stock_data.append(dict(entry))
+    return all_stock_data
+
+def _stock_cache_key(stock_data: Dict, exchange: str) -> str:
+    """Key of a stock in the metric cache"""
+    symbol = stock_data.get("symbol") if isinstance(stock_data, dict) else None
+    return f"{exchange}:{symbol}"
+
+def _stock_fingerprint(stock_data: Dict, fields: Optional[List[str]]) -> str:
+    """
+    Hash of everything in a stock record that can affect its metric values.
+    
+    Pickling is several times faster than canonical JSON; a record that only differs
+    in key order or int/float types hashes differently and is simply recomputed.
+    """
+    trimmed = _trim_stock_data(stock_data, fields)
+    return hashlib.sha1(pickle.dumps(trimmed, protocol=4)).hexdigest()
+
+def _metrics_signature() -> str:
+    """Identifies the METRICS configuration the cached values were computed with"""
+    parts = [str(METRIC_CACHE_VERSION)]
+    for metric in METRICS:
+        calculator = metric.calculator
+        parts.append("|".join([metric.key, getattr(calculator, "__module__", None) or "",
+                               getattr(calculator, "__qualname__", None) or repr(calculator),
+                               ",".join(metric.fields)]))
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+class MetricValueCache:
+    """
+    Per-stock metric values from earlier runs, keyed by a fingerprint of each stock's input.
+    
+    Entries are the unranked score entries (None for stocks without any metric). The
+    whole cache is dropped when METRICS change; calculators are identified by name,
+    so changing a calculator's code in place needs a METRIC_CACHE_VERSION bump.
+    Stocks not seen since load() are pruned on save().
+    """
+    
+    def __init__(self, filename: str = METRIC_CACHE_FILE):
+        self.filename = filename
+        self.signature = _metrics_signature()
+        self._previous: Dict[str, List] = {}
+        self._current: Dict[str, List] = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def load(self) -> "MetricValueCache":
+        """Read cached values from disk, ignoring a missing, unreadable or outdated file"""
+        self._previous = {}
+        if not os.path.exists(self.filename):
+            return self
+        try:
+            with open(self.filename, 'r') as f:
+                cached = json.load(f)
+            if cached.get("signature") == self.signature:
+                self._previous = cached.get("stocks", {})
+        except Exception as e:
+            print(f"Warning: Ignoring unreadable metric cache {self.filename}: {e}")
+        return self
+    
+    def lookup(self, key: str, fingerprint: str) -> Tuple[bool, Optional[Dict]]:
+        """(True, cached entry) if the stock is unchanged, else (False, None)"""
+        cached = self._previous.get(key)
+        if cached is None or cached[0] != fingerprint:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        self._current[key] = cached
+        return True, cached[1]
+    
+    def store(self, key: str, fingerprint: str, entry: Optional[Dict]) -> None:
+        """Remember the unranked entry computed for a stock"""
+        self._current[key] = [fingerprint, None if entry is None else dict(entry)]
+    
+    def save(self) -> None:
+        """Write the values seen in this run, replacing the file atomically"""
+        tmp_filename = f"{self.filename}.tmp"
+        with open(tmp_filename, 'w') as f:
+            json.dump({"signature": self.signature, "stocks": self._current}, f)
+        os.replace(tmp_filename, self.filename)
+
+def _rank_all(all_stock_data: List[Dict], ties: str) -> List[Dict]:
+    """Rank every metric and the total percentile in place"""
     # Rank and calculate percentiles for each metric
     for metric in METRICS:
-        _rank_metric(all_stock_data, metric)
+        _rank_metric(all_stock_data, metric, ties)
     
     # Calculate total percentile for stocks with all required metrics
-    _calculate_total_percentile(all_stock_data)
+    _calculate_total_percentile(all_stock_data, ties)
     
     return all_stock_data
 
-def _process_stock(stock_data: Dict, exchange: str) -> Optional[Dict]:
-    """Process a single stock and calculate all metrics"""
+def _new_stock_entry(stock_data: Dict, exchange: str) -> Dict:
+    """Create a stock entry with market cap filled in and all metrics set to None"""
     symbol = stock_data.get("symbol")
     company_name = stock_data.get("company_name", symbol)
     
@@ -586,6 +926,12 @@ def _process_stock(stock_data: Dict, exchange: str) -> Optional[Dict]:
     for metric in METRICS:
         stock_entry[metric.key] = None
     
+    return stock_entry
+
+def _process_stock(stock_data: Dict, exchange: str) -> Optional[Dict]:
+    """Process a single stock and calculate all metrics"""
+    stock_entry = _new_stock_entry(stock_data, exchange)
+    
     # Calculate all metrics
     has_any_metric = False
     for metric in METRICS:
@@ -599,61 +945,225 @@ def _process_stock(stock_data: Dict, exchange: str) -> Optional[Dict]:
     
     return stock_entry if has_any_metric else None
 
-def _rank_metric(all_stock_data: List[Dict], metric: MetricConfig):
-    """Rank stocks by a specific metric and calculate percentiles"""
-    # Get stocks with this metric
-    metric_stocks = [s for s in all_stock_data if s[metric.key] is not None]
+def _process_stocks_serial(stocks: Iterable[Tuple[Dict, str]], keep_empty: bool = False) -> List[Optional[Dict]]:
+    """
+    Process (stock_data, exchange) pairs one at a time with the per-stock calculators.
+    
+    Stocks without any metric are dropped, or kept as None with keep_empty.
+    """
+    all_stock_data = []
+    for stock_data, exchange in stocks:
+        stock_entry = _process_stock(stock_data, exchange)
+        if stock_entry or keep_empty:
+            all_stock_data.append(stock_entry)
+    return all_stock_data
+
+def _split_vectorized_metrics(vectorized_metrics) -> Tuple[Dict[str, str], List[MetricConfig]]:
+    """Map metric keys to their vectorized versions; the rest need the per-stock calculators"""
+    vectorized_keys = {}
+    fallback_metrics = []
+    for metric in METRICS:
+        key = _VECTORIZED_CALCULATOR_KEYS.get(metric.calculator)
+        if key and vectorized_metrics.has_metric(key):
+            vectorized_keys[metric.key] = key
+        else:
+            fallback_metrics.append(metric)
+    return vectorized_keys, fallback_metrics
+
+def _process_stocks_vectorized(stocks: Iterable[Tuple[Dict, str]], keep_empty: bool = False) -> List[Optional[Dict]]:
+    """Process (stock_data, exchange) pairs with the NumPy engine, same output as _process_stock"""
+    try:
+        from . import vectorized_metrics
+    except ImportError:
+        import vectorized_metrics
+    
+    vectorized_keys, fallback_metrics = _split_vectorized_metrics(vectorized_metrics)
+    
+    # Keep only the packed series and entry skeleton of each stock; metrics without a
+    # vectorized version are calculated while the raw record is at hand
+    builder = vectorized_metrics.PanelBuilder(_get_period_dates)
+    stock_entries = []
+    metric_results = {metric.key: [] for metric in fallback_metrics}
+    for stock_data, exchange in stocks:
+        builder.add(stock_data)
+        stock_entries.append(_new_stock_entry(stock_data, exchange))
+        for metric in fallback_metrics:
+            result = metric.calculator(stock_data)
+            metric_results[metric.key].append((result[2], result[3]) if result else None)
+    
+    # (value, period) or None for every stock, per metric
+    panel = builder.build()
+    for metric_key, key in vectorized_keys.items():
+        metric_results[metric_key] = vectorized_metrics.compute_metric(panel, key)
+    
+    return _apply_metric_results(stock_entries, metric_results, keep_empty)
+
+def _process_cache_vectorized(cache) -> List[Dict]:
+    """Process every stock of a columnar cache with the NumPy engine"""
+    try:
+        from . import vectorized_metrics
+    except ImportError:
+        import vectorized_metrics
+    
+    vectorized_keys, fallback_metrics = _split_vectorized_metrics(vectorized_metrics)
+    
+    stock_entries = []
+    rows = zip(cache.array("symbols").tolist(), cache.array("company_names").tolist(),
+               cache.array("exchanges").tolist(), cache.market_caps())
+    for symbol, company_name, exchange, market_cap in rows:
+        stock_entry = {
+            "symbol": symbol or None,
+            "company_name": company_name or None,
+            "exchange": exchange,
+            "period": None,
+            "market_cap": market_cap
+        }
+        for metric in METRICS:
+            stock_entry[metric.key] = None
+        stock_entries.append(stock_entry)
     
-    # Sort by metric value
-    metric_stocks.sort(key=lambda x: x[metric.key], reverse=metric.sort_descending)
+    metric_results = {metric.key: [] for metric in fallback_metrics}
+    if fallback_metrics:
+        for stock_data, _ in cache.iter_stocks():
+            for metric in fallback_metrics:
+                result = metric.calculator(stock_data)
+                metric_results[metric.key].append((result[2], result[3]) if result else None)
     
-    # Assign ranks and percentiles
-    total = len(metric_stocks)
-    for rank, stock in enumerate(metric_stocks, start=1):
-        stock[f"{metric.key}_rank"] = rank
-        stock[f"{metric.key}_percentile"] = calculate_percentile(rank, total)
+    panel = cache.to_panel()
+    for metric_key, key in vectorized_keys.items():
+        metric_results[metric_key] = vectorized_metrics.compute_metric(panel, key)
+    
+    return _apply_metric_results(stock_entries, metric_results)
+
+def _apply_metric_results(stock_entries: List[Dict], metric_results: Dict[str, List],
+                          keep_empty: bool = False) -> List[Optional[Dict]]:
+    """Fill (value, period) results into the entries, keeping stocks with at least one metric"""
+    all_stock_data = []
+    for i, stock_entry in enumerate(stock_entries):
+        has_any_metric = False
+        for metric in METRICS:
+            result = metric_results[metric.key][i]
+            if result:
+                value, period = result
+                stock_entry[metric.key] = value
+                if stock_entry["period"] is None:
+                    stock_entry["period"] = period
+                has_any_metric = True
+        if has_any_metric:
+            all_stock_data.append(stock_entry)
+        elif keep_empty:
+            all_stock_data.append(None)
+    
+    return all_stock_data
+
+def _process_stock_chunk(chunk: List[Tuple[Dict, str]], engine: str, keep_empty: bool = False) -> List[Optional[Dict]]:
+    """Process one shard of (stock_data, exchange) pairs; runs in a worker process"""
+    if engine == "numpy":
+        return _process_stocks_vectorized(chunk, keep_empty)
+    return _process_stocks_serial(chunk, keep_empty)
+
+def _process_stocks_parallel(stocks: Iterable[Tuple[Dict, str]], engine: str, workers: int,
+                             chunk_size: int = PARALLEL_CHUNK_SIZE, keep_empty: bool = False) -> List[Optional[Dict]]:
+    """
+    Process (stock_data, exchange) pairs across a process pool.
+    
+    At most two chunks per worker are in flight, so a streamed input is never held
+    in memory all at once. Workers use the METRICS registered at import time, so
+    metrics added at runtime are only seen by workers that inherit the parent's
+    memory (fork start method).
+    """
+    chunk_size = max(1, chunk_size)
+    all_stock_data = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        chunk = []
+        for pair in stocks:
+            chunk.append(pair)
+            if len(chunk) == chunk_size:
+                pending.append(executor.submit(_process_stock_chunk, chunk, engine, keep_empty))
+                chunk = []
+                # Collect in submission order, keeping the output deterministic
+                if len(pending) >= workers * 2:
+                    all_stock_data.extend(pending.popleft().result())
+        if chunk:
+            pending.append(executor.submit(_process_stock_chunk, chunk, engine, keep_empty))
+        while pending:
+            all_stock_data.extend(pending.popleft().result())
+    return all_stock_data
+
+def _assign_ranks(sorted_values: List, ties: str = RANK_TIES) -> List:
+    """Ranks for values that are already in rank order (1 = first)"""
+    if ties not in RANK_TIE_MODES:
+        raise ValueError(f"Unknown tie mode '{ties}', expected one of {RANK_TIE_MODES}")
+    
+    total = len(sorted_values)
+    if ties == "ordinal":
+        return list(range(1, total + 1))
+    
+    # Average mode: each run of equal values shares the mean of its ordinal ranks
+    ranks = [0.0] * total
+    start = 0
+    while start < total:
+        end = start
+        while end + 1 < total and sorted_values[end + 1] == sorted_values[start]:
+            end += 1
+        average_rank = (start + end) / 2 + 1
+        for position in range(start, end + 1):
+            ranks[position] = average_rank
+        start = end + 1
+    return ranks
+
+def _rank_metric(all_stock_data: List[Dict], metric: MetricConfig, ties: str = RANK_TIES):
+    """Rank stocks by a specific metric and calculate percentiles"""
+    key = metric.key
+    rank_key = f"{key}_rank"
+    percentile_key = f"{key}_percentile"
+    
+    # Positions of stocks with this metric, sorted by metric value (stable, so
+    # equal values keep their input order)
+    order = [i for i, s in enumerate(all_stock_data) if s[key] is not None]
+    order.sort(key=lambda i: all_stock_data[i][key], reverse=metric.sort_descending)
     
     # Set None for stocks without this metric
     for stock in all_stock_data:
-        if stock[metric.key] is None:
-            stock[f"{metric.key}_rank"] = None
-            stock[f"{metric.key}_percentile"] = None
+        stock[rank_key] = None
+        stock[percentile_key] = None
+    
+    # Assign ranks and percentiles
+    total = len(order)
+    ranks = _assign_ranks([all_stock_data[i][key] for i in order], ties)
+    for i, rank in zip(order, ranks):
+        stock = all_stock_data[i]
+        stock[rank_key] = rank
+        stock[percentile_key] = calculate_percentile(rank, total)
 
-def _calculate_total_percentile(all_stock_data: List[Dict]):
+def _calculate_total_percentile(all_stock_data: List[Dict], ties: str = RANK_TIES):
     """Calculate total percentile based on metrics that are included in total"""
     # Get metrics that should be included in total
     total_metrics = [m for m in METRICS if m.include_in_total]
+    rank_keys = [f"{m.key}_rank" for m in total_metrics]
     
-    # Find stocks that have all required metrics
-    stocks_with_all = []
+    # Set None for all stocks; those with all metrics are filled in below
     for stock in all_stock_data:
-        if all(stock[m.key] is not None for m in total_metrics):
-            stocks_with_all.append(stock)
+        stock["total_rank"] = None
+        stock["total_percentile"] = None
     
-    # Calculate average rank for each stock
-    for stock in stocks_with_all:
-        ranks = [stock[f"{m.key}_rank"] for m in total_metrics]
-        avg_rank = sum(ranks) / len(ranks)
-        stock["_combined_rank"] = avg_rank
+    # Average rank for each stock that has all required metrics, by position
+    combined_ranks = {}
+    for i, stock in enumerate(all_stock_data):
+        if all(stock[m.key] is not None for m in total_metrics):
+            ranks = [stock[k] for k in rank_keys]
+            combined_ranks[i] = sum(ranks) / len(ranks)
     
-    # Sort by combined rank
-    stocks_with_all.sort(key=lambda x: x["_combined_rank"])
+    # Sort by combined rank (stable, like the per-metric ranking)
+    order = sorted(combined_ranks, key=combined_ranks.__getitem__)
     
     # Assign total ranks and percentiles
-    total_stocks = len(stocks_with_all)
-    for rank, stock in enumerate(stocks_with_all, start=1):
-        stock["total_rank"] = rank
-        stock["total_percentile"] = calculate_percentile(rank, total_stocks)
-    
-    # Set None for stocks without all metrics
-    for stock in all_stock_data:
-        if stock not in stocks_with_all:
-            stock["total_rank"] = None
-            stock["total_percentile"] = None
-    
-    # Clean up temporary field
-    for stock in all_stock_data:
-        stock.pop("_combined_rank", None)
+    total_stocks = len(order)
+    total_ranks = _assign_ranks([combined_ranks[i] for i in order], ties)
+    for i, rank in zip(order, total_ranks):
+        all_stock_data[i]["total_rank"] = rank
+        all_stock_data[i]["total_percentile"] = calculate_percentile(rank, total_stocks)
 
 def save_scores_to_json(scores_data: List[Dict], filename: str = "scores.json"):
     """Save calculated scores to JSON file"""
@@ -691,6 +1201,269 @@ def save_scores_to_json(scores_data: List[Dict], filename: str = "scores.json"):
         print(f"Saved scores for {len(scores_data)} stock(s)")
     except Exception as e:
         print(f"Error saving to {filename}: {e}")
+        return
+    
+    if not build_scores_index(scores_data, filename):
+        print(f"Warning: Could not build lookup index for {filename}; lookups will read the whole file")
+
+# Bump when the layout of the scores index changes
+SCORES_INDEX_VERSION = 1
+
+def _scores_index_path(filename: str) -> str:
+    """SQLite sidecar holding the lookup index of a scores file"""
+    return f"{filename}.idx"
+
+def _view_sort_key(stock: Dict) -> Tuple[int, float]:
+    """Sort key of the 'view' command: total percentile, else the first metric percentile"""
+    if stock.get("total_percentile") is not None:
+        return (0, -stock["total_percentile"])
+    # Fallback to first available metric percentile
+    for metric in METRICS:
+        pct = stock.get(f"{metric.key}_percentile")
+        if pct is not None:
+            return (1, -pct)
+    return (2, 0)
+
+def _scores_index_meta(filename: str) -> Dict[str, str]:
+    """What a scores index must match to be current: the scores file's size and mtime, and METRICS"""
+    stat = os.stat(filename)
+    return {
+        "version": str(SCORES_INDEX_VERSION),
+        "source_size": str(stat.st_size),
+        "source_mtime_ns": str(stat.st_mtime_ns),
+        "metrics": ",".join(metric.key for metric in METRICS),
+    }
+
+def build_scores_index(scores_data: List[Dict], filename: str = "scores.json") -> bool:
+    """
+    Write the lookup index next to a saved scores file.
+    
+    The index is a small SQLite file with each stock's JSON keyed by symbol and by
+    its 'view' sort order, so lookups and views don't load the whole scores file.
+    
+    Returns:
+        True if the index was written
+    """
+    index_path = _scores_index_path(filename)
+    tmp_path = f"{index_path}.tmp"
+    try:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("""
+                CREATE TABLE scores (
+                    position INTEGER PRIMARY KEY,
+                    symbol TEXT,
+                    market_cap REAL,
+                    sort_group INTEGER,
+                    sort_value REAL,
+                    stock TEXT
+                )
+            """)
+            rows = []
+            for position, stock in enumerate(scores_data):
+                sort_group, sort_value = _view_sort_key(stock)
+                market_cap = stock.get("market_cap")
+                rows.append((
+                    position,
+                    (stock.get("symbol") or "").upper(),
+                    market_cap if isinstance(market_cap, (int, float)) else None,
+                    sort_group,
+                    sort_value,
+                    json.dumps(stock),
+                ))
+            conn.executemany("INSERT INTO scores VALUES (?, ?, ?, ?, ?, ?)", rows)
+            conn.execute("CREATE INDEX idx_scores_symbol ON scores(symbol, position)")
+            conn.execute("CREATE INDEX idx_scores_sort ON scores(sort_group, sort_value, position)")
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", _scores_index_meta(filename).items())
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(tmp_path, index_path)
+        return True
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+
+def _open_scores_index(filename: str) -> Optional[sqlite3.Connection]:
+    """
+    Open the lookup index of a scores file, rebuilding it if it is missing or stale.
+    
+    Returns None if the scores file doesn't exist or the index can't be used.
+    """
+    if not os.path.exists(filename):
+        return None
+    index_path = _scores_index_path(filename)
+    for attempt in range(2):
+        if os.path.exists(index_path):
+            try:
+                conn = sqlite3.connect(index_path)
+                meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+                if meta == _scores_index_meta(filename):
+                    return conn
+                conn.close()
+            except Exception:
+                pass
+        if attempt == 0:
+            # Written by an older version or edited by hand; rebuild it once
+            scores_data = load_scores_from_json(filename)
+            if not scores_data or not build_scores_index(scores_data.get("scores", []), filename):
+                return None
+    return None
+
+def lookup_stocks(symbols: List[str], filename: str = "scores.json") -> Optional[Dict[str, Dict]]:
+    """
+    Look up several stocks at once.
+    
+    Returns:
+        Uppercase symbol -> stock for the symbols found (first match wins, as in
+        scores order), or None if the scores file can't be read
+    """
+    wanted = list(dict.fromkeys(s.upper().strip() for s in symbols if s and s.strip()))
+    conn = _open_scores_index(filename)
+    if conn is not None:
+        try:
+            found = {}
+            for i in range(0, len(wanted), 500):
+                chunk = wanted[i:i + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                rows = conn.execute(
+                    f"SELECT symbol, stock FROM scores WHERE symbol IN ({placeholders}) ORDER BY position",
+                    chunk
+                ).fetchall()
+                for symbol, stock in rows:
+                    if symbol not in found:
+                        found[symbol] = json.loads(stock)
+            return found
+        except Exception:
+            pass
+        finally:
+            conn.close()
+    
+    # No usable index: scan the whole file
+    scores_data = load_scores_from_json(filename)
+    if not scores_data:
+        return None
+    found = {}
+    wanted_set = set(wanted)
+    for stock in scores_data.get("scores", []):
+        symbol = stock.get("symbol", "").upper()
+        if symbol in wanted_set and symbol not in found:
+            found[symbol] = stock
+    return found
+
+def query_ranked_scores(limit: Optional[int] = None, min_market_cap: Optional[float] = None,
+                        filename: str = "scores.json") -> Optional[Tuple[List[Dict], int]]:
+    """
+    Get stocks in 'view' order, optionally filtered by market cap (in dollars) and limited.
+    
+    Returns:
+        (stocks, number of stocks matching the filter), or None if the scores file
+        can't be read
+    """
+    conn = _open_scores_index(filename)
+    if conn is not None:
+        try:
+            where = ""
+            params: List = []
+            if min_market_cap is not None:
+                where = "WHERE market_cap IS NOT NULL AND market_cap >= ?"
+                params.append(min_market_cap)
+            total = conn.execute(f"SELECT COUNT(*) FROM scores {where}", params).fetchone()[0]
+            query = f"SELECT stock FROM scores {where} ORDER BY sort_group, sort_value, position"
+            if limit:
+                query += " LIMIT ?"
+                params.append(limit)
+            return [json.loads(row[0]) for row in conn.execute(query, params)], total
+        except Exception:
+            pass
+        finally:
+            conn.close()
+    
+    # No usable index: load and sort the whole file
+    scores_data = load_scores_from_json(filename)
+    if not scores_data:
+        return None
+    scores = scores_data.get("scores", [])
+    if min_market_cap is not None:
+        scores = [s for s in scores if s.get("market_cap") is not None and s.get("market_cap") >= min_market_cap]
+    sorted_scores = sorted(scores, key=_view_sort_key)
+    return (sorted_scores[:limit] if limit else sorted_scores), len(scores)
+
+def _score_columns() -> Dict[str, str]:
+    """financial_scores columns written for METRICS, with their SQLite types"""
+    columns = {}
+    for metric in METRICS:
+        columns[metric.key] = "REAL"
+        columns[f"{metric.key}_rank"] = "INTEGER"
+        columns[f"{metric.key}_percentile"] = "REAL"
+    columns["total_percentile"] = "REAL"
+    columns["total_rank"] = "INTEGER"
+    return columns
+
+# Entry fields also published when the financial_scores table has a column for them
+OPTIONAL_SCORE_COLUMNS = ("company_name", "exchange", "period", "market_cap")
+
+# Smallest share of scored symbols that must match a company before a publish may
+# replace financial_scores; a lower share means a mismatched database, not delistings
+MIN_PUBLISH_MATCH_RATIO = 0.5
+
+def publish_scores_to_db(scores_data: List[Dict], db_path: Optional[str] = None,
+                         min_match_ratio: float = MIN_PUBLISH_MATCH_RATIO) -> Tuple[int, List[str]]:
+    """
+    Write calculated scores into the financial_scores table in one transaction.
+    
+    Columns for METRICS missing from the table are added first. Companies that are
+    no longer scored are removed, so the table always holds exactly one run.
+    
+    Returns:
+        (number of companies published, symbols not found in the companies table)
+    
+    Raises:
+        ValueError: If fewer than min_match_ratio of the scored symbols are in the
+                    companies table; nothing is written
+    """
+    try:
+        from ..repositories.company_repository import CompanyRepository
+        from ..repositories.financial_scores_repository import FinancialScoresRepository
+    except ImportError:
+        import sys
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "repositories"))
+        from company_repository import CompanyRepository
+        from financial_scores_repository import FinancialScoresRepository
+    
+    kwargs = {"db_path": db_path} if db_path else {}
+    company_repo = CompanyRepository(**kwargs)
+    scores_repo = FinancialScoresRepository(**kwargs)
+    
+    score_columns = _score_columns()
+    scores_repo.ensure_columns(score_columns)
+    existing = set(scores_repo.get_columns())
+    columns = list(score_columns) + [col for col in OPTIONAL_SCORE_COLUMNS if col in existing]
+    
+    company_ids = company_repo.get_company_ids_by_tickers([s.get("symbol") for s in scores_data])
+    rows = []
+    not_found = []
+    for stock in scores_data:
+        symbol = stock.get("symbol")
+        company_id = company_ids.get(symbol.upper()) if symbol else None
+        if company_id is None:
+            not_found.append(symbol)
+            continue
+        row = {"company_id": company_id}
+        for col in columns:
+            row[col] = stock.get(col)
+        rows.append(row)
+    
+    if not rows or len(rows) < min_match_ratio * len(scores_data):
+        raise ValueError(f"Only {len(rows)} of {len(scores_data)} scored symbols are in the companies table; "
+                         f"refusing to replace financial_scores")
+    return scores_repo.replace_all_financial_scores(rows), not_found
 
 def load_scores_from_json(filename: str = "scores.json") -> Optional[Dict]:
     """Load scores from JSON file"""
@@ -706,19 +1479,12 @@ def load_scores_from_json(filename: str = "scores.json") -> Optional[Dict]:
 
 def lookup_stock(symbol: str, filename: str = "scores.json") -> Optional[Dict]:
     """Look up a stock's percentile rank by symbol"""
-    scores_data = load_scores_from_json(filename)
-    if not scores_data:
+    found = lookup_stocks([symbol], filename)
+    if found is None:
         print(f"Error: {filename} not found. Please run 'calc' command first.")
         return None
     
-    scores = scores_data.get("scores", [])
-    symbol_upper = symbol.upper()
-    
-    for stock in scores:
-        if stock.get("symbol", "").upper() == symbol_upper:
-            return stock
-    
-    return None
+    return found.get(symbol.upper().strip())
 
 def display_stock_info(stock: Dict):
     """Display stock percentile rank information"""
@@ -753,32 +1519,51 @@ def display_stock_info(stock: Dict):
     
     print(f"{'='*80}\n")
 
-def run_calculate_command():
-    """Execute the 'calc' command to calculate and save scores for all stocks"""
+def run_calculate_command(workers: int = 1, incremental: bool = False):
+    """
+    Execute the 'calc' command to calculate and save scores for all stocks.
+    
+    With incremental, metric values cached in METRIC_CACHE_FILE are reused for
+    stocks whose data didn't change and only the ranking is redone for them.
+    """
     program_start_time = time.time()
     print("Calculating Stock Scores and Percentiles")
     print("=" * 80)
     
-    # Load data from both exchanges
-    print("\nLoading data from nyse_data.jsonl...")
-    nyse_stocks = load_data_from_jsonl("nyse_data.jsonl")
-    print(f"Found {len(nyse_stocks)} stock(s) in nyse_data.jsonl")
-    
-    print("\nLoading data from nasdaq_data.jsonl...")
-    nasdaq_stocks = load_data_from_jsonl("nasdaq_data.jsonl")
-    print(f"Found {len(nasdaq_stocks)} stock(s) in nasdaq_data.jsonl")
+    # Use the columnar cache when NumPy is available, recompiling it if the JSONL
+    # files changed; otherwise stream both files and calculate scores in one pass.
+    # Incremental runs stream too, as they only recompute the stocks that changed.
+    cache = None
+    metric_cache = MetricValueCache().load() if incremental else None
+    if DEFAULT_ENGINE == "numpy" and not incremental:
+        try:
+            cache = open_columnar_cache("nyse_data.jsonl", "nasdaq_data.jsonl")
+        except Exception as e:
+            print(f"Columnar cache unavailable, reading JSONL files directly: {e}")
     
-    if not nyse_stocks and not nasdaq_stocks:
+    print("\nCalculating scores and percentiles...")
+    start_time = time.time()
+    if cache is not None:
+        counts = cache.counts
+        counts = {"NYSE": counts.get("NYSE", 0), "NASDAQ": counts.get("NASDAQ", 0)}
+        print(f"Loaded {counts['NYSE']} NYSE and {counts['NASDAQ']} NASDAQ stock(s) from {COLUMNAR_CACHE_DIR}")
+        scores_data = calculate_scores_from_cache(cache, workers=workers)
+    else:
+        scores_data, counts = calculate_scores_from_jsonl("nyse_data.jsonl", "nasdaq_data.jsonl", workers=workers,
+                                                          metric_cache=metric_cache)
+        if metric_cache is not None:
+            try:
+                metric_cache.save()
+            except Exception as e:
+                print(f"Warning: Could not save {metric_cache.filename}: {e}")
+    
+    if not counts["NYSE"] and not counts["NASDAQ"]:
         print("No stock data found in either file")
         total_time = time.time() - program_start_time
         print(f"\n{'='*80}")
         print(f"Total program execution time: {total_time:.2f} seconds ({total_time/60:.2f} minutes)")
         return
     
-    # Calculate scores for all stocks
-    print("\nCalculating scores and percentiles...")
-    start_time = time.time()
-    scores_data = calculate_scores_for_all_stocks(nyse_stocks, nasdaq_stocks)
     elapsed_time = time.time() - start_time
     print(f"Score calculation completed in {elapsed_time:.2f} seconds ({elapsed_time/60:.2f} minutes)")
     
@@ -822,6 +1607,36 @@ def run_calculate_command():
     print(f"Total program execution time: {total_time:.2f} seconds ({total_time/60:.2f} minutes)")
     print(f"{'='*80}")
 
+def run_publish_command():
+    """Execute the 'publish' command to write scores.json into the financial_scores table"""
+    scores_data = load_scores_from_json()
+    if not scores_data:
+        print(f"Error: scores.json not found. Please run 'calc' command first.\n")
+        return
+    
+    start_time = time.time()
+    try:
+        published, not_found = publish_scores_to_db(scores_data.get("scores", []))
+    except Exception as e:
+        print(f"Error publishing scores: {e}\n")
+        return
+    elapsed_time = time.time() - start_time
+    print(f"Published scores for {published} compan(ies) to financial_scores in {elapsed_time:.2f} seconds")
+    if not_found:
+        print(f"Skipped {len(not_found)} symbol(s) not in the companies table")
+    print()
+
+def run_compile_command():
+    """Execute the 'compile' command to rebuild the columnar cache from the JSONL files"""
+    start_time = time.time()
+    try:
+        cache = compile_columnar_cache("nyse_data.jsonl", "nasdaq_data.jsonl")
+    except Exception as e:
+        print(f"Error compiling columnar cache: {e}\n")
+        return
+    elapsed_time = time.time() - start_time
+    print(f"Compiled {len(cache)} stock(s) into {COLUMNAR_CACHE_DIR} in {elapsed_time:.2f} seconds\n")
+
 def run_lookup_command(symbol: str):
     """Execute the stock lookup command"""
     stock = lookup_stock(symbol)
@@ -833,16 +1648,11 @@ def run_lookup_command(symbol: str):
 
 def run_multi_lookup_command(symbols: List[str]):
     """Execute multi-stock lookup command - shows total percentiles ranked"""
-    scores_data = load_scores_from_json()
-    if not scores_data:
+    matches = lookup_stocks(symbols)
+    if matches is None:
         print(f"Error: scores.json not found. Please run 'calc' command first.\n")
         return
     
-    scores = scores_data.get("scores", [])
-    if not scores:
-        print("No stock scores found in scores.json\n")
-        return
-    
     # Look up each symbol
     found_stocks = []
     not_found = []
@@ -852,12 +1662,7 @@ def run_multi_lookup_command(symbols: List[str]):
         if not symbol_upper:
             continue
         
-        stock = None
-        for s in scores:
-            if s.get("symbol", "").upper() == symbol_upper:
-                stock = s
-                break
-        
+        stock = matches.get(symbol_upper)
         if stock:
             found_stocks.append(stock)
         else:
@@ -910,39 +1715,21 @@ def run_multi_lookup_command(symbols: List[str]):
 
 def run_view_command(limit: Optional[int] = None, min_market_cap: Optional[float] = None):
     """Display all stocks ranked by total percentile, optionally filtered by market cap"""
-    scores_data = load_scores_from_json()
-    if not scores_data:
+    # Market cap is in dollars, min_market_cap is in billions
+    min_market_cap_dollars = min_market_cap * 1_000_000_000 if min_market_cap is not None else None
+    ranked = query_ranked_scores(limit, min_market_cap_dollars)
+    if ranked is None:
         print(f"Error: scores.json not found. Please run 'calc' command first.\n")
         return
     
-    scores = scores_data.get("scores", [])
-    if not scores:
-        print("No stock scores found in scores.json\n")
-        return
-    
-    # Filter by market cap if specified (market cap is in dollars, min_market_cap is in billions)
-    if min_market_cap is not None:
-        min_market_cap_dollars = min_market_cap * 1_000_000_000  # Convert billions to dollars
-        scores = [s for s in scores if s.get("market_cap") is not None and s.get("market_cap") >= min_market_cap_dollars]
-        if not scores:
+    # Stocks sorted by total percentile, and how many passed the filter
+    sorted_scores, total_count = ranked
+    if not total_count:
+        if min_market_cap is not None:
             print(f"No stocks found with market cap over ${min_market_cap}B\n")
-            return
-    
-    # Sort by total percentile
-    def get_sort_key(stock):
-        if stock.get("total_percentile") is not None:
-            return (0, -stock["total_percentile"])
-        # Fallback to first available metric percentile
-        for metric in METRICS:
-            pct = stock.get(f"{metric.key}_percentile")
-            if pct is not None:
-                return (1, -pct)
-        return (2, 0)
-    
-    sorted_scores = sorted(scores, key=get_sort_key)
-    
-    if limit:
-        sorted_scores = sorted_scores[:limit]
+        else:
+            print("No stock scores found in scores.json\n")
+        return
     
     # Build header
     header_parts = ['Rank', 'Symbol', 'Company Name', 'Total %', 'Exchange']
@@ -984,8 +1771,8 @@ def run_view_command(limit: Optional[int] = None, min_market_cap: Optional[float
     
     print(f"{'='*80}")
     print(f"\nTotal stocks displayed: {len(sorted_scores)}")
-    if limit and len(scores) > limit:
-        print(f"Total stocks in database: {len(scores)}")
+    if limit and total_count > limit:
+        print(f"Total stocks in database: {total_count}")
         print(f"Use 'view' without a number to see all stocks, or 'view <number>' to see top N stocks.\n")
     else:
         print()
@@ -1032,6 +1819,10 @@ def print_help():
     print("Available Commands:")
     print("=" * 80)
     print("  calc                   - Calculate and save scores for all stocks")
+    print("  calc [W]               - Calculate using W worker processes (0 = one per CPU core)")
+    print("  calc [W] inc           - Only recompute metrics for stocks whose data changed since the last 'calc inc'")
+    print("  compile                - Rebuild the columnar cache of the JSONL files used by calc")
+    print("  publish                - Write scores.json into the web app's financial_scores table")
     print("  view [N]               - View all stocks ranked by percentile (optionally show top N)")
     print("  view [N] over [X]      - View top N stocks with market cap over X billion (e.g., 'view 50 over 10')")
     print("  metrics                - Show all current metrics being calculated")
@@ -1065,8 +1856,23 @@ def main():
             elif command == "help":
                 print_help()
             elif command == "calc":
-                run_calculate_command()
+                workers = 1
+                incremental = "inc" in [part.lower() for part in command_parts[1:]]
+                worker_parts = [part for part in command_parts[1:] if part.lower() != "inc"]
+                if worker_parts:
+                    try:
+                        workers = int(worker_parts[0])
+                        if workers < 0:
+                            print("Worker count must be non-negative. Running serially.\n")
+                            workers = 1
+                    except ValueError:
+                        print(f"Invalid worker count '{worker_parts[0]}'. Running serially.\n")
+                run_calculate_command(workers, incremental)
                 print()
+            elif command == "compile":
+                run_compile_command()
+            elif command == "publish":
+                run_publish_command()
             elif command == "metrics":
                 run_metrics_command()
             elif command == "clear":
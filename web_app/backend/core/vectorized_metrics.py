@@ -0,0 +1,396 @@
+"""
+Vectorized NumPy engine for the financial scorer metrics.
+
+Packs every stock's quarterly series into padded 2-D arrays (stocks x quarters)
+and computes the metrics with whole-array window operations instead of
+per-stock Python loops. Each function reproduces its `_calc_*` counterpart in
+financial_scorer.py exactly: the same windows, the same skip rules and the same
+floating point operations in the same order, so results are bit-identical.
+"""
+import math
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Quarterly fields read by the vectorized metrics
+FIELDS = ("revenue", "operating_income", "ppe_net", "net_debt", "cost_of_goods_sold")
+
+# Python's float ** 2 goes through libm pow(), which doesn't always round like
+# x * x; applying the same function keeps standard deviations bit-identical
+_pow = np.frompyfunc(math.pow, 2, 1)
+
+
+class QuarterlyPanel:
+    """Padded stocks x quarters arrays of the fields the metrics need."""
+
+    def __init__(self, period_dates: List[List], rows: List[Dict[str, Tuple[np.ndarray, Optional[np.ndarray]]]]):
+        """
+        Args:
+            period_dates: Period date list per stock ([] if it has none)
+            rows: Per stock, field -> (values, present mask or None if all present)
+        """
+        n = len(period_dates)
+        self.period_dates = period_dates
+        self.period_counts = np.array([len(p) for p in period_dates], dtype=np.int64)
+        lengths = [len(values) for row in rows for values, _ in row.values()]
+        self.width = max([1, int(self.period_counts.max(initial=0))] + lengths)
+
+        self.values: Dict[str, np.ndarray] = {}
+        self.present: Dict[str, np.ndarray] = {}
+        for field in FIELDS:
+            values = np.zeros((n, self.width), dtype=np.float64)
+            present = np.zeros((n, self.width), dtype=bool)
+            for i, row in enumerate(rows):
+                if field in row:
+                    row_values, row_present = row[field]
+                    values[i, :len(row_values)] = row_values
+                    present[i, :len(row_values)] = True if row_present is None else row_present
+            self.values[field] = values
+            self.present[field] = present
+
+        # Quarter j of a stock can be reported only if j < len(period_dates)
+        self.in_period = np.arange(self.width)[None, :] < self.period_counts[:, None]
+
+    @classmethod
+    def from_arrays(cls, period_dates, period_counts: np.ndarray,
+                    values: Dict[str, np.ndarray], present: Dict[str, np.ndarray]) -> "QuarterlyPanel":
+        """
+        Wrap already padded arrays (e.g. memory-mapped ones) without copying them.
+
+        Args:
+            period_dates: Per stock, a sequence of period dates indexable by quarter
+            period_counts: Number of period dates per stock
+            values: Field -> stocks x quarters float64 array for every field in FIELDS
+            present: Field -> stocks x quarters bool array, False where a value is missing
+        """
+        panel = cls.__new__(cls)
+        panel.period_dates = period_dates
+        panel.period_counts = np.asarray(period_counts, dtype=np.int64)
+        panel.width = values[FIELDS[0]].shape[1]
+        panel.values = dict(values)
+        panel.present = dict(present)
+        panel.in_period = np.arange(panel.width)[None, :] < panel.period_counts[:, None]
+        return panel
+
+    def __len__(self) -> int:
+        return len(self.period_dates)
+
+
+class PanelBuilder:
+    """
+    Collects stocks one at a time into compact typed rows for a QuarterlyPanel.
+
+    Only the fields in FIELDS and the period dates are kept, so raw records can
+    be discarded as soon as they are added.
+    """
+
+    def __init__(self, get_period_dates: Callable[[Dict], Optional[List]]):
+        self.get_period_dates = get_period_dates
+        self._period_dates: List[List] = []
+        self._rows: List[Dict[str, Tuple[np.ndarray, Optional[np.ndarray]]]] = []
+
+    def add(self, stock_data: Dict) -> None:
+        """Extract one stock's series."""
+        data = stock_data.get("data") if stock_data and "data" in stock_data else None
+        if not isinstance(data, dict):
+            self._period_dates.append([])
+            self._rows.append({})
+            return
+
+        period_dates = self.get_period_dates(data)
+        self._period_dates.append(period_dates if isinstance(period_dates, list) else [])
+
+        fields = {
+            "revenue": data.get("revenue", []),
+            "operating_income": data.get("operating_income", []),
+            "ppe_net": data.get("ppe_net", []),
+            "net_debt": data.get("net_debt", []),
+            # Same fallback as _calc_gross_margin
+            "cost_of_goods_sold": data.get("cost_of_goods_sold", []) or data.get("cogs", []),
+        }
+        # Calculators reject non-list fields, which behaves the same as an empty series
+        self._rows.append({f: _to_row(v) for f, v in fields.items() if isinstance(v, list) and v})
+
+    def __len__(self) -> int:
+        return len(self._period_dates)
+
+    def build(self) -> QuarterlyPanel:
+        """Pad the collected rows into a QuarterlyPanel."""
+        return QuarterlyPanel(self._period_dates, self._rows)
+
+
+def _to_row(lst: list) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Convert one series to (values, present mask); the mask is None when nothing is missing."""
+    try:
+        # NumPy converts None to NaN here
+        values = np.array(lst, dtype=np.float64)
+    except (TypeError, ValueError, OverflowError):
+        values = None
+    if values is not None and values.ndim == 1:
+        if not np.isnan(values).any():
+            return values, None
+        # Tell None apart from NaN values that are really in the data
+        present = np.array([v is not None for v in lst], dtype=bool)
+        values[~present] = 0.0
+        return values, present
+
+    values = np.zeros(len(lst), dtype=np.float64)
+    present = np.zeros(len(lst), dtype=bool)
+    for j, v in enumerate(lst):
+        if v is None:
+            continue
+        try:
+            values[j] = float(v)
+            present[j] = True
+        except (TypeError, ValueError, OverflowError):
+            pass
+    return values, present
+
+
+def pack_stocks(stocks: Iterable[Dict], get_period_dates: Callable[[Dict], Optional[List]]) -> QuarterlyPanel:
+    """Pack raw stock records into a QuarterlyPanel."""
+    builder = PanelBuilder(get_period_dates)
+    for stock_data in stocks:
+        builder.add(stock_data)
+    return builder.build()
+
+# ============================================================================
+# ARRAY HELPERS
+# ============================================================================
+
+def _last_true(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per row, whether any column is True and the index of the last True column."""
+    found = mask.any(axis=1)
+    index = mask.shape[1] - 1 - np.argmax(mask[:, ::-1], axis=1)
+    return found, np.where(found, index, 0)
+
+
+def _shift(x: np.ndarray, s: int) -> np.ndarray:
+    """Shift columns right by s so that column j holds x[:, j - s] (zero/False padded)."""
+    if s == 0:
+        return x
+    out = np.zeros_like(x)
+    if s < x.shape[1]:
+        out[:, s:] = x[:, :x.shape[1] - s]
+    return out
+
+
+def _window_all(mask: np.ndarray, back_from: int, back_to: int) -> np.ndarray:
+    """True at column j when mask is True for every column j-back_from .. j-back_to."""
+    n, width = mask.shape
+    counts = np.zeros((n, width + 1), dtype=np.int64)
+    np.cumsum(mask, axis=1, out=counts[:, 1:])
+    out = np.zeros((n, width), dtype=bool)
+    if back_from < width:
+        j = np.arange(back_from, width)
+        window = counts[:, j - back_to + 1] - counts[:, j - back_from]
+        out[:, back_from:] = window == (back_from - back_to + 1)
+    return out
+
+
+def _window_sum(x: np.ndarray, back_from: int, back_to: int) -> np.ndarray:
+    """Sum x[:, j-back_from .. j-back_to] at column j, adding oldest first like the loops do."""
+    total = np.zeros_like(x)
+    for s in range(back_from, back_to - 1, -1):
+        total = total + _shift(x, s)
+    return total
+
+
+def _take(x: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """Pick x[i, index[i]] for every row."""
+    return x[np.arange(x.shape[0]), index]
+
+
+def _population_stdev(values: np.ndarray, include: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Row-wise population standard deviation of the included entries.
+
+    Sums run left to right in the same order as the Python calculators, and the
+    squared deviations use pow() like float ** 2.
+    """
+    n, width = values.shape
+    counts = include.sum(axis=1)
+    total = np.zeros(n)
+    for k in range(width):
+        total = np.where(include[:, k], total + values[:, k], total)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / counts
+
+    deviations = np.zeros((n, width))
+    rows, cols = np.nonzero(include)
+    if len(rows):
+        deviations[rows, cols] = _pow(values[rows, cols] - mean[rows], 2.0).astype(np.float64)
+    squares = np.zeros(n)
+    for k in range(width):
+        squares = np.where(include[:, k], squares + deviations[:, k], squares)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        stdev = np.sqrt(squares / counts)
+    return stdev, counts
+
+# ============================================================================
+# METRICS
+# ============================================================================
+# Each returns (found, values, period_index) arrays with one entry per stock
+
+def ebit_ppe(panel: QuarterlyPanel):
+    oi, ppe = panel.values["operating_income"], panel.values["ppe_net"]
+    valid = (panel.in_period & panel.present["operating_income"]
+             & panel.present["ppe_net"] & (ppe != 0))
+    found, index = _last_true(valid)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        values = _take(oi, index) / _take(ppe, index)
+    return found, values, index
+
+
+def gross_margin(panel: QuarterlyPanel):
+    revenue, cogs = panel.values["revenue"], panel.values["cost_of_goods_sold"]
+    valid = (panel.in_period & panel.present["revenue"]
+             & panel.present["cost_of_goods_sold"] & (revenue != 0))
+    found, index = _last_true(valid)
+    rev = _take(revenue, index)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        values = (rev - _take(cogs, index)) / rev
+    return found, values, index
+
+
+def operating_margin(panel: QuarterlyPanel):
+    oi, revenue = panel.values["operating_income"], panel.values["revenue"]
+    valid = (panel.in_period & panel.present["operating_income"]
+             & panel.present["revenue"] & (revenue != 0))
+    found, index = _last_true(valid)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        values = _take(oi, index) / _take(revenue, index)
+    return found, values, index
+
+
+def revenue_growth(panel: QuarterlyPanel):
+    revenue = panel.values["revenue"]
+    first = _window_sum(revenue, 19, 10)
+    valid = (panel.in_period & _window_all(panel.present["revenue"], 19, 0) & (first != 0))
+    found, index = _last_true(valid)
+    last = _window_sum(revenue, 9, 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        values = _take(last, index) / _take(first, index)
+    return found, values, index
+
+
+def growth_consistency(panel: QuarterlyPanel):
+    revenue, present = panel.values["revenue"], panel.present["revenue"]
+    width = panel.width
+
+    # Every quarter from the first through j must be reported, so only the
+    # latest quarter before the first gap (or the period end) can qualify
+    has_gap = ~present.all(axis=1)
+    first_gap = np.where(has_gap, np.argmin(present, axis=1), width)
+    index = np.minimum(panel.period_counts - 1, first_gap - 1)
+
+    previous = _shift(revenue, 4)
+    k = np.arange(width)[None, :]
+    include = (k >= 4) & (k <= index[:, None]) & (previous != 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        growth = np.where(include, (revenue - previous) / np.where(include, previous, 1.0), 0.0)
+
+    stdev, counts = _population_stdev(growth, include)
+    found = (index >= 19) & (counts >= 4)
+    return found, stdev, np.where(found, index, 0)
+
+
+def operating_margin_consistency(panel: QuarterlyPanel):
+    oi, revenue = panel.values["operating_income"], panel.values["revenue"]
+    good = panel.present["operating_income"] & panel.present["revenue"] & (revenue != 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        margins = np.where(good, oi / np.where(good, revenue, 1.0), 0.0)
+
+    valid = panel.in_period & _window_all(good, 19, 0)
+    found, index = _last_true(valid)
+
+    # Gather each stock's 20-quarter window ending at its chosen quarter
+    rows = np.arange(len(panel))[:, None]
+    cols = np.clip(index[:, None] - 19 + np.arange(20)[None, :], 0, panel.width - 1)
+    window = margins[rows, cols]
+    stdev, _ = _population_stdev(window, np.broadcast_to(found[:, None], window.shape))
+    return found, stdev, index
+
+
+def operating_margin_growth(panel: QuarterlyPanel):
+    oi, revenue = panel.values["operating_income"], panel.values["revenue"]
+    both = panel.present["operating_income"] & panel.present["revenue"]
+    oi_first, rev_first = _window_sum(oi, 19, 10), _window_sum(revenue, 19, 10)
+    oi_last, rev_last = _window_sum(oi, 9, 0), _window_sum(revenue, 9, 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        margin_first = oi_first / rev_first
+        margin_last = oi_last / rev_last
+        valid = (panel.in_period & _window_all(both, 19, 0)
+                 & (rev_first != 0) & (rev_last != 0) & (margin_first != 0))
+        found, index = _last_true(valid)
+        values = _take(margin_last, index) / _take(margin_first, index)
+    return found, values, index
+
+
+def net_debt_to_ttm_operating_income(panel: QuarterlyPanel):
+    net_debt, oi = panel.values["net_debt"], panel.values["operating_income"]
+    ttm = _window_sum(oi, 3, 0)
+    base = (panel.in_period & panel.present["net_debt"]
+            & _window_all(panel.present["operating_income"], 3, 0))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio = net_debt / ttm
+        worst = net_debt / np.abs(ttm) * 1000
+    # Same case order as _calc_net_debt_to_ttm_operating_income; quarters
+    # matching none of the cases (e.g. zero TTM income) are skipped
+    cases = [
+        ((net_debt < 0) & (ttm > 0), ratio),
+        ((net_debt < 0) & (ttm < 0), np.zeros_like(ratio)),
+        (net_debt == 0, np.zeros_like(ratio)),
+        ((net_debt > 0) & (ttm > 0), ratio),
+        ((net_debt > 0) & (ttm < 0), worst),
+    ]
+    matched = np.zeros_like(base)
+    values = np.zeros_like(ratio)
+    for condition, case_values in cases:
+        hit = condition & ~matched
+        values = np.where(hit, case_values, values)
+        matched |= hit
+
+    found, index = _last_true(base & matched)
+    return found, _take(values, index), index
+
+
+# Vectorized implementations keyed by MetricConfig.key. Metrics missing here
+# fall back to their per-stock calculator.
+VECTORIZED_METRICS: Dict[str, Callable[[QuarterlyPanel], Tuple[np.ndarray, np.ndarray, np.ndarray]]] = {
+    "ebit_ppe": ebit_ppe,
+    "gross_margin": gross_margin,
+    "operating_margin": operating_margin,
+    "revenue_growth": revenue_growth,
+    "growth_consistency": growth_consistency,
+    "operating_margin_growth": operating_margin_growth,
+    "operating_margin_consistency": operating_margin_consistency,
+    "net_debt_to_ttm_operating_income": net_debt_to_ttm_operating_income,
+}
+
+
+def has_metric(key: str) -> bool:
+    """Whether a metric key has a vectorized implementation."""
+    return key in VECTORIZED_METRICS
+
+
+def compute_metric(panel: QuarterlyPanel, key: str) -> Optional[List[Optional[Tuple[float, str]]]]:
+    """
+    Compute one metric for every stock in the panel.
+
+    Returns:
+        List of (value, period) or None per stock, or None if the metric has no
+        vectorized implementation
+    """
+    calculator = VECTORIZED_METRICS.get(key)
+    if calculator is None:
+        return None
+    found, values, index = calculator(panel)
+    results: List[Optional[Tuple[float, str]]] = [None] * len(panel)
+    for i in np.nonzero(found)[0]:
+        period = panel.period_dates[i][index[i]]
+        if isinstance(period, np.generic):
+            period = period.item()  # Period tables stored as NumPy string arrays
+        results[i] = (float(values[i]), period)
+    return results
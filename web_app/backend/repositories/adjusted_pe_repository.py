@@ -2,12 +2,13 @@
 """
 Repository for adjusted PE data access.
 """
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, List, Tuple
 import sys
 import os
 sys.path.insert(0, os.path.dirname(__file__))
 
 from base_repository import BaseRepository, DB_PATH
+from ui_cache_repository import company_changed
 
 class AdjustedPERepository(BaseRepository):
     """Repository for adjusted PE calculations database operations."""
@@ -29,6 +30,19 @@ class AdjustedPERepository(BaseRepository):
         """
         return self.execute_single(query, (ticker.upper(),))
 
+    def get_adjusted_pe_by_tickers(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get adjusted PE data for several tickers in one query, keyed by uppercase ticker."""
+        unique_tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+        if not unique_tickers:
+            return {}
+        placeholders = ', '.join('?' for _ in unique_tickers)
+        query = f"""
+            SELECT ap.*, c.ticker AS ticker FROM adjusted_pe_calculations ap
+            JOIN companies c ON ap.company_id = c.id
+            WHERE c.ticker IN ({placeholders})
+        """
+        return {row.pop('ticker'): row for row in self.execute_query(query, tuple(unique_tickers))}
+
     def upsert_adjusted_pe(self, ticker: str, breakdown: Dict[str, Any], ratio: float, timestamp: str) -> bool:
         """Insert or update adjusted PE data."""
         # Get company_id
@@ -70,7 +84,7 @@ class AdjustedPERepository(BaseRepository):
                 SET {', '.join(set_clauses)}
                 WHERE company_id = ?
             """
-            return self.execute_update(query, tuple(values)) > 0
+            updated = self.execute_update(query, tuple(values)) > 0
         else:
             # Insert
             columns = list(data.keys())
@@ -81,7 +95,10 @@ class AdjustedPERepository(BaseRepository):
                 INSERT INTO adjusted_pe_calculations (company_id, {', '.join(columns)})
                 VALUES (?, {placeholders})
             """
-            return self.execute_insert(query, [company_id] + values) > 0
+            updated = self.execute_insert(query, [company_id] + values) > 0
+
+        company_changed(self.db_path, company_id)
+        return updated
 
     def get_adjusted_pe_ratio_only(self, ticker: str) -> Optional[float]:
         """Get just the adjusted PE ratio for a ticker."""
@@ -99,4 +116,6 @@ class AdjustedPERepository(BaseRepository):
     def delete_adjusted_pe(self, company_id: int) -> bool:
         """Delete adjusted PE data for a company."""
         query = "DELETE FROM adjusted_pe_calculations WHERE company_id = ?"
-        return self.execute_update(query, (company_id,)) > 0
\ No newline at end of file
+        deleted = self.execute_update(query, (company_id,)) > 0
+        company_changed(self.db_path, company_id)
+        return deleted
\ No newline at end of file
@@ -8,6 +8,7 @@ import os
 sys.path.insert(0, os.path.dirname(__file__))
 
 from base_repository import BaseRepository, DB_PATH
+from ui_cache_repository import company_changed
 
 class AIScoresRepository(BaseRepository):
     """Repository for AI scores database operations."""
@@ -44,7 +45,7 @@ class AIScoresRepository(BaseRepository):
                 SET {', '.join(set_clauses)}, last_updated = CURRENT_TIMESTAMP
                 WHERE company_id = ?
             """
-            return self.execute_update(query, tuple(values)) > 0
+            updated = self.execute_update(query, tuple(values)) > 0
         else:
             # Insert new
             columns = list(scores.keys())
@@ -55,7 +56,10 @@ class AIScoresRepository(BaseRepository):
                 INSERT INTO ai_scores (company_id, {', '.join(columns)}, last_updated)
                 VALUES (?, {placeholders}, CURRENT_TIMESTAMP)
             """
-            return self.execute_insert(query, [company_id] + values) > 0
+            updated = self.execute_insert(query, [company_id] + values) > 0
+
+        company_changed(self.db_path, company_id)
+        return updated
 
     def get_all_ai_scores(self, limit: int = None, offset: int = 0) -> List[Dict[str, Any]]:
         """Get all AI scores with company information."""
@@ -79,4 +83,6 @@ class AIScoresRepository(BaseRepository):
     def delete_ai_scores(self, company_id: int) -> bool:
         """Delete AI scores for a company."""
         query = "DELETE FROM ai_scores WHERE company_id = ?"
-        return self.execute_update(query, (company_id,)) > 0
\ No newline at end of file
+        deleted = self.execute_update(query, (company_id,)) > 0
+        company_changed(self.db_path, company_id)
+        return deleted
\ No newline at end of file
@@ -4,27 +4,51 @@ Base repository class with common database operations.
 """
 import sqlite3
 import os
+import sys
 from typing import Optional, Dict, Any, List
 from contextlib import contextmanager
 
+# Import the pool module by its plain name so every copy of this module
+# (package and sys.path imports) shares one pool registry
+sys.path.insert(0, os.path.dirname(__file__))
+from connection_pool import ConnectionPool, get_pool, close_all_pools
+
 # Database path
 DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'consolidated.db')
 
 class BaseRepository:
     """Base repository class with common database operations."""
 
-    def __init__(self, db_path: str = DB_PATH):
+    def __init__(self, db_path: str = DB_PATH, pool_size: Optional[int] = None):
         self.db_path = db_path
+        self.pool_size = pool_size
+
+    @property
+    def pool(self) -> Optional[ConnectionPool]:
+        """Shared connection pool for this repository's database (None for in-memory databases)."""
+        if self.db_path == ':memory:':
+            return None
+        return get_pool(self.db_path, self.pool_size)
 
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        """Context manager for database connections, borrowed from the shared pool."""
+        pool = self.pool
+        if pool is None:
+            # Each in-memory connection is its own database, so pooling would change behaviour
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            try:
+                yield conn
+            finally:
+                conn.close()
+            return
+
+        conn = pool.acquire()
         try:
             yield conn
         finally:
-            conn.close()
+            pool.release(conn)
 
     @contextmanager
     def get_cursor(self):
@@ -5,13 +5,19 @@ Repository for company data access.
 from typing import Optional, Dict, Any, List
 import sys
 import os
+import zlib
 sys.path.insert(0, os.path.dirname(__file__))
 
 from base_repository import BaseRepository, DB_PATH
+from ui_cache_repository import company_changed
 
 class CompanyRepository(BaseRepository):
     """Repository for company-related database operations."""
 
+    # Bumped on every write made through this class, so in-process caches of
+    # companies and ticker aliases can tell they are stale without a query
+    change_count = 0
+
     def __init__(self, db_path: str = DB_PATH):
         super().__init__(db_path)
 
@@ -25,6 +31,18 @@ class CompanyRepository(BaseRepository):
         """
         return self.execute_single(query, (ticker.upper(),))
 
+    def get_company_ids_by_tickers(self, tickers: List[str], chunk_size: int = 500) -> Dict[str, int]:
+        """Map ticker symbols to company IDs, one query per chunk; unknown tickers are omitted."""
+        unique_tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+        ids = {}
+        for i in range(0, len(unique_tickers), chunk_size):
+            chunk = unique_tickers[i:i + chunk_size]
+            placeholders = ', '.join('?' for _ in chunk)
+            rows = self.execute_query(f"SELECT id, ticker FROM companies WHERE ticker IN ({placeholders})", tuple(chunk))
+            for row in rows:
+                ids.setdefault(row['ticker'], row['id'])
+        return ids
+
     def get_company_by_id(self, company_id: int) -> Optional[Dict[str, Any]]:
         """Get company by ID."""
         query = """
@@ -76,6 +94,7 @@ class CompanyRepository(BaseRepository):
             VALUES (?, ?, ?)
         """, (company_id, ticker.upper(), True))
 
+        CompanyRepository.change_count += 1
         return company_id
 
     def update_company(self, company_id: int, **updates) -> bool:
@@ -91,7 +110,48 @@ class CompanyRepository(BaseRepository):
             SET {', '.join(set_clauses)}, updated_at = CURRENT_TIMESTAMP
             WHERE id = ?
         """
-        return self.execute_update(query, tuple(values)) > 0
+        updated = self.execute_update(query, tuple(values)) > 0
+        CompanyRepository.change_count += 1
+        company_changed(self.db_path, company_id)
+        return updated
+
+    def get_search_entries(self) -> List[Dict[str, Any]]:
+        """Get every company's ticker, name and ticker aliases, for building a search index."""
+        companies = {}
+        for row in self.execute_query("SELECT id, ticker, company_name FROM companies ORDER BY ticker"):
+            companies[row['id']] = {'ticker': row['ticker'], 'company_name': row['company_name'], 'aliases': []}
+        try:
+            aliases = self.execute_query("SELECT company_id, ticker FROM ticker_aliases")
+        except Exception as e:
+            print(f"Ticker aliases unavailable for search: {e}")
+            aliases = []
+        for row in aliases:
+            company = companies.get(row['company_id'])
+            if company and row['ticker'] and row['ticker'] != company['ticker']:
+                company['aliases'].append(row['ticker'])
+        return list(companies.values())
+
+    def get_search_signature(self) -> tuple:
+        """
+        Get a cheap fingerprint of companies and ticker aliases that changes when either does.
+
+        Covers writes from other processes too: a checksum of every ticker and
+        name catches renames that keep the row count and lengths, and
+        MAX(updated_at) catches edits made through update_company.
+        """
+        row = self.execute_single("""
+            SELECT COUNT(*) AS count, MAX(id) AS max_id, MAX(updated_at) AS updated_at,
+                   group_concat(ticker || '|' || IFNULL(company_name, ''), char(10)) AS names
+            FROM (SELECT id, ticker, company_name, updated_at FROM companies ORDER BY id)
+        """)
+        names_checksum = zlib.crc32((row['names'] or '').encode('utf-8'))
+        signature = (row['count'], row['max_id'], row['updated_at'], names_checksum)
+        try:
+            row = self.execute_single("SELECT COUNT(*) AS count, MAX(rowid) AS max_id FROM ticker_aliases")
+            signature += (row['count'], row['max_id'])
+        except Exception:
+            pass
+        return signature
 
     def get_company_tickers(self, company_id: int) -> List[str]:
         """Get all ticker aliases for a company."""
@@ -111,4 +171,6 @@ class CompanyRepository(BaseRepository):
             INSERT INTO ticker_aliases (company_id, ticker, is_primary)
             VALUES (?, ?, ?)
         """
-        return self.execute_insert(query, (company_id, ticker.upper(), is_primary)) > 0
\ No newline at end of file
+        inserted = self.execute_insert(query, (company_id, ticker.upper(), is_primary)) > 0
+        CompanyRepository.change_count += 1
+        return inserted
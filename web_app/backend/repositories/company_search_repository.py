@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Repository for full-text company search.
+"""
+import re
+from typing import List, Dict, Any, Optional
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+from base_repository import BaseRepository, DB_PATH
+
+# bm25 weights for ticker, company_name, sector, industry and aliases
+COLUMN_WEIGHTS = (10.0, 5.0, 1.0, 2.0, 8.0)
+
+_TOKEN = re.compile(r'\w+')
+
+# Aliases of one company as a space separated list, for the aliases column
+_ALIASES_SQL = "(SELECT group_concat(ticker, ' ') FROM ticker_aliases WHERE company_id = {id})"
+
+
+def build_match_query(text: str, prefix: bool = True) -> Optional[str]:
+    """
+    Turn free text into an FTS5 query that matches every word.
+
+    Words are quoted, so FTS5 operators and punctuation in user input are
+    treated as plain text. With prefix, each word also matches longer words
+    ("semi" matches "Semiconductors").
+    """
+    tokens = _TOKEN.findall((text or '').lower())
+    if not tokens:
+        return None
+    suffix = '*' if prefix else ''
+    return ' '.join(f'"{token}"{suffix}' for token in tokens)
+
+
+class CompanySearchRepository(BaseRepository):
+    """
+    Repository for the company_search FTS5 table.
+
+    The table holds one row per company, keyed by companies.id, with its
+    ticker, name, sector, industry and ticker aliases. Triggers on companies
+    and ticker_aliases keep it in sync, so it only needs populating once.
+    """
+
+    def __init__(self, db_path: str = DB_PATH):
+        super().__init__(db_path)
+        self._table_ready = False
+
+    def ensure_table(self) -> None:
+        """Create the search table and its triggers, populating it on first creation."""
+        if self._table_ready:
+            return
+        with self.get_cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'company_search'")
+            exists = cursor.fetchone() is not None
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS company_search USING fts5(
+                    ticker, company_name, sector, industry, aliases,
+                    tokenize = 'unicode61 remove_diacritics 2',
+                    prefix = '2 3'
+                )
+            """)
+            insert_new = f"""
+                INSERT INTO company_search (rowid, ticker, company_name, sector, industry, aliases)
+                VALUES (new.id, new.ticker, new.company_name, new.sector, new.industry,
+                        {_ALIASES_SQL.format(id='new.id')});
+            """
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS company_search_insert AFTER INSERT ON companies BEGIN
+                    {insert_new}
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS company_search_update AFTER UPDATE ON companies BEGIN
+                    DELETE FROM company_search WHERE rowid = old.id;
+                    {insert_new}
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS company_search_delete AFTER DELETE ON companies BEGIN
+                    DELETE FROM company_search WHERE rowid = old.id;
+                END
+            """)
+            for event, row in (('INSERT', 'new'), ('UPDATE', 'new'), ('DELETE', 'old')):
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS company_search_alias_{event.lower()}
+                    AFTER {event} ON ticker_aliases BEGIN
+                        UPDATE company_search SET aliases = {_ALIASES_SQL.format(id=f'{row}.company_id')}
+                        WHERE rowid = {row}.company_id;
+                    END
+                """)
+            # An alias moving to another company also changes the old one
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS company_search_alias_move
+                AFTER UPDATE OF company_id ON ticker_aliases WHEN old.company_id != new.company_id BEGIN
+                    UPDATE company_search SET aliases = {_ALIASES_SQL.format(id='old.company_id')}
+                    WHERE rowid = old.company_id;
+                END
+            """)
+            if not exists:
+                self._populate(cursor)
+        self._table_ready = True
+
+    @staticmethod
+    def _populate(cursor) -> None:
+        cursor.execute("DELETE FROM company_search")
+        cursor.execute(f"""
+            INSERT INTO company_search (rowid, ticker, company_name, sector, industry, aliases)
+            SELECT c.id, c.ticker, c.company_name, c.sector, c.industry, {_ALIASES_SQL.format(id='c.id')}
+            FROM companies c
+        """)
+
+    def rebuild(self) -> int:
+        """Repopulate the search table from companies. Returns the number of rows indexed."""
+        self.ensure_table()
+        with self.get_cursor() as cursor:
+            self._populate(cursor)
+            cursor.execute("SELECT COUNT(*) AS count FROM company_search")
+            return cursor.fetchone()['count']
+
+    def search(self, text: str, limit: int = 10, sector: str = None, industry: str = None,
+               prefix: bool = True) -> List[Dict[str, Any]]:
+        """
+        Full-text search over tickers, names, sectors, industries and aliases.
+
+        Args:
+            text: Free text; every word must match
+            limit: Maximum number of results
+            sector: Only return companies in this sector (case-insensitive)
+            industry: Only return companies in this industry (case-insensitive)
+            prefix: Let each word match as a prefix
+
+        Returns:
+            Companies ordered by bm25 relevance (best first), then ticker
+        """
+        match = build_match_query(text, prefix)
+        if match is None:
+            return []
+        self.ensure_table()
+
+        filters = []
+        params = [match]
+        if sector:
+            filters.append("AND c.sector = ? COLLATE NOCASE")
+            params.append(sector)
+        if industry:
+            filters.append("AND c.industry = ? COLLATE NOCASE")
+            params.append(industry)
+        params.append(limit)
+
+        weights = ', '.join(str(w) for w in COLUMN_WEIGHTS)
+        query = f"""
+            SELECT c.ticker, c.company_name, c.sector, c.industry,
+                   bm25(company_search, {weights}) AS score
+            FROM company_search
+            JOIN companies c ON c.id = company_search.rowid
+            WHERE company_search MATCH ?
+            {' '.join(filters)}
+            ORDER BY score, c.ticker
+            LIMIT ?
+        """
+        return self.execute_query(query, tuple(params))
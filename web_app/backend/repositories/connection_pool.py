@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+SQLite connection pooling shared by all repositories.
+"""
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+# Maximum number of open connections per database file
+POOL_SIZE = 8
+
+# Seconds to wait for a free connection before giving up
+POOL_TIMEOUT = 30.0
+
+# Seconds SQLite waits on a locked database before raising
+BUSY_TIMEOUT = 10.0
+
+
+class PoolClosedError(RuntimeError):
+    """Raised when acquiring a connection from a pool that has been closed."""
+
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections for a single database file."""
+
+    def __init__(self, db_path: str, max_size: int = POOL_SIZE, timeout: float = POOL_TIMEOUT):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+        # File identity each checked-out connection was opened against, keyed by id(conn)
+        self._checked_out = {}
+
+    def _file_identity(self):
+        """Return (device, inode) of the database file, or None if it doesn't exist."""
+        try:
+            stat = os.stat(self.db_path)
+            return (stat.st_dev, stat.st_ino)
+        except OSError:
+            return None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new connection configured for pooled use."""
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _is_healthy(self, conn: sqlite3.Connection, identity) -> bool:
+        """Check that a pooled connection is usable and still points at the same file."""
+        # The file was deleted or replaced since the connection was opened
+        if identity != self._file_identity():
+            return False
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        """Close a connection and free its slot."""
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._created -= 1
+
+    def acquire(self) -> sqlite3.Connection:
+        """Take a healthy connection from the pool, opening one if below capacity."""
+        while True:
+            if self._closed:
+                raise PoolClosedError(f"Connection pool for {self.db_path} is closed")
+
+            try:
+                conn, identity = self._idle.get_nowait()
+            except queue.Empty:
+                conn = None
+
+            if conn is None:
+                with self._lock:
+                    can_create = self._created < self.max_size
+                    if can_create:
+                        self._created += 1
+                if can_create:
+                    try:
+                        conn = self._connect()
+                    except Exception:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                    self._checked_out[id(conn)] = self._file_identity()
+                    return conn
+                try:
+                    conn, identity = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise TimeoutError(
+                        f"Timed out after {self.timeout}s waiting for a connection to {self.db_path}"
+                    )
+
+            if self._is_healthy(conn, identity):
+                self._checked_out[id(conn)] = identity
+                return conn
+            self._discard(conn)
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Return a connection to the pool, discarding it if it can't be reused."""
+        identity = self._checked_out.pop(id(conn), None)
+        if self._closed:
+            self._discard(conn)
+            return
+        try:
+            # Never hand out a connection with a transaction left open
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+        self._idle.put((conn, identity))
+
+    def close(self) -> None:
+        """Close all idle connections and refuse further acquisitions."""
+        self._closed = True
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    @property
+    def size(self) -> int:
+        """Number of connections currently open (idle or checked out)."""
+        return self._created
+
+    @property
+    def idle_count(self) -> int:
+        """Number of connections waiting in the pool."""
+        return self._idle.qsize()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str, max_size: Optional[int] = None) -> ConnectionPool:
+    """
+    Get the shared pool for a database file, creating it on first use.
+
+    max_size only applies when the pool is created; later callers share the
+    existing pool whatever size they ask for, with a warning if it differs.
+    """
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.closed:
+            pool = ConnectionPool(db_path, max_size=max_size or POOL_SIZE)
+            _pools[key] = pool
+        elif max_size and max_size != pool.max_size:
+            print(f"Warning: connection pool for {db_path} already exists with max_size={pool.max_size}; "
+                  f"ignoring requested max_size={max_size}")
+        return pool
+
+
+def close_all_pools() -> None:
+    """Close every shared pool. Registered to run at interpreter exit."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_all_pools)
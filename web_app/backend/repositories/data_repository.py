@@ -9,7 +9,11 @@ import os
 sys.path.insert(0, os.path.dirname(__file__))
 
 from base_repository import DB_PATH
+from record_cache import get_record_cache
+from ui_cache_repository import (UICacheRepository, company_changed, companies_changed, is_row_stale,
+                                 two_year_annualized_growth)
 from company_repository import CompanyRepository
+from company_search_repository import CompanySearchRepository
 from ai_scores_repository import AIScoresRepository
 from financial_scores_repository import FinancialScoresRepository
 from adjusted_pe_repository import AdjustedPERepository
@@ -17,48 +21,69 @@ from adjusted_pe_repository import AdjustedPERepository
 class DataRepository(BaseRepository):
     """Repository for accessing complete company data across all tables."""
 
+    # SQLite's default limit on bound parameters is 999 on older builds
+    BATCH_CHUNK_SIZE = 500
+
     def __init__(self, db_path: str = DB_PATH):
         super().__init__(db_path)
         self.company_repo = CompanyRepository(db_path)
+        self.company_search_repo = CompanySearchRepository(db_path)
+        self.ui_cache_repo = UICacheRepository(db_path)
         self.ai_scores_repo = AIScoresRepository(db_path)
         self.financial_scores_repo = FinancialScoresRepository(db_path)
         self.adjusted_pe_repo = AdjustedPERepository(db_path)
         self.watchlist_repo = None  # Will be set by service layer
+        self._ai_score_columns = None
+
+    def _get_ai_score_columns(self) -> List[str]:
+        """Get (and cache) the column names of the ai_scores table."""
+        if self._ai_score_columns is None:
+            columns_info = self.execute_query("PRAGMA table_info(ai_scores)")
+            self._ai_score_columns = [col['name'] for col in columns_info]
+        return self._ai_score_columns
+
+    def _complete_data_query(self, ticker_count: int) -> str:
+        """Build the joined query behind get_complete_data for a number of tickers."""
+        # ai_scores columns are aliased with a prefix so they can't collide with companies columns
+        ai_columns = ''.join(f', ais."{col}" AS "ais__{col}"' for col in self._get_ai_score_columns())
+        placeholders = ', '.join('?' for _ in range(ticker_count))
+        return f"""
+            SELECT
+                c.*,
+                ais.company_id IS NOT NULL AS has_ai_scores{ai_columns},
+                fs.company_id IS NOT NULL AS has_financial_scores,
+                fs.total_percentile AS fs__total_percentile,
+                fs.total_rank AS fs__total_rank,
+                ap.company_id IS NOT NULL AS has_adjusted_pe,
+                ap.adjusted_pe_ratio AS ap__adjusted_pe_ratio,
+                ge.company_id IS NOT NULL AS has_growth_estimates,
+                ge.current_year_growth AS ge__current_year_growth,
+                ge.next_year_growth AS ge__next_year_growth,
+                si.company_id IS NOT NULL AS has_short_interest,
+                si.short_float AS si__short_float,
+                si.scraped_at AS si__scraped_at
+            FROM companies c
+            LEFT JOIN ai_scores ais ON ais.company_id = c.id
+            LEFT JOIN financial_scores fs ON fs.company_id = c.id
+            LEFT JOIN adjusted_pe_calculations ap ON ap.company_id = c.id
+            LEFT JOIN growth_estimates ge ON ge.company_id = c.id
+            LEFT JOIN short_interest si ON si.company_id = c.id
+            WHERE c.ticker IN ({placeholders})
+        """
 
-    def get_complete_data(self, ticker: str) -> Optional[Dict[str, Any]]:
-        """Get complete data for a ticker (equivalent to old get_complete_data function)."""
-        # Get company info
-        company = self.company_repo.get_company_by_ticker(ticker)
-        if not company:
-            return None
-
-        company_id = company['id']
-
-        # Get AI scores
-        ai_scores = self.ai_scores_repo.get_ai_scores_by_company_id(company_id)
-
-        # Get financial scores
-        financial_scores = self.financial_scores_repo.get_financial_scores_by_company_id(company_id)
-
-        # Get adjusted PE
-        adjusted_pe = self.adjusted_pe_repo.get_adjusted_pe_by_company_id(company_id)
-
-        # Get growth estimates
-        growth_query = "SELECT * FROM growth_estimates WHERE company_id = ?"
-        growth_data = self.execute_single(growth_query, (company_id,))
-
-        # Get short interest
-        short_interest_query = "SELECT * FROM short_interest WHERE company_id = ?"
-        short_interest_data = self.execute_single(short_interest_query, (company_id,))
+    def _build_complete_data(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Shape one joined row into the get_complete_data result dict."""
+        ai_scores = None
+        if row['has_ai_scores']:
+            ai_scores = {col: row[f'ais__{col}'] for col in self._get_ai_score_columns()}
 
-        # Combine all data
         result = {
-            'ticker': company['ticker'],
-            'company_name': company['company_name'],
-            'exchange': company.get('exchange'),
-            'sector': company.get('sector'),
-            'industry': company.get('industry'),
-            'last_updated': company.get('updated_at') or ai_scores.get('last_updated') if ai_scores else None,
+            'ticker': row['ticker'],
+            'company_name': row['company_name'],
+            'exchange': row.get('exchange'),
+            'sector': row.get('sector'),
+            'industry': row.get('industry'),
+            'last_updated': row.get('updated_at') or ai_scores.get('last_updated') if ai_scores else None,
         }
 
         # Add AI scores
@@ -68,27 +93,113 @@ class DataRepository(BaseRepository):
             result.pop('last_updated', None)
 
         # Add financial scores
-        if financial_scores:
-            result['financial_total_percentile'] = financial_scores.get('total_percentile')
-            result['financial_total_rank'] = financial_scores.get('total_rank')
+        if row['has_financial_scores']:
+            result['financial_total_percentile'] = row['fs__total_percentile']
+            result['financial_total_rank'] = row['fs__total_rank']
 
         # Add adjusted PE
-        if adjusted_pe:
-            result['adjusted_pe_ratio'] = adjusted_pe.get('adjusted_pe_ratio')
-            result['current_year_growth'] = growth_data.get('current_year_growth') if growth_data else None
-            result['next_year_growth'] = growth_data.get('next_year_growth') if growth_data else None
+        if row['has_adjusted_pe']:
+            result['adjusted_pe_ratio'] = row['ap__adjusted_pe_ratio']
+            has_growth = row['has_growth_estimates']
+            result['current_year_growth'] = row['ge__current_year_growth'] if has_growth else None
+            result['next_year_growth'] = row['ge__next_year_growth'] if has_growth else None
 
         # Add short interest
-        if short_interest_data:
-            result['short_float'] = short_interest_data.get('short_float')
-            result['short_interest_scraped_at'] = short_interest_data.get('scraped_at')
+        if row['has_short_interest']:
+            result['short_float'] = row['si__short_float']
+            result['short_interest_scraped_at'] = row['si__scraped_at']
 
         return result
 
+    def get_complete_data(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """Get complete data for a ticker (equivalent to old get_complete_data function)."""
+        ticker = ticker.upper()
+        return self.get_complete_data_many([ticker]).get(ticker)
+
+    def get_complete_data_many(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get complete data for several tickers in one query per chunk.
+
+        Args:
+            tickers: Ticker symbols (case-insensitive)
+
+        Records are served from the shared record cache when fresh; write paths
+        that change a company's data invalidate its cached record.
+
+        Returns:
+            Dictionary mapping uppercase ticker to its complete data; unknown tickers are omitted
+        """
+        unique_tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+        results = {}
+        cache = self.record_cache
+        if cache is not None:
+            for ticker in unique_tickers:
+                cached = cache.get(ticker)
+                if cached is not None:
+                    results[ticker] = cached
+            unique_tickers = [t for t in unique_tickers if t not in results]
+            token = cache.begin_load()
+
+        for i in range(0, len(unique_tickers), self.BATCH_CHUNK_SIZE):
+            chunk = unique_tickers[i:i + self.BATCH_CHUNK_SIZE]
+            rows = self.execute_query(self._complete_data_query(len(chunk)), tuple(chunk))
+            for row in rows:
+                if row['ticker'] not in results:
+                    results[row['ticker']] = self._build_complete_data(row)
+                    if cache is not None:
+                        cache.put(row['ticker'], results[row['ticker']], row['id'], token)
+        return results
+
+    @property
+    def record_cache(self):
+        """Shared cache of complete data records for this database (None for in-memory databases)."""
+        if self.db_path == ':memory:':
+            return None
+        return get_record_cache(self.db_path)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics of the complete data cache."""
+        cache = self.record_cache
+        return cache.get_stats() if cache is not None else {}
+
     def get_ui_cache_data(self, ticker: str) -> Optional[Dict[str, Any]]:
-        """Get data in the format expected by the UI cache view."""
-        query = "SELECT * FROM ui_cache WHERE ticker = ?"
-        return self.execute_single(query, (ticker.upper(),))
+        """
+        Get data in the format expected by the UI cache view.
+
+        Served by a primary-key lookup on ui_cache when the table exists. A
+        missing or stale row is computed from the source tables and stored for
+        next time.
+        """
+        table_exists = self.ui_cache_repo.table_exists()
+        if table_exists:
+            row = self.ui_cache_repo.get_row(ticker)
+            if not is_row_stale(row):
+                return row
+        row = self.ui_cache_repo.compute_row(ticker)
+        if row and table_exists:
+            self.ui_cache_repo.refresh_companies([row['company_id']])
+        return row
+
+    def get_ui_cache_data_many(self, tickers: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Get ui_cache rows for several tickers, keyed by uppercase ticker.
+
+        Stale rows are recomputed from the source tables first. Tickers without
+        a row are omitted, and None is returned if the ui_cache table doesn't
+        exist, so callers can fall back to get_complete_data_many.
+        """
+        if not self.ui_cache_repo.table_exists():
+            return None
+        rows = self.ui_cache_repo.get_rows(tickers)
+        outdated = [row['company_id'] for row in rows.values() if is_row_stale(row)]
+        if outdated:
+            self.ui_cache_repo.refresh_companies(outdated)
+            rows = self.ui_cache_repo.get_rows(tickers)
+        return rows
+
+    def rebuild_ui_cache(self) -> int:
+        """Recompute every ui_cache row, creating the table if needed. Returns the row count."""
+        return self.ui_cache_repo.rebuild()
 
     def get_scores_data(self, ticker: str) -> Optional[Dict[str, Any]]:
         """Get data in the format expected by the scores view."""
@@ -117,6 +228,27 @@ class DataRepository(BaseRepository):
         """
         return self.execute_query(sql_query, (search_pattern, search_pattern, search_pattern, search_pattern, limit))
 
+    def search_companies_fulltext(self, query: str, limit: int = 10, sector: str = None,
+                                  industry: str = None) -> List[Dict[str, Any]]:
+        """Full-text search companies by words in ticker, name, sector, industry or aliases."""
+        rows = self.company_search_repo.search(query, limit=limit, sector=sector, industry=industry)
+        for row in rows:
+            row['match_type'] = 'fulltext'
+            row['priority'] = 3
+        return rows
+
+    def get_search_entries(self) -> List[Dict[str, Any]]:
+        """Get tickers, company names and aliases for the in-memory search index."""
+        return self.company_repo.get_search_entries()
+
+    def get_companies_change_count(self) -> int:
+        """Get the number of company writes made in this process, without a query."""
+        return CompanyRepository.change_count
+
+    def get_search_signature(self) -> tuple:
+        """Get a fingerprint of the companies table for search index refreshes."""
+        return self.company_repo.get_search_signature()
+
     def get_all_scores(self) -> List[Dict[str, Any]]:
         """Get all AI scores with company info."""
         return self.ai_scores_repo.get_all_ai_scores()
@@ -141,13 +273,16 @@ class DataRepository(BaseRepository):
                 SET current_year_growth = ?, next_year_growth = ?, last_updated = ?, calculation_status = ?
                 WHERE company_id = ?
             """
-            return self.execute_update(query, (current_year, next_year, timestamp, status, company_id)) > 0
+            updated = self.execute_update(query, (current_year, next_year, timestamp, status, company_id)) > 0
         else:
             query = """
                 INSERT INTO growth_estimates (company_id, current_year_growth, next_year_growth, last_updated, calculation_status)
                 VALUES (?, ?, ?, ?, ?)
             """
-            return self.execute_insert(query, (company_id, current_year, next_year, timestamp, status)) > 0
+            updated = self.execute_insert(query, (company_id, current_year, next_year, timestamp, status)) > 0
+
+        company_changed(self.db_path, company_id)
+        return updated
 
     def upsert_short_interest(self, ticker: str, short_float: Optional[str], status: Optional[str] = None) -> bool:
         """Insert or update short interest for a ticker."""
@@ -169,32 +304,58 @@ class DataRepository(BaseRepository):
                 SET short_float = ?, scraped_at = ?, last_updated = ?, calculation_status = ?
                 WHERE company_id = ?
             """
-            return self.execute_update(query, (short_float, timestamp, timestamp, status, company_id)) > 0
+            updated = self.execute_update(query, (short_float, timestamp, timestamp, status, company_id)) > 0
         else:
             query = """
                 INSERT INTO short_interest (company_id, short_float, scraped_at, last_updated, calculation_status)
                 VALUES (?, ?, ?, ?, ?)
             """
-            return self.execute_insert(query, (company_id, short_float, timestamp, timestamp, status)) > 0
-
-    def calculate_two_year_annualized_growth(self, current_year_growth: float, next_year_growth: float) -> Optional[float]:
-        """Calculate 2-year annualized growth rate."""
-        try:
-            if current_year_growth is None or next_year_growth is None:
-                return None
+            updated = self.execute_insert(query, (company_id, short_float, timestamp, timestamp, status)) > 0
 
-            # Convert percentages to decimal multipliers
-            current_multiplier = 1 + (current_year_growth / 100)
-            next_multiplier = 1 + (next_year_growth / 100)
+        company_changed(self.db_path, company_id)
+        return updated
 
-            # Calculate compound growth over 2 years
-            total_growth = current_multiplier * next_multiplier
+    def bulk_upsert_short_interest(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Insert or update short interest for many tickers in one transaction per chunk.
 
-            # Calculate annualized growth rate (CAGR)
-            cagr = (total_growth ** 0.5) - 1
+        Args:
+            rows: Dicts with ticker, short_float, status and optionally scraped_at
+                (defaults to now); tickers outside the companies table are skipped
 
-            # Convert back to percentage
-            return cagr * 100
+        Returns:
+            int: Number of rows stored
+        """
+        from datetime import datetime
+        timestamp = datetime.now().isoformat()
+        company_ids = self.company_repo.get_company_ids_by_tickers([row['ticker'] for row in rows])
+
+        # Last row wins for a repeated ticker, as with repeated upsert_short_interest calls
+        by_company = {}
+        for row in rows:
+            company_id = company_ids.get(row['ticker'].upper())
+            if company_id is not None:
+                by_company[company_id] = (row.get('short_float'), row.get('scraped_at') or timestamp,
+                                          timestamp, row.get('status'), company_id)
+
+        values = list(by_company.values())
+        for i in range(0, len(values), self.BATCH_CHUNK_SIZE):
+            chunk = values[i:i + self.BATCH_CHUNK_SIZE]
+            with self.get_cursor() as cursor:
+                cursor.executemany("""
+                    UPDATE short_interest
+                    SET short_float = ?, scraped_at = ?, last_updated = ?, calculation_status = ?
+                    WHERE company_id = ?
+                """, chunk)
+                cursor.executemany("""
+                    INSERT INTO short_interest (short_float, scraped_at, last_updated, calculation_status, company_id)
+                    SELECT ?, ?, ?, ?, ?
+                    WHERE NOT EXISTS (SELECT 1 FROM short_interest WHERE company_id = ?)
+                """, [params + (params[-1],) for params in chunk])
+
+        companies_changed(self.db_path, by_company.keys())
+        return len(values)
 
-        except (TypeError, ValueError, ZeroDivisionError):
-            return None
\ No newline at end of file
+    def calculate_two_year_annualized_growth(self, current_year_growth: float, next_year_growth: float) -> Optional[float]:
+        """Calculate 2-year annualized growth rate."""
+        return two_year_annualized_growth(current_year_growth, next_year_growth)
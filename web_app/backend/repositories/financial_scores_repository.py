@@ -8,12 +8,40 @@ import os
 sys.path.insert(0, os.path.dirname(__file__))
 
 from base_repository import BaseRepository, DB_PATH
+from ui_cache_repository import company_changed, all_companies_changed
 
 class FinancialScoresRepository(BaseRepository):
     """Repository for financial scores database operations."""
 
     def __init__(self, db_path: str = DB_PATH):
         super().__init__(db_path)
+        self._columns = None
+
+    def get_columns(self) -> List[str]:
+        """Get (and cache) the column names of the financial_scores table."""
+        if self._columns is None:
+            columns_info = self.execute_query("PRAGMA table_info(financial_scores)")
+            self._columns = [col['name'] for col in columns_info]
+        return self._columns
+
+    def ensure_columns(self, column_types: Dict[str, str]) -> List[str]:
+        """
+        Add columns missing from the financial_scores table.
+
+        Args:
+            column_types: Column name -> SQLite type (e.g. {'ebit_ppe': 'REAL'})
+
+        Returns:
+            List[str]: The columns that were added
+        """
+        existing = set(self.get_columns())
+        added = [name for name in column_types if name not in existing]
+        if added:
+            with self.get_cursor() as cursor:
+                for name in added:
+                    cursor.execute(f'ALTER TABLE financial_scores ADD COLUMN "{name}" {column_types[name]}')
+            self._columns = None
+        return added
 
     def get_financial_scores_by_company_id(self, company_id: int) -> Optional[Dict[str, Any]]:
         """Get financial scores for a company."""
@@ -44,7 +72,7 @@ class FinancialScoresRepository(BaseRepository):
                 SET {', '.join(set_clauses)}, last_updated = CURRENT_TIMESTAMP
                 WHERE company_id = ?
             """
-            return self.execute_update(query, tuple(values)) > 0
+            updated = self.execute_update(query, tuple(values)) > 0
         else:
             # Insert new
             columns = list(scores.keys())
@@ -55,7 +83,10 @@ class FinancialScoresRepository(BaseRepository):
                 INSERT INTO financial_scores (company_id, {', '.join(columns)}, last_updated)
                 VALUES (?, {placeholders}, CURRENT_TIMESTAMP)
             """
-            return self.execute_insert(query, [company_id] + values) > 0
+            updated = self.execute_insert(query, [company_id] + values) > 0
+
+        company_changed(self.db_path, company_id)
+        return updated
 
     def get_all_financial_scores(self, limit: int = None, offset: int = 0) -> List[Dict[str, Any]]:
         """Get all financial scores with company information."""
@@ -79,7 +110,9 @@ class FinancialScoresRepository(BaseRepository):
     def delete_financial_scores(self, company_id: int) -> bool:
         """Delete financial scores for a company."""
         query = "DELETE FROM financial_scores WHERE company_id = ?"
-        return self.execute_update(query, (company_id,)) > 0
+        deleted = self.execute_update(query, (company_id,)) > 0
+        company_changed(self.db_path, company_id)
+        return deleted
 
     def get_top_financial_scores(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get top companies by financial score percentile."""
@@ -90,4 +123,53 @@ class FinancialScoresRepository(BaseRepository):
             ORDER BY fs.total_percentile DESC
             LIMIT ?
         """
-        return self.execute_query(query, (limit,))
\ No newline at end of file
+        return self.execute_query(query, (limit,))
+
+    def replace_all_financial_scores(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Publish a complete set of financial scores in one transaction.
+
+        Every row is upserted with executemany, and companies missing from rows
+        lose their scores. Readers see either the previous set or the new one,
+        never a mix of old and new percentiles.
+
+        Args:
+            rows: One dict per company with 'company_id' and the columns to write;
+                  all rows must have the same keys
+
+        Returns:
+            int: Number of companies published
+
+        Raises:
+            ValueError: If rows is empty, which would delete every score
+        """
+        if not rows:
+            raise ValueError("No financial scores to publish; refusing to clear financial_scores")
+        columns = [key for key in rows[0] if key != 'company_id']
+        quoted = ', '.join(f'"{col}"' for col in columns)
+        placeholders = ', '.join('?' for _ in columns)
+        updates = ', '.join(f'"{col}" = excluded."{col}"' for col in columns)
+        upsert = f"""
+            INSERT INTO financial_scores (company_id{', ' if columns else ''}{quoted}, last_updated)
+            VALUES (?{', ' if columns else ''}{placeholders}, CURRENT_TIMESTAMP)
+            ON CONFLICT(company_id) DO UPDATE SET
+                {updates}{', ' if columns else ''}last_updated = excluded.last_updated
+        """
+
+        with self.get_cursor() as cursor:
+            # Take the write lock up front so the whole swap is one atomic step
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("CREATE TEMP TABLE IF NOT EXISTS published_score_ids (company_id INTEGER PRIMARY KEY)")
+            cursor.execute("DELETE FROM published_score_ids")
+            cursor.executemany(
+                "INSERT OR IGNORE INTO published_score_ids (company_id) VALUES (?)",
+                [(row['company_id'],) for row in rows]
+            )
+            cursor.executemany(upsert, [[row['company_id']] + [row[col] for col in columns] for row in rows])
+            cursor.execute("""
+                DELETE FROM financial_scores
+                WHERE company_id NOT IN (SELECT company_id FROM published_score_ids)
+            """)
+            cursor.execute("DELETE FROM published_score_ids")
+        all_companies_changed(self.db_path)
+        return len({row['company_id'] for row in rows})
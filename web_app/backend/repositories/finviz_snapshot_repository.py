@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Repository for stored Finviz quote page snapshots.
+"""
+import json
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+from base_repository import BaseRepository, DB_PATH
+
+class FinvizSnapshotRepository(BaseRepository):
+    """
+    Repository for the finviz_snapshots table.
+
+    Each row holds every label/value pair of one ticker's Finviz snapshot
+    table, as JSON, with the time it was scraped. Rows are keyed by ticker so
+    tickers outside the companies table (e.g. peers) can be stored too.
+    """
+
+    BATCH_CHUNK_SIZE = 500
+
+    def __init__(self, db_path: str = DB_PATH):
+        super().__init__(db_path)
+        self._table_ready = False
+
+    def ensure_table(self) -> None:
+        """Create the finviz_snapshots table if it doesn't exist."""
+        if self._table_ready:
+            return
+        with self.get_cursor() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS finviz_snapshots (
+                    ticker TEXT PRIMARY KEY,
+                    fields TEXT NOT NULL,
+                    scraped_at TEXT NOT NULL
+                )
+            """)
+        self._table_ready = True
+
+    @staticmethod
+    def _from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'ticker': row['ticker'],
+            'fields': json.loads(row['fields']),
+            'scraped_at': row['scraped_at'],
+        }
+
+    def upsert_snapshot(self, ticker: str, fields: Dict[str, str], scraped_at: Optional[str] = None) -> bool:
+        """
+        Store the snapshot fields of a ticker, replacing any previous snapshot.
+
+        Args:
+            ticker: Stock ticker symbol
+            fields: Label to raw value text, as parsed from the page
+            scraped_at: ISO timestamp of the scrape (defaults to now)
+        """
+        self.ensure_table()
+        query = """
+            INSERT INTO finviz_snapshots (ticker, fields, scraped_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(ticker) DO UPDATE SET
+                fields = excluded.fields,
+                scraped_at = excluded.scraped_at
+        """
+        params = (ticker.strip().upper(), json.dumps(fields), scraped_at or datetime.now().isoformat())
+        return self.execute_update(query, params) > 0
+
+    def upsert_snapshots(self, snapshots: List[Dict[str, Any]]) -> int:
+        """
+        Store many snapshots in one transaction.
+
+        Args:
+            snapshots: Dicts with ticker, fields and optionally scraped_at
+
+        Returns:
+            int: Number of snapshots written
+        """
+        self.ensure_table()
+        now = datetime.now().isoformat()
+        params = [(s['ticker'].strip().upper(), json.dumps(s['fields']), s.get('scraped_at') or now)
+                  for s in snapshots]
+        with self.get_cursor() as cursor:
+            cursor.executemany("""
+                INSERT INTO finviz_snapshots (ticker, fields, scraped_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT(ticker) DO UPDATE SET
+                    fields = excluded.fields,
+                    scraped_at = excluded.scraped_at
+            """, params)
+        return len(params)
+
+    def get_snapshot(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """Get the stored snapshot of a ticker: {ticker, fields, scraped_at}, or None."""
+        self.ensure_table()
+        row = self.execute_single(
+            "SELECT ticker, fields, scraped_at FROM finviz_snapshots WHERE ticker = ?", (ticker.strip().upper(),))
+        return self._from_row(row) if row else None
+
+    def get_snapshots(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get stored snapshots of several tickers, keyed by uppercase ticker."""
+        self.ensure_table()
+        unique_tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t))
+        snapshots = {}
+        for i in range(0, len(unique_tickers), self.BATCH_CHUNK_SIZE):
+            chunk = unique_tickers[i:i + self.BATCH_CHUNK_SIZE]
+            placeholders = ', '.join('?' for _ in chunk)
+            rows = self.execute_query(
+                f"SELECT ticker, fields, scraped_at FROM finviz_snapshots WHERE ticker IN ({placeholders})",
+                tuple(chunk))
+            for row in rows:
+                snapshots[row['ticker']] = self._from_row(row)
+        return snapshots
+
+    def get_field(self, ticker: str, label: str) -> Optional[str]:
+        """Get one stored field of a ticker's snapshot (e.g. 'Short Ratio')."""
+        self.ensure_table()
+        row = self.execute_single(
+            "SELECT json_extract(fields, ?) AS value FROM finviz_snapshots WHERE ticker = ?",
+            (f'$."{label}"', ticker.strip().upper()))
+        return row['value'] if row else None
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Repository for background job leases.
+"""
+import time
+from typing import List, Dict, Any, Set
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+from base_repository import BaseRepository, DB_PATH
+
+class JobLeaseRepository(BaseRepository):
+    """
+    Repository for the job_leases table.
+
+    A lease marks a (job_type, ticker) as in flight for one owner until it
+    expires, so duplicate jobs are suppressed across threads, processes and
+    restarts, and a crashed job frees its slot once the lease runs out.
+    Times are stored as Unix timestamps.
+    """
+
+    def __init__(self, db_path: str = DB_PATH):
+        super().__init__(db_path)
+        self._table_ready = False
+
+    def ensure_table(self) -> None:
+        """Create the job_leases table if it doesn't exist."""
+        if self._table_ready:
+            return
+        with self.get_cursor() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS job_leases (
+                    job_type TEXT NOT NULL,
+                    ticker TEXT NOT NULL,
+                    owner TEXT NOT NULL,
+                    acquired_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (job_type, ticker)
+                )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_job_leases_owner ON job_leases(owner)")
+        self._table_ready = True
+
+    def try_acquire(self, job_type: str, ticker: str, owner: str, ttl: float) -> bool:
+        """
+        Take the lease for a job unless another owner holds an unexpired one.
+
+        Args:
+            job_type: Kind of job (e.g. 'pe', 'growth')
+            ticker: Stock ticker symbol
+            owner: Identifier of the executor taking the lease
+            ttl: Seconds until the lease expires
+
+        Returns:
+            bool: True if the lease is now held by owner
+        """
+        self.ensure_table()
+        now = time.time()
+        query = """
+            INSERT INTO job_leases (job_type, ticker, owner, acquired_at, expires_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(job_type, ticker) DO UPDATE SET
+                owner = excluded.owner,
+                acquired_at = excluded.acquired_at,
+                expires_at = excluded.expires_at
+            WHERE job_leases.expires_at <= excluded.acquired_at
+               OR job_leases.owner = excluded.owner
+        """
+        return self.execute_update(query, (job_type, ticker.upper(), owner, now, now + ttl)) > 0
+
+    def renew(self, job_type: str, ticker: str, owner: str, ttl: float) -> bool:
+        """Extend a lease held by owner. Returns False if the lease was lost."""
+        self.ensure_table()
+        query = """
+            UPDATE job_leases SET expires_at = ?
+            WHERE job_type = ? AND ticker = ? AND owner = ?
+        """
+        return self.execute_update(query, (time.time() + ttl, job_type, ticker.upper(), owner)) > 0
+
+    def release(self, job_type: str, ticker: str, owner: str) -> bool:
+        """Drop a lease held by owner."""
+        self.ensure_table()
+        query = "DELETE FROM job_leases WHERE job_type = ? AND ticker = ? AND owner = ?"
+        return self.execute_update(query, (job_type, ticker.upper(), owner)) > 0
+
+    def release_owner(self, owner: str) -> int:
+        """Drop every lease held by owner. Returns the number released."""
+        self.ensure_table()
+        return self.execute_update("DELETE FROM job_leases WHERE owner = ?", (owner,))
+
+    def is_leased(self, job_type: str, ticker: str) -> bool:
+        """Check whether any owner holds an unexpired lease for a job."""
+        self.ensure_table()
+        query = "SELECT 1 FROM job_leases WHERE job_type = ? AND ticker = ? AND expires_at > ?"
+        return self.execute_single(query, (job_type, ticker.upper(), time.time())) is not None
+
+    def get_leased_tickers(self, job_type: str) -> Set[str]:
+        """Get tickers with an unexpired lease for a job type."""
+        self.ensure_table()
+        query = "SELECT ticker FROM job_leases WHERE job_type = ? AND expires_at > ?"
+        return {row['ticker'] for row in self.execute_query(query, (job_type, time.time()))}
+
+    def get_active_leases(self) -> List[Dict[str, Any]]:
+        """Get all unexpired leases."""
+        self.ensure_table()
+        query = "SELECT * FROM job_leases WHERE expires_at > ? ORDER BY job_type, ticker"
+        return self.execute_query(query, (time.time(),))
+
+    def purge_expired(self) -> int:
+        """Delete expired leases. Returns the number deleted."""
+        self.ensure_table()
+        return self.execute_update("DELETE FROM job_leases WHERE expires_at <= ?", (time.time(),))
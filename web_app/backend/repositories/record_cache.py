@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Versioned LRU + TTL cache for per-ticker composite records.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Most dashboard reads hit the same few hundred tickers
+DEFAULT_MAX_ENTRIES = 2048
+
+# Seconds before an entry is reloaded even if no write in this process touched it,
+# which bounds staleness from writes made by other processes
+DEFAULT_TTL = 300.0
+
+
+class _Entry:
+    __slots__ = ('value', 'company_id', 'version', 'expires_at')
+
+    def __init__(self, value: Dict[str, Any], company_id: Optional[int], version: Tuple[int, int], expires_at: float):
+        self.value = value
+        self.company_id = company_id
+        self.version = version
+        self.expires_at = expires_at
+
+
+class RecordCache:
+    """
+    Read-through cache of records keyed by ticker, invalidated by version counters.
+
+    Every write path that changes a company's data calls invalidate_company,
+    which bumps that company's version; entries cached under an older version
+    are treated as misses. Bulk writes call invalidate_all. Entries also expire
+    after ttl seconds and the least recently used are evicted beyond max_entries.
+
+    A load that overlaps any invalidation is not cached, so a reader can't
+    store a record that was read before a concurrent write committed.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._versions: Dict[int, int] = {}
+        self._epoch = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _version(self, company_id: Optional[int]) -> Tuple[int, int]:
+        return self._epoch, self._versions.get(company_id, 0)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a copy of a cached record, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at > time.monotonic() and entry.version == self._version(entry.company_id):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(entry.value)
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def begin_load(self) -> int:
+        """Token to pass to put, taken before reading from the database."""
+        with self._lock:
+            return self._writes
+
+    def put(self, key: str, value: Dict[str, Any], company_id: Optional[int], token: int) -> bool:
+        """
+        Cache a copy of a record loaded after begin_load returned token.
+
+        Returns:
+            bool: False if an invalidation happened since begin_load, so the record wasn't cached
+        """
+        with self._lock:
+            if token != self._writes:
+                return False
+            self._entries[key] = _Entry(dict(value), company_id, self._version(company_id),
+                                        time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def invalidate_company(self, company_id: int) -> None:
+        """Mark every cached record of a company stale."""
+        with self._lock:
+            self._versions[company_id] = self._versions.get(company_id, 0) + 1
+            self._writes += 1
+            self.invalidations += 1
+
+    def invalidate_all(self) -> None:
+        """Mark every cached record stale, e.g. after a bulk write."""
+        with self._lock:
+            self._epoch += 1
+            self._versions.clear()
+            self._entries.clear()
+            self._writes += 1
+            self.invalidations += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+_caches: Dict[str, RecordCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_record_cache(db_path: str) -> RecordCache:
+    """Get the process-wide record cache for a database, creating it on first use."""
+    with _caches_lock:
+        cache = _caches.get(db_path)
+        if cache is None:
+            cache = RecordCache()
+            _caches[db_path] = cache
+        return cache
+
+
+def invalidate_company(db_path: str, company_id: Optional[int]) -> None:
+    """Invalidate a company's cached records after a write to db_path."""
+    if company_id is not None:
+        get_record_cache(db_path).invalidate_company(company_id)
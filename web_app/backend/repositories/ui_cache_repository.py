@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Repository for the ui_cache table: one denormalized row per ticker for the UI views.
+"""
+import time
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Iterable
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+from base_repository import BaseRepository, DB_PATH
+from record_cache import get_record_cache, invalidate_company
+
+# Seconds between checks for a ui_cache table created by another process
+TABLE_CHECK_INTERVAL = 60.0
+
+# Seconds a ui_cache row is served before readers recompute it, bounding how
+# long writes made outside the repositories can leave it stale
+ROW_MAX_AGE = 600.0
+
+# Columns of ui_cache besides ticker, in table order
+UI_CACHE_COLUMNS = [
+    ('company_id', 'INTEGER UNIQUE NOT NULL'),
+    ('company_name', 'TEXT'),
+    ('exchange', 'TEXT'),
+    ('sector', 'TEXT'),
+    ('industry', 'TEXT'),
+    ('total_score_percentage', 'REAL'),
+    ('total_score_percentile_rank', 'REAL'),
+    ('financial_total_percentile', 'REAL'),
+    ('financial_total_rank', 'INTEGER'),
+    ('adjusted_pe_ratio', 'REAL'),
+    ('adjusted_oi_after_tax', 'REAL'),
+    ('updated_ev', 'REAL'),
+    ('pe_status', 'TEXT'),
+    ('current_year_growth', 'REAL'),
+    ('next_year_growth', 'REAL'),
+    ('growth_status', 'TEXT'),
+    ('growth_last_updated', 'TEXT'),
+    ('two_year_annualized_growth', 'REAL'),
+    ('two_year_forward_pe', 'REAL'),
+    ('short_float', 'TEXT'),
+    ('short_interest_scraped_at', 'TEXT'),
+    ('short_interest_status', 'TEXT'),
+    ('refreshed_at', 'TEXT'),
+]
+
+_TABLE_COLUMN_NAMES = {'ticker'} | {name for name, _ in UI_CACHE_COLUMNS}
+
+_SOURCE_QUERY = """
+    SELECT
+        c.id AS company_id,
+        c.ticker,
+        c.company_name,
+        c.exchange,
+        c.sector,
+        c.industry,
+        ais.total_score_percentage,
+        ais.total_score_percentile_rank,
+        fs.total_percentile AS financial_total_percentile,
+        fs.total_rank AS financial_total_rank,
+        ap.adjusted_pe_ratio,
+        ap.adjusted_oi_after_tax,
+        ap.updated_ev,
+        ap.calculation_status AS pe_status,
+        ge.current_year_growth,
+        ge.next_year_growth,
+        ge.calculation_status AS growth_status,
+        ge.last_updated AS growth_last_updated,
+        si.short_float,
+        si.scraped_at AS short_interest_scraped_at,
+        si.calculation_status AS short_interest_status
+    FROM companies c
+    LEFT JOIN ai_scores ais ON ais.company_id = c.id
+    LEFT JOIN financial_scores fs ON fs.company_id = c.id
+    LEFT JOIN adjusted_pe_calculations ap ON ap.company_id = c.id
+    LEFT JOIN growth_estimates ge ON ge.company_id = c.id
+    LEFT JOIN short_interest si ON si.company_id = c.id
+"""
+
+
+def two_year_annualized_growth(current_year_growth: Optional[float], next_year_growth: Optional[float]) -> Optional[float]:
+    """Annualized growth (CAGR, in percent) over two years of percentage growth estimates."""
+    try:
+        if current_year_growth is None or next_year_growth is None:
+            return None
+        total_growth = (1 + current_year_growth / 100) * (1 + next_year_growth / 100)
+        if total_growth < 0:
+            # Losing more than everything has no real annualized rate
+            return None
+        return ((total_growth ** 0.5) - 1) * 100
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+
+
+def two_year_forward_pe(adjusted_pe_ratio: Optional[float], annualized_growth: Optional[float]) -> Optional[float]:
+    """Adjusted PE discounted by two years of annualized growth."""
+    if adjusted_pe_ratio is None or annualized_growth is None:
+        return None
+    try:
+        growth_multiplier = (1 + (annualized_growth / 100)) ** 2
+        if growth_multiplier == 0:
+            return None
+        return adjusted_pe_ratio / growth_multiplier
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+
+
+def is_row_stale(row: Optional[Dict[str, Any]]) -> bool:
+    """Check whether a ui_cache row is missing or was refreshed more than ROW_MAX_AGE seconds ago."""
+    if not row or not row.get('refreshed_at'):
+        return True
+    try:
+        refreshed_at = datetime.fromisoformat(row['refreshed_at'])
+    except (TypeError, ValueError):
+        return True
+    return (datetime.now() - refreshed_at).total_seconds() > ROW_MAX_AGE
+
+
+class UICacheRepository(BaseRepository):
+    """
+    Repository for the ui_cache table.
+
+    Each row joins a company with its AI scores, financial scores, adjusted PE,
+    growth estimates and short interest, plus the derived two-year growth and
+    forward PE, so a view needs one primary-key lookup instead of the joins.
+    The table is created by rebuild() (run this module with --rebuild); once
+    it exists, the repository write paths refresh the rows they touch through
+    company_changed(). A ui_cache table whose columns don't match
+    UI_CACHE_COLUMNS (e.g. one created by older tooling) is treated as
+    missing until rebuild() recreates it.
+    """
+
+    BATCH_CHUNK_SIZE = 500
+
+    def __init__(self, db_path: str = DB_PATH):
+        super().__init__(db_path)
+
+    def _table_columns(self) -> List[str]:
+        """Column names of the ui_cache table, empty if it doesn't exist."""
+        return [row['name'] for row in self.execute_query("PRAGMA table_info(ui_cache)")]
+
+    def ensure_table(self) -> None:
+        """Create the ui_cache table if it doesn't exist, recreating it if its columns are outdated."""
+        existing = set(self._table_columns())
+        columns = ',\n'.join(f'{name} {sql_type}' for name, sql_type in UI_CACHE_COLUMNS)
+        with self.get_cursor() as cursor:
+            if existing and existing != _TABLE_COLUMN_NAMES:
+                # Every row is derived from the source tables, so nothing is lost
+                print(f"Recreating ui_cache table in {self.db_path}: its columns are outdated")
+                cursor.execute("DROP TABLE ui_cache")
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS ui_cache (ticker TEXT PRIMARY KEY, {columns})")
+        _table_state[self.db_path] = (True, time.monotonic())
+
+    def table_exists(self) -> bool:
+        """
+        Check whether a usable ui_cache table exists, re-checking a missing or
+        outdated table only occasionally.
+        """
+        exists, checked_at = _table_state.get(self.db_path, (False, None))
+        if not exists and (checked_at is None or time.monotonic() - checked_at >= TABLE_CHECK_INTERVAL):
+            columns = set(self._table_columns())
+            exists = columns == _TABLE_COLUMN_NAMES
+            if columns and not exists:
+                print(f"Ignoring ui_cache table in {self.db_path} with outdated columns; "
+                      f"run ui_cache_repository.py --rebuild to recreate it")
+            _table_state[self.db_path] = (exists, time.monotonic())
+        return exists
+
+    @staticmethod
+    def _build_row(source: Dict[str, Any], refreshed_at: str) -> Dict[str, Any]:
+        """Add derived fields to one joined source row."""
+        row = dict(source)
+        row['two_year_annualized_growth'] = two_year_annualized_growth(
+            row['current_year_growth'], row['next_year_growth'])
+        row['two_year_forward_pe'] = two_year_forward_pe(
+            row['adjusted_pe_ratio'], row['two_year_annualized_growth'])
+        row['refreshed_at'] = refreshed_at
+        return row
+
+    def _write_rows(self, cursor, sources: Iterable[Dict[str, Any]]) -> int:
+        names = ['ticker'] + [name for name, _ in UI_CACHE_COLUMNS]
+        placeholders = ', '.join('?' for _ in names)
+        refreshed_at = datetime.now().isoformat()
+        rows = [self._build_row(source, refreshed_at) for source in sources]
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO ui_cache ({', '.join(names)}) VALUES ({placeholders})",
+            [[row[name] for name in names] for row in rows]
+        )
+        return len(rows)
+
+    def refresh_companies(self, company_ids: List[int]) -> int:
+        """
+        Recompute the rows of some companies, dropping rows of companies that no longer exist.
+
+        Returns:
+            int: Number of rows written
+        """
+        unique_ids = list(dict.fromkeys(i for i in company_ids if i is not None))
+        written = 0
+        for i in range(0, len(unique_ids), self.BATCH_CHUNK_SIZE):
+            chunk = unique_ids[i:i + self.BATCH_CHUNK_SIZE]
+            placeholders = ', '.join('?' for _ in chunk)
+            with self.get_cursor() as cursor:
+                cursor.execute(f"{_SOURCE_QUERY} WHERE c.id IN ({placeholders})", tuple(chunk))
+                sources = [dict(row) for row in cursor.fetchall()]
+                # A renamed ticker would otherwise leave its old row behind
+                cursor.execute(f"DELETE FROM ui_cache WHERE company_id IN ({placeholders})", tuple(chunk))
+                written += self._write_rows(cursor, sources)
+        return written
+
+    def rebuild(self) -> int:
+        """
+        Create the table if needed and recompute every row in one transaction.
+
+        Returns:
+            int: Number of rows written
+        """
+        self.ensure_table()
+        with self.get_cursor() as cursor:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(_SOURCE_QUERY)
+            sources = [dict(row) for row in cursor.fetchall()]
+            cursor.execute("DELETE FROM ui_cache")
+            return self._write_rows(cursor, sources)
+
+    def compute_row(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """Compute a ticker's row from the source tables without storing it."""
+        with self.get_cursor() as cursor:
+            cursor.execute(f"{_SOURCE_QUERY} WHERE c.ticker = ?", (ticker.upper(),))
+            source = cursor.fetchone()
+        return self._build_row(dict(source), datetime.now().isoformat()) if source else None
+
+    def get_row(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """Get the ui_cache row for a ticker, or None if it has none."""
+        return self.execute_single("SELECT * FROM ui_cache WHERE ticker = ?", (ticker.upper(),))
+
+    def get_rows(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get ui_cache rows for several tickers, keyed by ticker."""
+        unique_tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+        rows = {}
+        for i in range(0, len(unique_tickers), self.BATCH_CHUNK_SIZE):
+            chunk = unique_tickers[i:i + self.BATCH_CHUNK_SIZE]
+            placeholders = ', '.join('?' for _ in chunk)
+            for row in self.execute_query(f"SELECT * FROM ui_cache WHERE ticker IN ({placeholders})", tuple(chunk)):
+                rows[row['ticker']] = row
+        return rows
+
+
+# Per database path: (ui_cache table exists, monotonic time of the last check)
+_table_state: Dict[str, tuple] = {}
+
+
+def company_changed(db_path: str, company_id: Optional[int]) -> None:
+    """
+    Propagate a write to a company's data: invalidate its cached records and
+    refresh its ui_cache row if the table exists.
+
+    A failed refresh is reported but not raised, since the write itself succeeded.
+    """
+    if company_id is None:
+        return
+    invalidate_company(db_path, company_id)
+    if db_path == ':memory:':
+        return
+    repo = UICacheRepository(db_path)
+    try:
+        if repo.table_exists():
+            repo.refresh_companies([company_id])
+    except Exception as e:
+        print(f"Error refreshing ui_cache for company {company_id}: {e}")
+
+
+def companies_changed(db_path: str, company_ids: Iterable[Optional[int]]) -> None:
+    """Propagate a batched write to several companies, refreshing their ui_cache rows together."""
+    company_ids = [company_id for company_id in dict.fromkeys(company_ids) if company_id is not None]
+    if not company_ids:
+        return
+    for company_id in company_ids:
+        invalidate_company(db_path, company_id)
+    if db_path == ':memory:':
+        return
+    repo = UICacheRepository(db_path)
+    try:
+        if repo.table_exists():
+            repo.refresh_companies(company_ids)
+    except Exception as e:
+        print(f"Error refreshing ui_cache for {len(company_ids)} companies: {e}")
+
+
+def all_companies_changed(db_path: str) -> None:
+    """Propagate a bulk write: invalidate every cached record and rebuild ui_cache if it exists."""
+    get_record_cache(db_path).invalidate_all()
+    if db_path == ':memory:':
+        return
+    repo = UICacheRepository(db_path)
+    try:
+        if repo.table_exists():
+            repo.rebuild()
+    except Exception as e:
+        print(f"Error rebuilding ui_cache: {e}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--rebuild':
+        db_path = sys.argv[2] if len(sys.argv) > 2 else DB_PATH
+        started = time.time()
+        count = UICacheRepository(db_path).rebuild()
+        print(f"Rebuilt ui_cache with {count} rows in {time.time() - started:.2f}s")
+    else:
+        print("Usage: python ui_cache_repository.py --rebuild [db_path]")
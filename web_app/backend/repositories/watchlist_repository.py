@@ -2,21 +2,39 @@
 """
 Repository for watchlist data access.
 """
-from typing import List, Dict, Any
+import sqlite3
+from typing import List, Dict, Any, Optional
 import sys
 import os
 sys.path.insert(0, os.path.dirname(__file__))
 
 from base_repository import BaseRepository, DB_PATH
+from ui_cache_repository import UICacheRepository, is_row_stale, two_year_annualized_growth, two_year_forward_pe
 
 class WatchlistRepository(BaseRepository):
     """Repository for watchlist database operations."""
 
     def __init__(self, db_path: str = DB_PATH):
         super().__init__(db_path)
+        self.ui_cache_repo = UICacheRepository(db_path)
 
     def get_watchlist(self) -> List[Dict[str, Any]]:
-        """Get all companies in the watchlist with their data."""
+        """
+        Get all companies in the watchlist with their data and derived columns.
+
+        Rows come from the maintained ui_cache table, recomputing rows that are
+        missing or stale first. If ui_cache is unavailable or can't cover the
+        whole watchlist, rows come from the joined source tables with
+        two_year_annualized_growth and two_year_forward_pe computed in one pass.
+        """
+        if self.ui_cache_repo.table_exists():
+            try:
+                rows = self._get_cached_watchlist()
+                if rows is not None:
+                    return rows
+            except sqlite3.Error as e:
+                print(f"Error reading watchlist from ui_cache, using source tables: {e}")
+
         query = """
             SELECT
                 c.ticker,
@@ -47,7 +65,57 @@ class WatchlistRepository(BaseRepository):
             LEFT JOIN short_interest si ON c.id = si.company_id
             ORDER BY w.added_at DESC
         """
-        return self.execute_query(query)
+        rows = self.execute_query(query)
+        for row in rows:
+            growth = two_year_annualized_growth(row['current_year_growth'], row['next_year_growth'])
+            row['two_year_annualized_growth'] = growth
+            row['two_year_forward_pe'] = two_year_forward_pe(row['adjusted_pe_ratio'], growth)
+        return rows
+
+    def _query_cached_watchlist(self) -> List[Dict[str, Any]]:
+        return self.execute_query("""
+            SELECT
+                w.company_id AS watchlist_company_id,
+                u.refreshed_at,
+                u.ticker,
+                u.company_name,
+                u.exchange,
+                u.sector,
+                u.industry,
+                w.added_at,
+                u.total_score_percentage,
+                u.total_score_percentile_rank,
+                u.financial_total_percentile,
+                u.adjusted_pe_ratio,
+                u.adjusted_oi_after_tax,
+                u.updated_ev,
+                u.pe_status,
+                u.current_year_growth,
+                u.next_year_growth,
+                u.growth_status,
+                u.growth_last_updated,
+                u.short_float,
+                u.short_interest_status,
+                u.two_year_annualized_growth,
+                u.two_year_forward_pe
+            FROM watchlist w
+            LEFT JOIN ui_cache u ON u.company_id = w.company_id
+            ORDER BY w.added_at DESC
+        """)
+
+    def _get_cached_watchlist(self) -> Optional[List[Dict[str, Any]]]:
+        """Watchlist rows from ui_cache, or None if some watchlist company has no row."""
+        rows = self._query_cached_watchlist()
+        outdated = [row['watchlist_company_id'] for row in rows if is_row_stale(row)]
+        if outdated:
+            self.ui_cache_repo.refresh_companies(outdated)
+            rows = self._query_cached_watchlist()
+        if any(row['ticker'] is None for row in rows):
+            return None
+        for row in rows:
+            del row['watchlist_company_id']
+            del row['refreshed_at']
+        return rows
 
     def add_to_watchlist(self, ticker: str) -> bool:
         """Add a company to the watchlist."""
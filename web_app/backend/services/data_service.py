@@ -11,19 +11,26 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from repositories.data_repository import DataRepository
 from repositories.watchlist_repository import WatchlistRepository
+from services.search_index import TickerSearchIndex
 from core.score_calculator import calculate_total_score, SCORE_DEFINITIONS, SCORE_WEIGHTS
 from datetime import datetime
 
+SEARCH_MODES = ('prefix', 'fulltext')
+
 class DataService:
     """Service for stock data business logic."""
 
     def __init__(self, data_repo: DataRepository, watchlist_repo: WatchlistRepository):
         self.data_repo = data_repo
         self.watchlist_repo = watchlist_repo
+        self.search_index = TickerSearchIndex(data_repo)
 
     def get_complete_data(self, ticker: str) -> Optional[Dict[str, Any]]:
         """Get complete data for a ticker with business logic applied."""
-        data = self.data_repo.get_complete_data(ticker)
+        return self._apply_business_logic(ticker, self.data_repo.get_complete_data(ticker))
+
+    def _apply_business_logic(self, ticker: str, data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Add watchlist status and derived growth to a complete data record."""
         if not data:
             return None
 
@@ -41,8 +48,14 @@ class DataService:
         return data
 
     def search_ticker(self, query: str) -> Dict[str, Any]:
-        """Search for ticker with validation and business logic."""
-        ticker, match_type = self._find_best_match(query)
+        """
+        Search for ticker with validation and business logic.
+
+        Records loaded while resolving the query are memoized for the rest of
+        the request, so the matched ticker's data is only loaded once.
+        """
+        memo: Dict[str, Optional[Dict[str, Any]]] = {}
+        ticker, match_type = self._find_best_match(query, memo)
 
         if not ticker:
             return {
@@ -52,7 +65,8 @@ class DataService:
             }
 
         try:
-            data = self.get_complete_data(ticker)
+            # Financial score totals are already part of the complete data record
+            data = self._apply_business_logic(ticker, self._load_record(ticker, memo))
             if not data:
                 return {
                     'success': False,
@@ -60,12 +74,6 @@ class DataService:
                     'message': f'Could not fetch data for "{ticker}". Please check that the ticker is valid.'
                 }
 
-            # Add financial scores summary
-            financial_scores = self.data_repo.financial_scores_repo.get_financial_scores_by_ticker(ticker)
-            if financial_scores:
-                data['financial_total_percentile'] = financial_scores.get('total_percentile')
-                data['financial_total_rank'] = financial_scores.get('total_rank')
-
             return {
                 'success': True,
                 'ticker': ticker,
@@ -81,13 +89,34 @@ class DataService:
                 'message': f'Error fetching data for "{ticker}": {str(e)}'
             }
 
-    def get_search_suggestions(self, query: str) -> Dict[str, Any]:
-        """Get search suggestions with business logic."""
+    def get_search_suggestions(self, query: str, mode: str = 'prefix', sector: Optional[str] = None,
+                               industry: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get search suggestions with business logic.
+
+        'prefix' mode matches the start of tickers, aliases and company names.
+        'fulltext' mode matches words anywhere in the ticker, name, sector,
+        industry or aliases, ranked by relevance; it is also used whenever a
+        sector or industry filter is given.
+        """
         if not query or len(query.strip()) < 1:
             return {'success': False, 'message': 'Query too short'}
+        if mode not in SEARCH_MODES:
+            return {'success': False, 'message': f'Unknown search mode "{mode}"'}
 
         query_upper = query.strip().upper()
-        suggestions = self.data_repo.search_tickers(query_upper, limit=10)
+        suggestions = None
+        if mode == 'fulltext' or sector or industry:
+            try:
+                suggestions = self.data_repo.search_companies_fulltext(
+                    query_upper, limit=10, sector=sector, industry=industry)
+            except Exception as e:
+                print(f"Full-text search failed for '{query}', using prefix search: {e}")
+        if suggestions is None:
+            suggestions = self.search_index.search(query_upper, limit=10)
+        if suggestions is None:
+            # Index unavailable, fall back to scanning the table
+            suggestions = self.data_repo.search_tickers(query_upper, limit=10)
 
         return {
             'success': True,
@@ -186,31 +215,58 @@ class DataService:
             'total_rank': financial_scores.get('total_rank')
         }
 
-    def _find_best_match(self, query: str) -> Tuple[Optional[str], Optional[str]]:
-        """Find best ticker match using prefix matching."""
+    def _load_record(self, ticker: str, memo: Dict[str, Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Get a ticker's complete data record, loading it at most once per memo."""
+        if ticker not in memo:
+            memo[ticker] = self.data_repo.get_complete_data(ticker)
+        return memo[ticker]
+
+    def _find_best_match(self, query: str,
+                         memo: Optional[Dict[str, Optional[Dict[str, Any]]]] = None) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Find best ticker match: exact ticker, then ticker or name prefix, then full-text.
+
+        Args:
+            query: Search text
+            memo: Per-request cache of loaded records, filled in for the caller to reuse
+
+        Returns:
+            Tuple of (ticker, match_type), or (None, None) if nothing matches
+        """
         query_upper = query.strip().upper()
+        memo = {} if memo is None else memo
 
-        # First try exact ticker match
-        company = self.data_repo.company_repo.get_company_by_ticker(query_upper)
-        if company:
-            # Check if we have cached data for this ticker
-            data = self.data_repo.get_complete_data(query_upper)
-            if data:
-                return query_upper, 'ticker'
-            else:
-                return query_upper, 'ticker_not_cached'
-
-        # Try company name prefix match
-        companies = self.data_repo.company_repo.search_companies(query_upper, limit=1)
-        if companies:
-            ticker = companies[0]['ticker']
-            data = self.data_repo.get_complete_data(ticker)
-            if data:
-                return ticker, 'company'
-            else:
-                return ticker, 'ticker_not_cached'
+        # First try exact ticker match; the record only exists for known companies
+        if self._load_record(query_upper, memo):
+            return query_upper, 'ticker'
+
+        match_type = 'company'
+        ticker = self._best_prefix_match(query_upper)
+        if not ticker:
+            match_type = 'fulltext'
+            ticker = self._best_fulltext_match(query, query_upper)
+        if not ticker:
+            return None, None
+
+        if self._load_record(ticker, memo):
+            return ticker, match_type
+        return ticker, 'ticker_not_cached'
 
-        return None, None
+    def _best_prefix_match(self, query_upper: str) -> Optional[str]:
+        """Best ticker, alias or company name prefix match, from the in-memory index when available."""
+        suggestions = self.search_index.search(query_upper, limit=1)
+        if suggestions is None:
+            suggestions = self.data_repo.company_repo.search_companies(query_upper, limit=1)
+        return suggestions[0]['ticker'] if suggestions else None
+
+    def _best_fulltext_match(self, query: str, query_upper: str) -> Optional[str]:
+        """Most relevant full-text match, e.g. a word mid-name or an industry."""
+        try:
+            companies = self.data_repo.search_companies_fulltext(query_upper, limit=1)
+        except Exception as e:
+            print(f"Full-text search failed for '{query}': {e}")
+            return None
+        return companies[0]['ticker'] if companies else None
 
     def _get_metric_display_name(self, key: str) -> str:
         """Get display name for a metric key."""
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Finviz snapshot service: one scrape per ticker per freshness window.
+"""
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Any, Optional
+import sys
+import os
+
+# Add the backend directory to the path for imports
+backend_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+try:
+    from repositories.finviz_snapshot_repository import FinvizSnapshotRepository
+except ImportError:
+    from ..repositories.finviz_snapshot_repository import FinvizSnapshotRepository
+
+try:
+    from utils.scrapers.snapshot_parser import FinvizSnapshot
+    from utils.scrapers.get_short_interest import scrape_finviz_snapshot, short_interest_from_snapshot
+except ImportError:
+    FinvizSnapshot = None
+    scrape_finviz_snapshot = None
+    short_interest_from_snapshot = None
+
+
+class FinvizSnapshotService:
+    """
+    Serves Finviz fields from stored snapshots, scraping a ticker's quote page
+    only when its snapshot is missing or older than the freshness window.
+
+    Every Finviz-derived value (short float, short ratio, P/E, ...) comes from
+    the same stored snapshot, so one scrape covers all of them.
+    """
+    FRESHNESS_WINDOW = timedelta(hours=12)
+
+    def __init__(self, snapshot_repo: FinvizSnapshotRepository,
+                 fetcher: Optional[Callable[[str], Optional[Any]]] = None,
+                 freshness_window: Optional[timedelta] = None):
+        self.snapshot_repo = snapshot_repo
+        self.fetcher = fetcher or scrape_finviz_snapshot
+        self.freshness_window = freshness_window or self.FRESHNESS_WINDOW
+        # One scrape at a time per ticker; concurrent callers wait and reuse its result
+        self._ticker_locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def _ticker_lock(self, ticker: str) -> threading.Lock:
+        with self._locks_lock:
+            lock = self._ticker_locks.get(ticker)
+            if lock is None:
+                lock = threading.Lock()
+                self._ticker_locks[ticker] = lock
+            return lock
+
+    def is_fresh(self, scraped_at: Optional[str]) -> bool:
+        """Check whether a snapshot scraped at this ISO timestamp is within the freshness window."""
+        if not scraped_at:
+            return False
+        try:
+            scraped_at_dt = datetime.fromisoformat(scraped_at)
+        except (TypeError, ValueError):
+            return False
+        return datetime.now(scraped_at_dt.tzinfo) - scraped_at_dt <= self.freshness_window
+
+    def get_snapshot(self, ticker: str, refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Get a ticker's snapshot, scraping only if the stored one is missing or stale.
+
+        Args:
+            ticker: Stock ticker symbol
+            refresh: Scrape even if the stored snapshot is fresh, bypassing cached pages
+
+        Returns:
+            Dict with ticker, fields and scraped_at, or None if there is no
+            snapshot and it couldn't be scraped. A stale snapshot is returned
+            when a new scrape fails.
+        """
+        ticker = ticker.strip().upper()
+        stored = self._get_stored(ticker)
+        if stored and not refresh and self.is_fresh(stored['scraped_at']):
+            return stored
+        if not self.fetcher:
+            return stored
+
+        with self._ticker_lock(ticker):
+            # Another caller may have scraped while this one waited
+            current = self._get_stored(ticker)
+            if current and self.is_fresh(current['scraped_at']) and (not refresh or current != stored):
+                return current
+            # A refresh revalidates the page with Finviz instead of reusing the HTTP cache
+            snapshot = self._fetch(ticker, max_age=0) if refresh else self._fetch(ticker)
+            if snapshot is not None and not refresh and not self.is_fresh(snapshot.scraped_at):
+                # The page came from the HTTP cache and is already past the freshness window
+                snapshot = self._fetch(ticker, max_age=0) or snapshot
+            if snapshot is None:
+                return current
+            try:
+                self.snapshot_repo.upsert_snapshot(ticker, snapshot.fields, snapshot.scraped_at)
+            except Exception as e:
+                print(f"Error storing Finviz snapshot for {ticker}: {e}")
+            return {'ticker': ticker, 'fields': dict(snapshot.fields), 'scraped_at': snapshot.scraped_at}
+
+    def _fetch(self, ticker: str, **kwargs) -> Optional[Any]:
+        """Call the fetcher, reporting errors as None. The snapshot's scraped_at is when its page was fetched."""
+        try:
+            return self.fetcher(ticker, **kwargs)
+        except Exception as e:
+            print(f"Error scraping Finviz snapshot for {ticker}: {e}")
+            return None
+
+    def _get_stored(self, ticker: str) -> Optional[Dict[str, Any]]:
+        try:
+            return self.snapshot_repo.get_snapshot(ticker)
+        except Exception as e:
+            print(f"Error reading Finviz snapshot for {ticker}: {e}")
+            return None
+
+    def get_short_interest(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """
+        Short float for a ticker, in the shape scrape_ticker_short_interest returns.
+
+        Usable as the scraper of the short interest queue; it only hits Finviz
+        when the ticker's snapshot isn't fresh.
+        """
+        snapshot = self.get_snapshot(ticker)
+        if snapshot is None or FinvizSnapshot is None:
+            return None
+        return short_interest_from_snapshot(
+            FinvizSnapshot(snapshot['ticker'], snapshot['fields'], snapshot['scraped_at']))
+
+    def get_snapshot_data(self, ticker: str, refresh: bool = False) -> Dict[str, Any]:
+        """Get a ticker's snapshot with its numeric values, for the API."""
+        snapshot = self.get_snapshot(ticker, refresh=refresh)
+        if snapshot is None:
+            return {
+                'success': False,
+                'message': f'No Finviz snapshot available for {ticker.strip().upper()}'
+            }
+        values = {}
+        if FinvizSnapshot is not None:
+            values = FinvizSnapshot(snapshot['ticker'], snapshot['fields'], snapshot['scraped_at']).numbers()
+        return {
+            'success': True,
+            'ticker': snapshot['ticker'],
+            'scraped_at': snapshot['scraped_at'],
+            'fresh': self.is_fresh(snapshot['scraped_at']),
+            'fields': snapshot['fields'],
+            'values': values
+        }
+
+
+_shared_services: Dict[str, FinvizSnapshotService] = {}
+_shared_services_lock = threading.Lock()
+
+
+def get_finviz_snapshot_service(db_path: str) -> FinvizSnapshotService:
+    """Get the process-wide snapshot service for a database, so scrapes of a ticker are serialized."""
+    with _shared_services_lock:
+        service = _shared_services.get(db_path)
+        if service is None:
+            service = FinvizSnapshotService(FinvizSnapshotRepository(db_path))
+            _shared_services[db_path] = service
+        return service
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Bounded background job executor shared by all services.
+"""
+import atexit
+import itertools
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    from repositories.job_lease_repository import JobLeaseRepository
+except ImportError:
+    from ..repositories.job_lease_repository import JobLeaseRepository
+
+# Lower numbers run first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 10
+
+# Maximum concurrent workers per job type. External APIs and scrapers get small
+# pools so a large watchlist can't flood them. Short interest scrapes also go
+# through the shared ScrapeEngine, which rate limits Finviz across all callers.
+POOL_SIZES = {
+    'pe': 4,
+    'growth': 4,
+    'short_interest': 4,
+    'peers': 2,
+}
+
+# Workers for job types not listed in POOL_SIZES
+DEFAULT_POOL_SIZE = 2
+
+# Seconds an idle worker waits for new jobs before exiting
+WORKER_IDLE_TIMEOUT = 5.0
+
+# Seconds a job lease stays valid, counted from submission and again from the
+# moment the job starts. Longer than any single fetch should take.
+LEASE_TTL = 600.0
+
+
+@dataclass
+class Job:
+    """A unit of background work, unique per (job_type, ticker)."""
+    job_type: str
+    ticker: str
+    func: Callable[[], Any]
+    priority: int = PRIORITY_NORMAL
+    state: str = 'queued'
+    submitted_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    started_at: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_type': self.job_type,
+            'ticker': self.ticker,
+            'priority': self.priority,
+            'state': self.state,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+        }
+
+
+class _WorkerPool:
+    """Priority queue and worker threads for one job type."""
+
+    def __init__(self, job_type: str, max_workers: int):
+        self.job_type = job_type
+        self.max_workers = max_workers
+        self.queue = queue.PriorityQueue()
+        self.workers = 0
+        self.idle_workers = 0
+        # Workers started but not yet waiting for jobs
+        self.starting_workers = 0
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+
+
+class JobExecutor:
+    """
+    Runs background jobs on bounded per-type worker pools.
+
+    Jobs are deduplicated by (job_type, ticker): submitting a job that is already
+    queued or running is a no-op. Each job type has its own priority queue and a
+    capped number of worker threads, started on demand and stopped when idle.
+
+    With a lease repository, each job also holds a lease in the database while it
+    is in flight, which suppresses duplicates across processes and restarts. A
+    job whose process dies releases its slot when the lease expires. If the
+    database is unavailable, dedup falls back to this process only.
+    """
+
+    def __init__(self, pool_sizes: Optional[Dict[str, int]] = None,
+                 idle_timeout: float = WORKER_IDLE_TIMEOUT,
+                 lease_repo: Optional[JobLeaseRepository] = None,
+                 lease_ttl: float = LEASE_TTL):
+        self.pool_sizes = dict(POOL_SIZES)
+        if pool_sizes:
+            self.pool_sizes.update(pool_sizes)
+        self.idle_timeout = idle_timeout
+        self.lease_repo = lease_repo
+        self.lease_ttl = lease_ttl
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lease_error_reported = False
+        self._pools: Dict[str, _WorkerPool] = {}
+        self._jobs: Dict[Tuple[str, str], Job] = {}
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        # Tie-breaker so jobs with equal priority run in submission order
+        self._sequence = itertools.count()
+
+    def submit(self, job_type: str, ticker: str, func: Callable[[], Any],
+               priority: int = PRIORITY_NORMAL) -> bool:
+        """
+        Queue a job unless the same (job_type, ticker) is already queued or running.
+
+        Args:
+            job_type: Kind of work, which selects the worker pool (e.g. 'pe', 'growth')
+            ticker: Stock ticker symbol the job works on
+            func: Callable that does the work
+            priority: PRIORITY_HIGH, PRIORITY_NORMAL or PRIORITY_LOW
+
+        Returns:
+            bool: True if the job was queued, False if it was already in flight
+        """
+        ticker = ticker.strip().upper()
+        key = (job_type, ticker)
+        with self._lock:
+            if key in self._jobs:
+                return False
+            # Reserve the slot locally before taking the lease outside the lock
+            job = Job(job_type, ticker, func, priority)
+            self._jobs[key] = job
+
+        if not self._lease_call('try_acquire', True, job_type, ticker, self.owner, self.lease_ttl):
+            # Another process is already running this job
+            with self._lock:
+                self._jobs.pop(key, None)
+                self._idle.notify_all()
+            return False
+
+        with self._lock:
+            pool = self._get_pool(job_type)
+            pool.queue.put((priority, next(self._sequence), job))
+            self._ensure_worker(pool)
+        return True
+
+    def is_active(self, job_type: str, ticker: str) -> bool:
+        """Check whether a job is queued or running here or in another process."""
+        ticker = ticker.strip().upper()
+        with self._lock:
+            if (job_type, ticker) in self._jobs:
+                return True
+        return self._lease_call('is_leased', False, job_type, ticker)
+
+    def active_tickers(self, job_type: str) -> Set[str]:
+        """Get tickers with a queued or running job of a type, in any process."""
+        with self._lock:
+            tickers = {ticker for (jt, ticker) in self._jobs if jt == job_type}
+        return tickers | self._lease_call('get_leased_tickers', set(), job_type)
+
+    def list_leases(self) -> List[Dict[str, Any]]:
+        """List unexpired leases held by all processes."""
+        return self._lease_call('get_active_leases', [])
+
+    def release_leases(self) -> None:
+        """Release every lease this executor holds, e.g. on shutdown."""
+        self._lease_call('release_owner', 0, self.owner)
+
+    def get_job(self, job_type: str, ticker: str) -> Optional[Dict[str, Any]]:
+        """Get the state of a queued or running job, or None if there is none."""
+        with self._lock:
+            job = self._jobs.get((job_type, ticker.strip().upper()))
+            return job.to_dict() if job else None
+
+    def list_jobs(self, job_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """List queued and running jobs, optionally for one job type."""
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job_type is None or job.job_type == job_type]
+            return [job.to_dict() for job in sorted(jobs, key=lambda j: (j.job_type, j.priority, j.submitted_at))]
+
+    def get_status(self) -> Dict[str, Dict[str, int]]:
+        """Get queue depth, running jobs and worker counts for each job type."""
+        with self._lock:
+            status = {}
+            for job_type, pool in self._pools.items():
+                running = sum(1 for job in self._jobs.values()
+                              if job.job_type == job_type and job.state == 'running')
+                status[job_type] = {
+                    'max_workers': pool.max_workers,
+                    'workers': pool.workers,
+                    'queued': pool.queue.qsize(),
+                    'running': running,
+                    'completed': pool.completed,
+                    'failed': pool.failed,
+                    'skipped': pool.skipped,
+                }
+            return status
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until no jobs are queued or running. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._jobs:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+            return True
+
+    def _lease_call(self, method: str, default: Any, *args) -> Any:
+        """Call the lease repository, returning default if there is none or it fails."""
+        if self.lease_repo is None:
+            return default
+        try:
+            return getattr(self.lease_repo, method)(*args)
+        except Exception as e:
+            if not self._lease_error_reported:
+                self._lease_error_reported = True
+                print(f"Job leases unavailable, deduplicating in-process only: {e}")
+            return default
+
+    def _get_pool(self, job_type: str) -> _WorkerPool:
+        """Get the worker pool for a job type. Caller must hold the lock."""
+        pool = self._pools.get(job_type)
+        if pool is None:
+            pool = _WorkerPool(job_type, self.pool_sizes.get(job_type, DEFAULT_POOL_SIZE))
+            self._pools[job_type] = pool
+        return pool
+
+    def _ensure_worker(self, pool: _WorkerPool) -> None:
+        """
+        Start workers while more jobs are queued than idle or starting workers
+        can take, up to the pool's cap. Caller must hold the lock.
+        """
+        while (pool.queue.qsize() > pool.idle_workers + pool.starting_workers
+               and pool.workers < pool.max_workers):
+            pool.workers += 1
+            pool.starting_workers += 1
+            thread = threading.Thread(
+                target=self._run,
+                args=(pool,),
+                name=f'job-{pool.job_type}-{pool.workers}',
+                daemon=True
+            )
+            thread.start()
+
+    def _run(self, pool: _WorkerPool) -> None:
+        """Worker loop: run queued jobs until the queue stays empty for idle_timeout."""
+        with self._lock:
+            pool.starting_workers -= 1
+        while True:
+            with self._lock:
+                pool.idle_workers += 1
+            try:
+                _, _, job = pool.queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                with self._lock:
+                    pool.idle_workers -= 1
+                    # Exit only if nothing was queued while we waited
+                    if pool.queue.empty():
+                        pool.workers -= 1
+                        return
+                continue
+
+            with self._lock:
+                pool.idle_workers -= 1
+                job.state = 'running'
+                job.started_at = datetime.now().isoformat()
+
+            outcome = 'completed'
+            try:
+                # Restart the lease clock; if it lapsed while queued and another
+                # process took it over, that process runs the job instead
+                if self._lease_call('renew', True, job.job_type, job.ticker, self.owner, self.lease_ttl):
+                    job.func()
+                else:
+                    outcome = 'skipped'
+            except Exception as e:
+                outcome = 'failed'
+                print(f"Background {job.job_type} job failed for {job.ticker}: {e}")
+            finally:
+                if outcome != 'skipped':
+                    self._lease_call('release', False, job.job_type, job.ticker, self.owner)
+                with self._lock:
+                    self._jobs.pop((job.job_type, job.ticker), None)
+                    setattr(pool, outcome, getattr(pool, outcome) + 1)
+                    self._idle.notify_all()
+
+
+_shared_executor: Optional[JobExecutor] = None
+_shared_executor_lock = threading.Lock()
+
+
+def get_job_executor() -> JobExecutor:
+    """Get the process-wide job executor, creating it on first use."""
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            _shared_executor = JobExecutor(lease_repo=JobLeaseRepository())
+            # Free our leases on clean shutdown so a restart can pick the jobs up
+            atexit.register(_shared_executor.release_leases)
+        return _shared_executor
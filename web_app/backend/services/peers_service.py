@@ -5,7 +5,6 @@ Peers service for peer-related business logic.
 import sys
 import os
 import time
-import threading
 from typing import Optional, Dict, Any, List
 
 # Add the web_app directory to the path for imports
@@ -18,6 +17,9 @@ from repositories.peers_repository import PeersRepository
 from repositories.data_repository import DataRepository
 from repositories.adjusted_pe_repository import AdjustedPERepository
 from services.adjusted_pe_service import AdjustedPEService
+from services.short_interest_queue import get_short_interest_queue
+from services.job_executor import get_job_executor
+from services.finviz_snapshot_service import get_finviz_snapshot_service
 
 # Try to import optional dependencies from the project root
 project_root = os.path.abspath(os.path.join(backend_dir, '..', '..'))
@@ -44,6 +46,10 @@ class PeersService:
         self.data_repo = data_repo
         self.adjusted_pe_repo = AdjustedPERepository()
         self.adjusted_pe_service = AdjustedPEService(self.adjusted_pe_repo)
+        self.executor = get_job_executor()
+        # Scrapes go through the stored Finviz snapshots, so a fresh snapshot is never fetched again
+        scraper = get_finviz_snapshot_service(data_repo.db_path).get_short_interest if scrape_ticker_short_interest else None
+        self.short_interest_queue = get_short_interest_queue(data_repo, scraper)
 
     def get_peers(self, ticker: str) -> Dict[str, Any]:
         """
@@ -78,15 +84,21 @@ class PeersService:
             # Return the most recent analysis
             latest_analysis = peer_analyses[0]
 
-            # Get current data for main ticker and peers
-            main_ticker_data = self._get_ticker_data(ticker)
+            # Load the main ticker and every peer in a constant number of queries
+            peer_tickers = [peer.get('ticker') for peer in latest_analysis['peers'] if peer.get('ticker')]
+            peer_names = {peer.get('ticker'): peer.get('name') for peer in latest_analysis['peers'] if peer.get('ticker')}
+            tickers_data = self._get_tickers_data(
+                [ticker] + peer_tickers,
+                company_names=peer_names,
+                preloaded={ticker: company_data}
+            )
+            main_ticker_data = tickers_data.get(ticker)
 
             peers_data = []
             for peer in latest_analysis['peers']:
                 peer_ticker = peer.get('ticker')
                 if peer_ticker:
-                    peer_name = peer.get('name')
-                    peer_data = self._get_ticker_data(peer_ticker, peer_name)
+                    peer_data = tickers_data.get(peer_ticker)
                     if peer_data:
                         peers_data.append(peer_data)
                     else:
@@ -281,159 +293,127 @@ Return exactly 10 entries in ranked order, separated by semicolons, nothing else
         except Exception as e:
             return None, str(e), None, 0
 
-    def _get_ticker_data(self, ticker: str, company_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    def _get_tickers_data(self, tickers: List[str], company_names: Optional[Dict[str, str]] = None,
+                          preloaded: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
         """
-        Get ticker data including scores and metrics.
+        Batch version of _get_ticker_data for several tickers.
+
+        Rows are served from ui_cache when the table exists, which already carries
+        each ticker's adjusted PE status. Tickers without a ui_cache row fall back to
+        complete data plus one adjusted PE status query. Any missing adjusted PE or
+        short interest is fetched in the background instead of inside the request.
+        Rows whose short interest is being fetched are marked with short_interest_loading.
 
         Args:
-            ticker: Stock ticker symbol
+            tickers: Stock ticker symbols
+            company_names: Fallback display names for tickers missing from the companies table
+            preloaded: Complete data already loaded by the caller, keyed by ticker (None = not found)
 
         Returns:
-            Dictionary with ticker data or None if not found
+            Dictionary mapping each ticker (as given) to its peer row
         """
-        try:
-            data = self.data_repo.get_complete_data(ticker)
+        company_names = company_names or {}
+        complete_data = self.data_repo.get_ui_cache_data_many(tickers) or {}
+        for t, data in (preloaded or {}).items():
+            complete_data.setdefault(t.upper(), data)
+        to_load = [t for t in tickers if t.upper() not in complete_data]
+        if to_load:
+            complete_data.update(self.data_repo.get_complete_data_many(to_load))
+
+        # Only tickers without a ratio need their calculation status checked;
+        # ui_cache rows carry it as pe_status
+        missing_pe = [t for t in tickers if complete_data.get(t.upper())
+                      and complete_data[t.upper()].get('adjusted_pe_ratio') is None
+                      and 'pe_status' not in complete_data[t.upper()]]
+        pe_rows = self.data_repo.adjusted_pe_repo.get_adjusted_pe_by_tickers(missing_pe) if missing_pe else {}
+
+        results = {}
+        pe_to_calculate = []
+        for ticker in tickers:
+            data = complete_data.get(ticker.upper())
             if not data:
                 # Ticker doesn't exist in companies table, but we still want to show it
-                # Try to fetch basic short interest data
-                short_float = self._fetch_short_interest_for_unknown_ticker(ticker)
-                return {
+                short_float, scraped_at = self.short_interest_queue.get_unknown_result(ticker)
+                results[ticker] = {
                     'ticker': ticker,
-                    'company_name': company_name or ticker,  # Use provided name or ticker as fallback
+                    'company_name': company_names.get(ticker) or ticker,
                     'total_score_percentile_rank': None,
                     'financial_total_percentile': None,
                     'adjusted_pe_ratio': None,  # Can't calculate without company data
                     'adjusted_pe_unavailable': True,  # No company data = permanently unavailable
-                    'short_float': short_float
+                    'short_float': short_float,
+                    'short_interest_loading': not short_float and self.short_interest_queue.request(ticker, scraped_at)
                 }
+                continue
 
-            # Add financial scores
-            financial_scores = self.data_repo.financial_scores_repo.get_financial_scores_by_ticker(ticker)
-
-            # Ensure adjusted PE data is available - try to fetch if missing
             adjusted_pe_ratio = data.get('adjusted_pe_ratio')
+            adjusted_pe_unavailable = False
             if adjusted_pe_ratio is None:
-                # Try to get it from the adjusted PE repository directly
-                try:
-                    pe_data = self.data_repo.adjusted_pe_repo.get_adjusted_pe_by_ticker(ticker)
-                    if pe_data:
-                        adjusted_pe_ratio = pe_data.get('adjusted_pe_ratio')
-                        # Check if calculation previously failed permanently
-                        calculation_status = pe_data.get('calculation_status')
-                        if calculation_status in ['no_data', 'error'] and adjusted_pe_ratio is None:
-                            # Permanent failure - don't retry calculation
-                            adjusted_pe_ratio = None  # Will show as "N/A"
-                        elif adjusted_pe_ratio is None and calculation_status not in ['no_data', 'error']:
-                            # Haven't tried calculation yet, or previous attempt failed for other reasons
-                            # Trigger background calculation of adjusted PE
-                            try:
-                                def calculate_pe_background():
-                                    try:
-                                        self.adjusted_pe_service.calculate_and_store_adjusted_pe(ticker)
-                                    except Exception:
-                                        pass  # Silently fail in background
-
-                                # Start background calculation (don't wait for it)
-                                thread = threading.Thread(target=calculate_pe_background, daemon=True)
-                                thread.start()
-                            except Exception:
-                                pass  # Silently continue if background calculation fails
-                    else:
-                        # No record exists - trigger background calculation
-                        try:
-                            def calculate_pe_background():
-                                try:
-                                    self.adjusted_pe_service.calculate_and_store_adjusted_pe(ticker)
-                                except Exception:
-                                    pass  # Silently fail in background
-
-                            # Start background calculation (don't wait for it)
-                            thread = threading.Thread(target=calculate_pe_background, daemon=True)
-                            thread.start()
-                        except Exception:
-                            pass  # Silently continue if background calculation fails
-                except Exception:
-                    pass  # Silently continue if we can't get PE data
-
-            # Ensure short interest data is available - try to fetch if missing
+                if 'pe_status' in data:
+                    calculation_status = data['pe_status']
+                else:
+                    pe_data = pe_rows.get(ticker.upper())
+                    calculation_status = pe_data.get('calculation_status') if pe_data else None
+                if calculation_status not in ['no_data', 'error']:
+                    # Haven't tried calculation yet, or previous attempt failed for other reasons
+                    pe_to_calculate.append(ticker)
+                if calculation_status in ['no_data', 'error', 'no_quarterly_data', 'calculation_failed']:
+                    adjusted_pe_unavailable = True
+
+            # Missing short interest is queued for scraping and shown as loading meanwhile
             short_float = data.get('short_float')
+            short_interest_loading = False
             if short_float is None or short_float == '':
-                # Try to fetch short interest data
-                try:
-                    PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
-
-                    # Change to project root and scrape
-                    prev_cwd = os.getcwd()
-                    os.chdir(PROJECT_ROOT)
-                    try:
-                        if scrape_ticker_short_interest:
-                            si_result = scrape_ticker_short_interest(ticker)
-                            if si_result and si_result.get('short_float'):
-                                short_float = si_result.get('short_float')
-                                # Update the database with the new data
-                                try:
-                                    # Update the short interest table
-                                    # Find company_id and update
-                                    company_info = self.data_repo.company_repo.get_company_by_ticker(ticker)
-                                    if company_info:
-                                        company_id = company_info['id']
-                                        # Update or insert short interest data
-                                        self.data_repo.execute_update('''
-                                            INSERT OR REPLACE INTO short_interest (company_id, short_float, scraped_at, last_updated)
-                                            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-                                        ''', (company_id, short_float, si_result.get('scraped_at')))
-                                except Exception:
-                                    pass  # Silently fail if database update fails
-                    finally:
-                        os.chdir(prev_cwd)
-                except Exception:
-                    pass  # Silently continue if scraping fails
-
-            # Determine if adjusted PE calculation is permanently unavailable
-            adjusted_pe_unavailable = False
-            if adjusted_pe_ratio is None:
-                try:
-                    pe_data = self.data_repo.adjusted_pe_repo.get_adjusted_pe_by_ticker(ticker)
-                    if pe_data and pe_data.get('calculation_status') in ['no_data', 'error', 'no_quarterly_data', 'calculation_failed']:
-                        adjusted_pe_unavailable = True
-                except:
-                    pass
+                short_interest_loading = self.short_interest_queue.request(
+                    ticker, data.get('short_interest_scraped_at')
+                )
 
-            return {
+            results[ticker] = {
                 'ticker': ticker,
                 'company_name': data.get('company_name'),
                 'total_score_percentile_rank': data.get('total_score_percentile_rank'),
-                'financial_total_percentile': financial_scores.get('total_percentile') if financial_scores else None,
+                'financial_total_percentile': data.get('financial_total_percentile'),
                 'adjusted_pe_ratio': adjusted_pe_ratio,
                 'adjusted_pe_unavailable': adjusted_pe_unavailable,
-                'short_float': short_float
+                'short_float': short_float,
+                'short_interest_loading': short_interest_loading
             }
+
+        for ticker in pe_to_calculate:
+            self._trigger_pe_calculation(ticker)
+
+        return results
+
+    def _trigger_pe_calculation(self, ticker: str) -> None:
+        """Queue adjusted PE calculation for a ticker on the shared executor."""
+        def calculate_pe_background():
+            try:
+                self.adjusted_pe_service.calculate_and_store_adjusted_pe(ticker)
+            except Exception:
+                pass  # Silently fail in background
+
+        try:
+            self.executor.submit('pe', ticker, calculate_pe_background)
         except Exception:
-            return None
+            pass  # Silently continue if background calculation fails
 
-    def _fetch_short_interest_for_unknown_ticker(self, ticker: str) -> Optional[str]:
+    def _get_ticker_data(self, ticker: str, company_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
-        Try to fetch short interest data for a ticker that doesn't exist in our companies table.
+        Get ticker data including scores and metrics.
 
         Args:
             ticker: Stock ticker symbol
+            company_name: Fallback display name if the ticker isn't in the companies table
 
         Returns:
-            Short interest string or None if not available
+            Dictionary with ticker data or None if not found
         """
         try:
-            # Change to project root and scrape
-            PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
-            prev_cwd = os.getcwd()
-            os.chdir(PROJECT_ROOT)
-            try:
-                if scrape_ticker_short_interest:
-                    si_result = scrape_ticker_short_interest(ticker)
-                    if si_result and si_result.get('short_float'):
-                        return si_result.get('short_float')
-            finally:
-                os.chdir(prev_cwd)
+            data = self.data_repo.get_complete_data(ticker)
+            return self._get_tickers_data(
+                [ticker],
+                company_names={ticker: company_name},
+                preloaded={ticker: data}
+            ).get(ticker)
         except Exception:
-            pass  # Silently fail
-
-        return None
+            return None
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+In-memory prefix index for ticker and company name autocomplete.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left
+from heapq import nsmallest
+from typing import List, Dict, Any, Optional, Tuple
+
+# Seconds between checks of the companies table for changes made by other processes
+REFRESH_INTERVAL = 30.0
+
+# Results for prefixes matching more keys than this are memoized. Only short,
+# common prefixes get there, so the memo stays small.
+MEMO_MIN_MATCHES = 256
+
+_WHITESPACE = re.compile(r'\s+')
+_PUNCTUATION = re.compile(r'[^\w\s]')
+
+
+def normalize_name(text: str) -> str:
+    """Upper-case text and collapse runs of whitespace, as search keys are stored."""
+    return _WHITESPACE.sub(' ', (text or '').upper()).strip()
+
+
+def _name_keys(company_name: str) -> List[str]:
+    """Search keys for a company name: as written, and without punctuation ("AT&T" -> "ATT")."""
+    name = normalize_name(company_name)
+    bare = normalize_name(_PUNCTUATION.sub('', name))
+    return [name, bare] if bare and bare != name else [name]
+
+
+class _Snapshot:
+    """Sorted key arrays for one build of the index, plus a memo of common prefixes."""
+
+    def __init__(self, entries: List[Dict[str, Any]]):
+        # Companies sorted by ticker, so a smaller position means an earlier result
+        self.companies: List[Tuple[str, str]] = sorted(
+            (entry['ticker'].upper(), entry.get('company_name') or '') for entry in entries if entry.get('ticker'))
+        ticker_pairs = []
+        name_pairs = []
+        for position, (ticker, company_name) in enumerate(self.companies):
+            ticker_pairs.append((ticker, position))
+            name_pairs.extend((key, position) for key in _name_keys(company_name) if key)
+        for entry in entries:
+            if entry.get('ticker') and entry.get('aliases'):
+                position = bisect_left(self.companies, (entry['ticker'].upper(),))
+                ticker_pairs.extend((alias.upper(), position) for alias in entry['aliases'])
+        ticker_pairs.sort()
+        name_pairs.sort()
+        self.ticker_keys = [key for key, _ in ticker_pairs]
+        self.ticker_positions = [position for _, position in ticker_pairs]
+        self.name_keys = [key for key, _ in name_pairs]
+        self.name_positions = [position for _, position in name_pairs]
+        self.memo: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+
+    @staticmethod
+    def _range(keys: List[str], prefix: str) -> Tuple[int, int]:
+        """Slice of keys starting with prefix."""
+        # Every key with the prefix sorts between prefix and prefix + a maximal character
+        start = bisect_left(keys, prefix)
+        return start, bisect_left(keys, prefix + '\uffff', start)
+
+    def search(self, prefix: str, limit: int) -> List[Dict[str, Any]]:
+        memoized = self.memo.get((prefix, limit))
+        if memoized is not None:
+            return [dict(suggestion) for suggestion in memoized]
+
+        ticker_start, ticker_end = self._range(self.ticker_keys, prefix)
+        name_start, name_end = self._range(self.name_keys, prefix)
+        ticker_hits = set(self.ticker_positions[ticker_start:ticker_end])
+        results = [(position, 'ticker', 1) for position in nsmallest(limit, ticker_hits)]
+        if len(results) < limit:
+            name_hits = set(self.name_positions[name_start:name_end]) - ticker_hits
+            results.extend((position, 'company', 2) for position in nsmallest(limit - len(results), name_hits))
+
+        suggestions = []
+        for position, match_type, priority in results:
+            ticker, company_name = self.companies[position]
+            suggestions.append({
+                'ticker': ticker,
+                'company_name': company_name,
+                'match_type': match_type,
+                'priority': priority
+            })
+        if ticker_end - ticker_start + name_end - name_start > MEMO_MIN_MATCHES:
+            self.memo[(prefix, limit)] = [dict(suggestion) for suggestion in suggestions]
+        return suggestions
+
+
+class TickerSearchIndex:
+    """
+    Prefix index over tickers, ticker aliases and normalized company names.
+
+    Suggestions are ranked like DataRepository.search_tickers: ticker and alias
+    matches first, then company name matches, each ordered by ticker, with one
+    suggestion per company. Searches never touch the database. The index is
+    rebuilt when CompanyRepository writes in this process, and at most every
+    refresh_interval seconds when a cheap fingerprint of the tables changes.
+    """
+
+    def __init__(self, data_repo, refresh_interval: float = REFRESH_INTERVAL):
+        self.data_repo = data_repo
+        self.refresh_interval = refresh_interval
+        self._snapshot: Optional[_Snapshot] = None
+        self._signature = None
+        self._change_count = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def is_built(self) -> bool:
+        return self._snapshot is not None
+
+    def __len__(self) -> int:
+        return len(self._snapshot.companies) if self._snapshot else 0
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Rebuild the index if the companies table changed, or unconditionally with force.
+
+        Returns:
+            bool: True if the index is usable afterwards
+        """
+        with self._lock:
+            try:
+                change_count = self.data_repo.get_companies_change_count()
+                signature = self.data_repo.get_search_signature()
+                if force or self._snapshot is None or signature != self._signature \
+                        or change_count != self._change_count:
+                    self._snapshot = _Snapshot(self.data_repo.get_search_entries())
+                    self._signature = signature
+                    self._change_count = change_count
+            except Exception as e:
+                print(f"Error building search index: {e}")
+            self._checked_at = time.monotonic()
+            return self._snapshot is not None
+
+    def invalidate(self) -> None:
+        """Force a rebuild before the next search."""
+        self._checked_at = 0.0
+        self._change_count = None
+
+    def search(self, query: str, limit: int = 10) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get ranked suggestions for a ticker or company name prefix.
+
+        Returns:
+            List of suggestions, or None if the index could not be built
+        """
+        if (self._snapshot is None or self.data_repo.get_companies_change_count() != self._change_count
+                or time.monotonic() - self._checked_at >= self.refresh_interval):
+            if not self.refresh():
+                return None
+        prefix = normalize_name(query)
+        if not prefix:
+            return []
+        return self._snapshot.search(prefix, limit)
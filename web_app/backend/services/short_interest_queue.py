@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Shared background queue for short interest scraping.
+"""
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    from services.job_executor import JobExecutor, get_job_executor, PRIORITY_NORMAL
+except ImportError:
+    from .job_executor import JobExecutor, get_job_executor, PRIORITY_NORMAL
+
+
+class ShortInterestFetchQueue:
+    """
+    Deduplicating queue that scrapes short interest off the request path.
+
+    Requests enqueue tickers and return immediately; the job executor's
+    'short_interest' pool scrapes them and persists each result as it arrives.
+    """
+    JOB_TYPE = 'short_interest'
+    RETRY_DELAY = timedelta(hours=1)
+
+    def __init__(self, data_repo, scraper: Optional[Callable[[str], Optional[Dict]]],
+                 executor: Optional[JobExecutor] = None):
+        self.data_repo = data_repo
+        self.scraper = scraper
+        self.executor = executor or get_job_executor()
+        # (short_float, scraped_at) for tickers that aren't in the companies table
+        self._unknown_results: Dict[str, Tuple[Optional[str], str]] = {}
+
+    def request(self, ticker: str, scraped_at: Optional[str] = None,
+                priority: int = PRIORITY_NORMAL) -> bool:
+        """
+        Queue a ticker for scraping unless it is pending or was attempted recently.
+
+        Args:
+            ticker: Stock ticker symbol
+            scraped_at: ISO timestamp of the last scrape attempt, if any
+            priority: Executor priority for the scrape
+
+        Returns:
+            bool: True if a fetch for the ticker is in flight (show it as loading)
+        """
+        if not self.scraper:
+            return False
+        ticker = ticker.strip().upper()
+        if self.executor.is_active(self.JOB_TYPE, ticker):
+            return True
+        if not self._is_stale(scraped_at):
+            return False
+        self.executor.submit(self.JOB_TYPE, ticker, lambda: self._fetch(ticker), priority=priority)
+        return True
+
+    def is_pending(self, ticker: str) -> bool:
+        """Check whether a ticker is queued or being scraped."""
+        return self.executor.is_active(self.JOB_TYPE, ticker)
+
+    def get_unknown_result(self, ticker: str) -> Tuple[Optional[str], Optional[str]]:
+        """Get (short_float, scraped_at) for a ticker that isn't in the companies table."""
+        return self._unknown_results.get(ticker.strip().upper(), (None, None))
+
+    def _is_stale(self, scraped_at: Optional[str]) -> bool:
+        """Determine whether the last attempt is old enough to try again."""
+        if not scraped_at:
+            return True
+        try:
+            scraped_at_dt = datetime.fromisoformat(scraped_at)
+        except (TypeError, ValueError):
+            return True
+        now = datetime.now(scraped_at_dt.tzinfo)
+        return now - scraped_at_dt > self.RETRY_DELAY
+
+    def _fetch(self, ticker: str) -> None:
+        """Scrape one ticker and persist the result."""
+        try:
+            result = self.scraper(ticker)
+        except Exception:
+            result = None
+
+        if result is None:
+            self._store(ticker, None, 'error')
+        elif result.get('short_float'):
+            self._store(ticker, result['short_float'], 'success')
+        else:
+            self._store(ticker, None, 'no_data')
+
+    def _store(self, ticker: str, short_float: Optional[str], status: str) -> None:
+        """Persist a result, falling back to memory for tickers outside the companies table."""
+        try:
+            stored = self.data_repo.upsert_short_interest(ticker, short_float, status=status)
+        except Exception:
+            stored = False
+        if not stored:
+            self._unknown_results[ticker] = (short_float, datetime.now().isoformat())
+
+
+_shared_queues: Dict[str, ShortInterestFetchQueue] = {}
+_shared_queues_lock = threading.Lock()
+
+
+def get_short_interest_queue(data_repo, scraper: Optional[Callable[[str], Optional[Dict]]]) -> ShortInterestFetchQueue:
+    """Get the process-wide short interest queue for a database, creating it on first use."""
+    with _shared_queues_lock:
+        queue = _shared_queues.get(data_repo.db_path)
+        if queue is None:
+            queue = ShortInterestFetchQueue(data_repo, scraper)
+            _shared_queues[data_repo.db_path] = queue
+        return queue
@@ -5,7 +5,6 @@ Watchlist service for watchlist-related business logic.
 from typing import List, Dict, Any
 import sys
 import os
-import threading
 from datetime import datetime, timedelta, timezone
 
 # Add the web_app directory to the path for imports
@@ -19,12 +18,16 @@ try:
     from repositories.data_repository import DataRepository
     from repositories.adjusted_pe_repository import AdjustedPERepository
     from services.adjusted_pe_service import AdjustedPEService
+    from services.job_executor import get_job_executor, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+    from services.finviz_snapshot_service import get_finviz_snapshot_service
 except ImportError:
     # Fallback for different environments
     from ..repositories.watchlist_repository import WatchlistRepository
     from ..repositories.data_repository import DataRepository
     from ..repositories.adjusted_pe_repository import AdjustedPERepository
     from .adjusted_pe_service import AdjustedPEService
+    from .job_executor import get_job_executor, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+    from .finviz_snapshot_service import get_finviz_snapshot_service
 
 class WatchlistService:
     """Service for watchlist business logic."""
@@ -36,97 +39,90 @@ class WatchlistService:
         # Initialize adjusted PE components
         self.adjusted_pe_repo = AdjustedPERepository()
         self.adjusted_pe_service = AdjustedPEService(self.adjusted_pe_repo)
-        # Track ongoing fetches to prevent duplicate triggers
-        self.ongoing_fetches = {
-            'pe': set(),
-            'growth': set(),
-            'short_interest': set()
-        }
+        # Background fetches run on the shared executor, which also dedups them
+        self.executor = get_job_executor()
+
+    # Statuses after which a missing value is not fetched again
+    PE_TERMINAL_STATUSES = ('no_data', 'error', 'api_key_missing', 'no_quarterly_data', 'calculation_failed')
+    SHORT_INTEREST_TERMINAL_STATUSES = ('no_data', 'error')
+    JOB_TYPES = ('pe', 'growth', 'short_interest')
 
     def get_watchlist(self) -> Dict[str, Any]:
-        """Get complete watchlist with enriched data."""
+        """
+        Get complete watchlist with enriched data.
+
+        Derived columns come precomputed from the repository and nothing is
+        fetched here. A metric is reported as loading only while its job is
+        queued or running; data_missing marks rows with a metric that is
+        missing but has no job in flight, which schedule_missing would queue.
+        """
         watchlist_data = self.watchlist_repo.get_watchlist()
 
-        # Enrich with additional calculated fields
+        # In-flight jobs in this or any other process, looked up once per job type
+        active = {job_type: self.executor.active_tickers(job_type) for job_type in self.JOB_TYPES}
+
         for item in watchlist_data:
             ticker = item.get('ticker')
             if not ticker:
                 continue
-
-            # 1. Handle Growth and 2y Annualized Growth
-            current_growth = item.get('current_year_growth')
-            next_growth = item.get('next_year_growth')
-            growth_status = item.get('growth_status')
-            growth_last_updated = item.get('growth_last_updated')
-            item['growth_loading'] = False
-            item['two_year_annualized_growth'] = None # Default
-            
-            if current_growth is not None and next_growth is not None:
-                item['two_year_annualized_growth'] = self.data_repo.calculate_two_year_annualized_growth(
-                    current_growth, next_growth
-                )
-            elif ticker in self.ongoing_fetches['growth']:
-                item['growth_loading'] = True
-            else:
-                if self._should_retry_growth_fetch(growth_status, growth_last_updated):
-                    item['growth_loading'] = True
-                    self._trigger_growth_fetch(ticker)
-                else:
-                    item['growth_loading'] = False
-
-            # 2. Handle Adjusted PE
-            adjusted_pe_ratio = item.get('adjusted_pe_ratio')
-            pe_status = item.get('pe_status')
-            item['adjusted_pe_loading'] = False
-            
-            if adjusted_pe_ratio is not None:
-                item['adjusted_pe_loading'] = False
-            elif ticker in self.ongoing_fetches['pe']:
-                item['adjusted_pe_loading'] = True
-            elif pe_status in ['no_data', 'error', 'api_key_missing', 'no_quarterly_data', 'calculation_failed']:
-                item['adjusted_pe_loading'] = False
-            else:
-                # Missing and not already fetching or failed - trigger calculation
-                item['adjusted_pe_loading'] = True
-                self._trigger_pe_calculation(ticker)
-
-            # 3. Handle Short Interest
-            short_float = item.get('short_float')
-            si_status = item.get('short_interest_status')
-            item['short_interest_loading'] = False
-            
-            if short_float is not None:
-                item['short_interest_loading'] = False
-            elif ticker in self.ongoing_fetches['short_interest']:
-                item['short_interest_loading'] = True
-            elif si_status in ['no_data', 'error']:
-                item['short_interest_loading'] = False
-            else:
-                item['short_interest_loading'] = True
-                self._trigger_short_interest_fetch(ticker)
-
-            # 4. Handle Financial Scores loading (placeholder)
+            ticker = ticker.upper()
+            item['growth_loading'] = ticker in active['growth']
+            item['adjusted_pe_loading'] = ticker in active['pe']
+            item['short_interest_loading'] = ticker in active['short_interest']
             item['financial_loading'] = False
+            # Jobs lost to a restart or a failed submit leave data missing with nothing queued
+            item['data_missing'] = any(ticker not in active[job_type]
+                                       for job_type in self._missing_job_types(item))
 
-            # 5. Calculate 2y Forward PE (Derived)
-            adjusted_pe_ratio = item.get('adjusted_pe_ratio')
-            two_year_growth = item.get('two_year_annualized_growth')
+        return {
+            'success': True,
+            'watchlist': watchlist_data
+        }
 
-            if adjusted_pe_ratio is not None and two_year_growth is not None:
-                try:
-                    growth_multiplier = (1 + (two_year_growth / 100)) ** 2
-                    if growth_multiplier != 0:
-                        item['two_year_forward_pe'] = adjusted_pe_ratio / growth_multiplier
-                    else:
-                        item['two_year_forward_pe'] = None
-                except (TypeError, ValueError, ZeroDivisionError):
-                    item['two_year_forward_pe'] = None
-            else:
-                item['two_year_forward_pe'] = None
+    def _missing_job_types(self, item: Dict[str, Any]) -> List[str]:
+        """Job types whose data is missing from a watchlist row and worth fetching."""
+        missing = []
+        if (item.get('adjusted_pe_ratio') is None
+                and item.get('pe_status') not in self.PE_TERMINAL_STATUSES):
+            missing.append('pe')
+        if ((item.get('current_year_growth') is None or item.get('next_year_growth') is None)
+                and self._should_retry_growth_fetch(item.get('growth_status'), item.get('growth_last_updated'))):
+            missing.append('growth')
+        if (item.get('short_float') is None
+                and item.get('short_interest_status') not in self.SHORT_INTEREST_TERMINAL_STATUSES):
+            missing.append('short_interest')
+        return missing
+
+    def schedule_missing(self, priority: int = PRIORITY_NORMAL) -> Dict[str, Any]:
+        """
+        Queue background jobs for every watchlist metric that is missing.
+
+        Reads the watchlist once and skips tickers whose job is already queued
+        or running.
+
+        Returns:
+            Dict with the tickers actually queued per job type
+        """
+        active = {job_type: self.executor.active_tickers(job_type) for job_type in self.JOB_TYPES}
+        triggers = {
+            'pe': self._trigger_pe_calculation,
+            'growth': self._trigger_growth_fetch,
+            'short_interest': self._trigger_short_interest_fetch,
+        }
+        scheduled = {job_type: [] for job_type in self.JOB_TYPES}
+
+        for item in self.watchlist_repo.get_watchlist():
+            ticker = item.get('ticker')
+            if not ticker:
+                continue
+            ticker = ticker.upper()
+            for job_type in self._missing_job_types(item):
+                if ticker not in active[job_type] and triggers[job_type](ticker, priority=priority):
+                    scheduled[job_type].append(ticker)
 
         return {
             'success': True,
-            'watchlist': watchlist_data
+            'scheduled': scheduled
         }
 
     def _should_retry_growth_fetch(self, growth_status: str, growth_last_updated: str) -> bool:
@@ -145,31 +141,21 @@ class WatchlistService:
             return datetime.now(timezone.utc) - last_updated_dt > self.GROWTH_RETRY_DELAY
         return True
 
-    def _trigger_pe_calculation(self, ticker: str) -> None:
-        """Trigger background calculation of adjusted PE."""
-        if ticker in self.ongoing_fetches['pe']:
-            return
-            
-        self.ongoing_fetches['pe'].add(ticker)
+    def _trigger_pe_calculation(self, ticker: str, priority: int = PRIORITY_NORMAL) -> bool:
+        """Queue background calculation of adjusted PE. Returns True if a job was queued."""
+        def calculate_pe_background():
+            try:
+                self.adjusted_pe_service.calculate_and_store_adjusted_pe(ticker)
+            except Exception:
+                pass
+
         try:
-            def calculate_pe_background():
-                try:
-                    self.adjusted_pe_service.calculate_and_store_adjusted_pe(ticker)
-                except Exception:
-                    pass
-                finally:
-                    self.ongoing_fetches['pe'].discard(ticker)
-            thread = threading.Thread(target=calculate_pe_background, daemon=True)
-            thread.start()
+            return self.executor.submit('pe', ticker, calculate_pe_background, priority=priority)
         except Exception:
-            self.ongoing_fetches['pe'].discard(ticker)
+            return False
 
-    def _trigger_growth_fetch(self, ticker: str) -> None:
-        """Trigger background fetch of growth data."""
-        if ticker in self.ongoing_fetches['growth']:
-            return
-            
-        self.ongoing_fetches['growth'].add(ticker)
+    def _trigger_growth_fetch(self, ticker: str, priority: int = PRIORITY_NORMAL) -> bool:
+        """Queue background fetch of growth data. Returns True if a job was queued."""
         try:
             from utils.yfinance.yfinance_revenue_growth import get_revenue_growth_estimates
             def fetch_growth_background():
@@ -186,36 +172,31 @@ class WatchlistService:
                         self.data_repo.upsert_growth_estimates(ticker, None, None, status='no_data')
                 except Exception:
                     self.data_repo.upsert_growth_estimates(ticker, None, None, status='error')
-                finally:
-                    self.ongoing_fetches['growth'].discard(ticker)
-            thread = threading.Thread(target=fetch_growth_background, daemon=True)
-            thread.start()
+            return self.executor.submit('growth', ticker, fetch_growth_background, priority=priority)
         except Exception:
-            self.ongoing_fetches['growth'].discard(ticker)
+            return False
 
-    def _trigger_short_interest_fetch(self, ticker: str) -> None:
-        """Trigger background fetch of short interest data."""
-        if ticker in self.ongoing_fetches['short_interest']:
-            return
-            
-        self.ongoing_fetches['short_interest'].add(ticker)
+    def _trigger_short_interest_fetch(self, ticker: str, priority: int = PRIORITY_NORMAL) -> bool:
+        """
+        Queue background fetch of short interest data, served from a fresh Finviz
+        snapshot if one is stored. Returns True if a job was queued.
+        """
         try:
-            from data.short_interest_client import get_short_interest_for_ticker
+            finviz_service = get_finviz_snapshot_service(self.data_repo.db_path)
             def fetch_short_interest_background():
                 try:
-                    result = get_short_interest_for_ticker(ticker)
-                    if result:
-                        self.data_repo.upsert_short_interest(ticker, result.get('short_float'), status='success')
+                    result = finviz_service.get_short_interest(ticker)
+                    if result is None:
+                        self.data_repo.upsert_short_interest(ticker, None, status='error')
+                    elif result.get('short_float'):
+                        self.data_repo.upsert_short_interest(ticker, result['short_float'], status='success')
                     else:
                         self.data_repo.upsert_short_interest(ticker, None, status='no_data')
                 except Exception:
                     self.data_repo.upsert_short_interest(ticker, None, status='error')
-                finally:
-                    self.ongoing_fetches['short_interest'].discard(ticker)
-            thread = threading.Thread(target=fetch_short_interest_background, daemon=True)
-            thread.start()
+            return self.executor.submit('short_interest', ticker, fetch_short_interest_background, priority=priority)
         except Exception:
-            self.ongoing_fetches['short_interest'].discard(ticker)
+            return False
 
     def add_to_watchlist(self, ticker: str) -> Dict[str, Any]:
         """Add ticker to watchlist with validation."""
@@ -239,9 +220,9 @@ class WatchlistService:
         # Add to watchlist
         if self.watchlist_repo.add_to_watchlist(ticker):
             # Trigger background fetches for all missing metrics immediately
-            self._trigger_pe_calculation(ticker)
-            self._trigger_growth_fetch(ticker)
-            self._trigger_short_interest_fetch(ticker)
+            self._trigger_pe_calculation(ticker, priority=PRIORITY_HIGH)
+            self._trigger_growth_fetch(ticker, priority=PRIORITY_HIGH)
+            self._trigger_short_interest_fetch(ticker, priority=PRIORITY_HIGH)
             
             return {
                 'success': True,
@@ -295,7 +276,7 @@ class WatchlistService:
                 if existing and existing.get('calculation_status') in ['no_data', 'error', 'api_key_missing']:
                     continue  # Don't retry permanent failures
 
-                # Calculate in background
+                # Calculate in background, behind interactive requests
                 def calculate_pe_background(ticker=ticker):
                     try:
                         self.adjusted_pe_service.calculate_and_store_adjusted_pe(ticker)
@@ -303,8 +284,7 @@ class WatchlistService:
                     except Exception as e:
                         print(f"Failed to calculate adjusted PE for {ticker}: {e}")
 
-                thread = threading.Thread(target=calculate_pe_background, daemon=True)
-                thread.start()
+                self.executor.submit('pe', ticker, calculate_pe_background, priority=PRIORITY_LOW)
 
             except Exception as e:
                 print(f"Error checking/calculating adjusted PE for {ticker}: {e}")
@@ -2,6 +2,10 @@ import pytest
 from unittest.mock import MagicMock
 import sys
 import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
 
 # Add project root to sys.path to resolve 'src' imports during collection
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
@@ -48,3 +52,90 @@ def mock_ai_clients(monkeypatch):
     
     mock_anthropic = MagicMock()
     monkeypatch.setitem(sys.modules, "anthropic", mock_anthropic)
+
+
+class LocalHTTPServer:
+    """
+    Threaded local HTTP server for scraper tests.
+
+    Each GET is answered by respond(path, query, headers) -> (status, headers, body).
+    Queued (status, headers) entries in scripts[path] override the status and
+    headers of the next requests to that path. Every request's path and headers
+    are recorded, and concurrent requests are tracked in max_in_flight.
+    """
+
+    def __init__(self):
+        self.respond = lambda path, query, headers: (200, {}, path)
+        self.scripts = {}
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.delay = 0.0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                headers = dict(self.headers)
+                with stub.lock:
+                    stub.requests.append((parts.path, headers))
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                    script = stub.scripts.get(parts.path, [])
+                    scripted = script.pop(0) if script else None
+                try:
+                    if stub.delay:
+                        time.sleep(stub.delay)
+                    status, response_headers, body = stub.respond(parts.path, parse_qs(parts.query), headers)
+                    if scripted:
+                        status, response_headers = scripted
+                    payload = body.encode() if isinstance(body, str) else body
+                    self.send_response(status)
+                    for name, value in response_headers.items():
+                        self.send_header(name, value)
+                    if status != 304:
+                        self.send_header('Content-Length', str(len(payload)))
+                    self.end_headers()
+                    if status != 304:
+                        self.wfile.write(payload)
+                finally:
+                    with stub.lock:
+                        stub.in_flight -= 1
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def hits(self, path):
+        """Number of requests made to a path."""
+        with self.lock:
+            return sum(1 for requested, _ in self.requests if requested == path)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def local_server():
+    """A LocalHTTPServer that echoes the request path; tests replace respond as needed."""
+    server = LocalHTTPServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def make_engine():
+    """Build a ScrapeEngine fast enough for tests; pass sleeps (a list) to record waits instead of sleeping."""
+    from web_app.backend.utils.scrapers.scrape_engine import ScrapeEngine
+
+    def make(sleeps=None, **kwargs):
+        options = dict(rate=1000.0, burst=1000, max_retries=3, backoff_base=0.01)
+        options.update(kwargs)
+        return ScrapeEngine(sleep=(sleeps.append if sleeps is not None else time.sleep), **options)
+    return make
@@ -21,7 +21,10 @@ def api_controller(mock_services):
     with patch('web_app.backend.controllers.api_controller.PeersRepository'), \
          patch('web_app.backend.controllers.api_controller.DataRepository'), \
          patch('web_app.backend.controllers.api_controller.PeersService'):
-        return ApiController(data_service, watchlist_service)
+        controller = ApiController(data_service, watchlist_service)
+    controller.executor = MagicMock()
+    controller.executor.is_active.return_value = False
+    return controller
 
 def test_search_ticker(app, api_controller, mock_services):
     data_service, _ = mock_services
@@ -160,7 +163,7 @@ def test_calculate_missing_adjusted_pe(app, api_controller, mock_services):
             assert 'Started calculating' in response.json['message']
 
 def test_get_peers_already_in_progress(app, api_controller):
-    api_controller.ongoing_peer_finding.add("AAPL")
+    api_controller.executor.is_active.return_value = True
     with app.app_context():
         api_controller.peers_service = MagicMock()
         api_controller.peers_service.get_peers.return_value = {
@@ -171,6 +174,34 @@ def test_get_peers_already_in_progress(app, api_controller):
         assert status_code == 202
         assert response.json['finding_peers'] is True
         assert 'already in progress' in response.json['message']
+        api_controller.executor.submit.assert_not_called()
+
+def test_get_peers_queues_peer_finding(app, api_controller):
+    api_controller.peers_service = MagicMock()
+    api_controller.peers_service.get_peers.return_value = {
+        'success': False,
+        'message': 'No peer analysis found'
+    }
+    with app.app_context():
+        response, status_code = api_controller.get_peers("AAPL")
+        assert status_code == 202
+        assert response.json['finding_peers'] is True
+
+    args, kwargs = api_controller.executor.submit.call_args
+    assert args[:2] == ('peers', 'AAPL')
+    # Running the queued job finds peers
+    args[2]()
+    api_controller.peers_service.find_peers.assert_called_once_with("AAPL")
+
+def test_get_job_status(app, api_controller):
+    api_controller.executor.get_status.return_value = {'pe': {'queued': 1}}
+    api_controller.executor.list_jobs.return_value = [{'job_type': 'pe', 'ticker': 'AAPL'}]
+    api_controller.executor.list_leases.return_value = []
+    with app.app_context():
+        response, status_code = api_controller.get_job_status()
+        assert status_code == 200
+        assert response.json['pools'] == {'pe': {'queued': 1}}
+        assert response.json['jobs'][0]['ticker'] == 'AAPL'
 
 def test_get_peers_success(app, api_controller):
     api_controller.peers_service = MagicMock()
@@ -0,0 +1,110 @@
+import json
+import os
+import random
+import time
+import pytest
+import numpy as np
+import web_app.backend.core.financial_scorer as scorer
+from web_app.backend.core.columnar_cache import ColumnarCache
+from web_app.backend.tests.test_financial_scorer import _random_stock
+
+@pytest.fixture
+def jsonl_files(tmp_path):
+    rng = random.Random(11)
+    nyse = [_random_stock(rng, i) for i in range(80)]
+    nasdaq = [_random_stock(rng, i) for i in range(80, 130)]
+    nasdaq.append({"symbol": "NODATA", "company_name": "No Data"})
+    nyse_file = os.path.join(tmp_path, "nyse.jsonl")
+    nasdaq_file = os.path.join(tmp_path, "nasdaq.jsonl")
+    for filename, stocks in ((nyse_file, nyse), (nasdaq_file, nasdaq)):
+        with open(filename, 'w') as f:
+            for stock in stocks:
+                f.write(json.dumps(stock) + '\n')
+    return nyse_file, nasdaq_file, nyse, nasdaq
+
+def test_compile_and_open(tmp_path, jsonl_files):
+    nyse_file, nasdaq_file, nyse, nasdaq = jsonl_files
+    cache_dir = os.path.join(tmp_path, "cache")
+    scorer.compile_columnar_cache(nyse_file, nasdaq_file, cache_dir)
+
+    cache = ColumnarCache.open(cache_dir)
+    assert len(cache) == 131
+    assert cache.counts == {"NYSE": 80, "NASDAQ": 51}
+    assert isinstance(cache.values("revenue"), np.memmap)
+    assert cache.is_fresh([nyse_file, nasdaq_file], scorer._cache_fields())
+
+    stock = cache.lookup("S5")
+    original = nyse[5]["data"]
+    assert stock["company_name"] == "Stock 5"
+    assert stock["data"]["operating_income"] == [None if v is None else float(v) for v in original["operating_income"]]
+    assert cache.lookup("NODATA") == {"symbol": "NODATA", "company_name": "No Data"}
+    assert cache.lookup("MISSING") is None
+
+def test_freshness_follows_source_content(tmp_path, jsonl_files):
+    nyse_file, nasdaq_file, _, _ = jsonl_files
+    cache_dir = os.path.join(tmp_path, "cache")
+    cache = scorer.compile_columnar_cache(nyse_file, nasdaq_file, cache_dir)
+
+    # A touched but unchanged file is still fresh thanks to the content hash
+    later = time.time() + 10
+    os.utime(nyse_file, (later, later))
+    assert cache.is_fresh()
+
+    with open(nasdaq_file, 'a') as f:
+        f.write(json.dumps({"symbol": "NEW", "data": {}}) + '\n')
+    assert not cache.is_fresh()
+    assert not cache.is_fresh([nasdaq_file, nyse_file])
+    assert scorer.open_columnar_cache(nyse_file, nasdaq_file, cache_dir, rebuild=False) is None
+
+    rebuilt = scorer.open_columnar_cache(nyse_file, nasdaq_file, cache_dir)
+    assert rebuilt.counts["NASDAQ"] == 52
+    assert rebuilt.is_fresh()
+    # The old build is removed once the new manifest is in place
+    assert sorted(os.listdir(cache_dir)) == sorted([rebuilt.manifest["build"], "manifest.json"])
+
+def test_cache_requires_metric_fields(tmp_path, jsonl_files):
+    nyse_file, nasdaq_file, _, _ = jsonl_files
+    cache_dir = os.path.join(tmp_path, "cache")
+    cache = scorer.compile_columnar_cache(nyse_file, nasdaq_file, cache_dir)
+    assert not cache.is_fresh(fields=["revenue", "dividends"])
+    assert not cache.is_fresh(all_fields=True)
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_scores_from_cache_match_jsonl(tmp_path, jsonl_files, engine):
+    nyse_file, nasdaq_file, _, _ = jsonl_files
+    cache = scorer.compile_columnar_cache(nyse_file, nasdaq_file, os.path.join(tmp_path, "cache"))
+
+    expected, _ = scorer.calculate_scores_from_jsonl(nyse_file, nasdaq_file, engine=engine)
+    scores = scorer.calculate_scores_from_cache(cache, engine=engine)
+    assert scores == expected
+    # Integer market caps stay integers in scores.json
+    assert [type(s["market_cap"]) for s in scores] == [type(s["market_cap"]) for s in expected]
+    assert int in {type(s["market_cap"]) for s in scores}
+
+def test_numpy_cache_path_reports_ignored_workers(tmp_path, jsonl_files, capsys):
+    nyse_file, nasdaq_file, _, _ = jsonl_files
+    cache = scorer.compile_columnar_cache(nyse_file, nasdaq_file, os.path.join(tmp_path, "cache"))
+    capsys.readouterr()
+
+    expected = scorer.calculate_scores_from_cache(cache, engine="numpy")
+    assert "ignored" not in capsys.readouterr().out
+    assert scorer.calculate_scores_from_cache(cache, engine="numpy", workers=4) == expected
+    assert "worker count 4 is ignored" in capsys.readouterr().out
+
+def test_scores_from_cache_with_custom_metric(tmp_path, jsonl_files):
+    nyse_file, nasdaq_file, nyse, nasdaq = jsonl_files
+    custom = scorer.MetricConfig(
+        key="revenue_count", display_name="Revenue Count", description="",
+        calculator=lambda s: (None, None, float(len(s["data"].get("revenue") or [])), "p")
+        if s.get("data") else None)
+
+    original_metrics = scorer.METRICS
+    scorer.METRICS = original_metrics + [custom]
+    try:
+        # A metric without declared fields makes the cache store every field
+        cache = scorer.open_columnar_cache(nyse_file, nasdaq_file, os.path.join(tmp_path, "cache"))
+        assert cache.manifest["all_fields"]
+        expected = scorer.calculate_scores_for_all_stocks(nyse, nasdaq, engine="numpy")
+        assert scorer.calculate_scores_from_cache(cache, engine="numpy") == expected
+    finally:
+        scorer.METRICS = original_metrics
@@ -0,0 +1,75 @@
+import sqlite3
+import pytest
+from web_app.backend.repositories.base_repository import close_all_pools
+from web_app.backend.repositories.company_repository import CompanyRepository
+from web_app.backend.repositories.company_search_repository import CompanySearchRepository, build_match_query
+
+@pytest.fixture
+def companies_db(tmp_path):
+    path = str(tmp_path / "companies.db")
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE companies (id INTEGER PRIMARY KEY, ticker TEXT UNIQUE, company_name TEXT,
+                 exchange TEXT, sector TEXT, industry TEXT, updated_at TIMESTAMP)""")
+    conn.execute("CREATE TABLE ticker_aliases (company_id INTEGER, ticker TEXT, is_primary INTEGER)")
+    conn.executemany("INSERT INTO companies (id, ticker, company_name, sector, industry) VALUES (?, ?, ?, ?, ?)", [
+        (1, 'NVDA', 'NVIDIA Corporation', 'Technology', 'Semiconductors'),
+        (2, 'AMD', 'Advanced Micro Devices', 'Technology', 'Semiconductors'),
+        (3, 'AMAT', 'Applied Materials', 'Technology', 'Semiconductor Equipment & Materials'),
+        (4, 'BRK.B', 'Berkshire Hathaway Inc.', 'Financial Services', 'Insurance - Diversified'),
+        (5, 'KO', 'The Coca-Cola Company', 'Consumer Defensive', 'Beverages - Non-Alcoholic'),
+        (6, 'MCRI', 'Monarch Casino & Resort', 'Consumer Cyclical', 'Resorts & Casinos'),
+    ])
+    conn.execute("INSERT INTO ticker_aliases VALUES (4, 'BRK-B', 0)")
+    conn.commit()
+    conn.close()
+    yield path
+    close_all_pools()
+
+def tickers(rows):
+    return [row['ticker'] for row in rows]
+
+def test_build_match_query():
+    assert build_match_query('Coca-Cola') == '"coca"* "cola"*'
+    assert build_match_query('semi', prefix=False) == '"semi"'
+    assert build_match_query('NEAR OR "x"') == '"near"* "or"* "x"*'
+    assert build_match_query(' -- ') is None
+
+def test_search_tokens_prefixes_and_filters(companies_db):
+    repo = CompanySearchRepository(companies_db)
+    assert set(tickers(repo.search('semiconductor'))) == {'NVDA', 'AMD', 'AMAT'}
+    assert tickers(repo.search('materials')) == ['AMAT']
+    assert tickers(repo.search('micro dev')) == ['AMD']
+    assert tickers(repo.search('cola')) == ['KO']
+    assert tickers(repo.search('brk-b')) == ['BRK.B']
+    assert set(tickers(repo.search('semiconductors', prefix=False))) == {'AMD', 'NVDA'}
+    assert tickers(repo.search('semi', industry='semiconductor equipment & materials')) == ['AMAT']
+    assert repo.search('semi', sector='Financial Services') == []
+    assert repo.search('') == []
+
+def test_search_ranks_ticker_matches_first(companies_db):
+    repo = CompanySearchRepository(companies_db)
+    # Ticker matches outweigh name matches
+    assert tickers(repo.search('mcri')) == ['MCRI']
+    assert tickers(repo.search('mc')) == ['MCRI']
+    assert tickers(repo.search('m'))[0] == 'MCRI'
+    assert repo.search('nvda')[0]['score'] < 0
+
+def test_triggers_keep_index_in_sync(companies_db):
+    search = CompanySearchRepository(companies_db)
+    search.ensure_table()
+    companies = CompanyRepository(companies_db)
+
+    company_id = companies.create_company('TSM', 'Taiwan Semiconductor Manufacturing', sector='Technology')
+    assert 'TSM' in tickers(search.search('taiwan'))
+    assert tickers(search.search('tsm')) == ['TSM']
+
+    companies.update_company(company_id, company_name='TSMC Limited')
+    assert search.search('taiwan') == []
+    assert tickers(search.search('tsmc')) == ['TSM']
+
+    companies.add_ticker_alias(company_id, '2330.TW')
+    assert tickers(search.search('2330')) == ['TSM']
+
+    companies.execute_update("DELETE FROM companies WHERE id = ?", (company_id,))
+    assert search.search('tsmc') == []
+    assert search.rebuild() == 6
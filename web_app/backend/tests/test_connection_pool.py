@@ -0,0 +1,100 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import pytest
+from web_app.backend.repositories.connection_pool import ConnectionPool, PoolClosedError
+from web_app.backend.repositories.base_repository import BaseRepository, get_pool, close_all_pools
+
+@pytest.fixture
+def temp_db():
+    fd, path = tempfile.mkstemp()
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE companies (id INTEGER PRIMARY KEY, ticker TEXT)")
+    conn.execute("INSERT INTO companies (ticker) VALUES ('AAPL')")
+    conn.commit()
+    conn.close()
+    yield path
+    close_all_pools()
+    os.close(fd)
+    os.unlink(path)
+
+def test_connections_are_reused(temp_db):
+    pool = ConnectionPool(temp_db, max_size=2)
+    conn = pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() is conn
+    assert pool.size == 1
+
+def test_pool_is_bounded(temp_db):
+    pool = ConnectionPool(temp_db, max_size=1, timeout=0.05)
+    conn = pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() is conn
+
+def test_waiting_thread_gets_released_connection(temp_db):
+    pool = ConnectionPool(temp_db, max_size=1, timeout=5)
+    conn = pool.acquire()
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+    waiter.start()
+    pool.release(conn)
+    waiter.join(timeout=5)
+    assert acquired == [conn]
+
+def test_release_rolls_back_open_transaction(temp_db):
+    pool = ConnectionPool(temp_db, max_size=1)
+    conn = pool.acquire()
+    conn.execute("INSERT INTO companies (ticker) VALUES ('MSFT')")
+    pool.release(conn)
+    conn = pool.acquire()
+    assert conn.execute("SELECT COUNT(*) FROM companies").fetchone()[0] == 1
+
+def test_replaced_file_is_not_served_from_stale_connection(temp_db):
+    pool = ConnectionPool(temp_db, max_size=1)
+    stale = pool.acquire()
+    pool.release(stale)
+
+    # Recreate the database under the same path
+    os.unlink(temp_db)
+    conn = sqlite3.connect(temp_db)
+    conn.execute("CREATE TABLE companies (id INTEGER PRIMARY KEY, ticker TEXT)")
+    conn.commit()
+    conn.close()
+
+    fresh = pool.acquire()
+    assert fresh is not stale
+    assert fresh.execute("SELECT COUNT(*) FROM companies").fetchone()[0] == 0
+    assert pool.size == 1
+
+def test_closed_pool_rejects_acquire(temp_db):
+    pool = ConnectionPool(temp_db, max_size=1)
+    pool.release(pool.acquire())
+    pool.close()
+    assert pool.size == 0
+    with pytest.raises(PoolClosedError):
+        pool.acquire()
+
+def test_repositories_share_pool(temp_db):
+    repo_a = BaseRepository(temp_db)
+    repo_b = BaseRepository(temp_db)
+    assert repo_a.pool is repo_b.pool is get_pool(temp_db)
+
+    assert repo_a.execute_single("SELECT ticker FROM companies")['ticker'] == 'AAPL'
+    repo_b.execute_update("INSERT INTO companies (ticker) VALUES ('MSFT')")
+    assert len(repo_a.execute_query("SELECT * FROM companies")) == 2
+    assert repo_a.pool.size == 1
+
+def test_pool_size_is_fixed_on_first_use(temp_db, capsys):
+    pool = get_pool(temp_db, max_size=3)
+    assert get_pool(temp_db) is pool
+    assert capsys.readouterr().out == ''
+
+    assert get_pool(temp_db, max_size=5) is pool
+    assert pool.max_size == 3
+    assert 'ignoring requested max_size=5' in capsys.readouterr().out
+
+def test_memory_database_is_not_pooled():
+    assert BaseRepository(":memory:").pool is None
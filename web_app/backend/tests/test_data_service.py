@@ -61,19 +61,62 @@ def test_search_ticker_exact_match(service, mock_data_repo):
     assert result['ticker'] == 'AAPL'
     assert result['match_type'] == 'ticker'
 
+def test_search_ticker_loads_record_once(service, mock_data_repo):
+    mock_data_repo.get_complete_data.return_value = {'ticker': 'AAPL', 'financial_total_percentile': 90.0}
+
+    result = service.search_ticker("aapl")
+
+    assert result['data']['financial_total_percentile'] == 90.0
+    mock_data_repo.get_complete_data.assert_called_once_with("AAPL")
+    mock_data_repo.company_repo.get_company_by_ticker.assert_not_called()
+    mock_data_repo.financial_scores_repo.get_financial_scores_by_ticker.assert_not_called()
+
+def test_search_ticker_company_prefix_match(service, mock_data_repo):
+    mock_data_repo.get_search_entries.return_value = [{'ticker': 'AAPL', 'company_name': 'Apple Inc', 'aliases': []}]
+    mock_data_repo.get_complete_data.side_effect = lambda t: {'ticker': 'AAPL'} if t == 'AAPL' else None
+
+    result = service.search_ticker("apple")
+
+    assert result['ticker'] == 'AAPL'
+    assert result['match_type'] == 'company'
+    assert [c.args for c in mock_data_repo.get_complete_data.call_args_list] == [("APPLE",), ("AAPL",)]
+    mock_data_repo.search_companies_fulltext.assert_not_called()
+
 def test_get_search_suggestions(service, mock_data_repo):
     query = "AA"
-    mock_suggestions = [
-        {'ticker': 'AA', 'company_name': 'Alcoa'},
-        {'ticker': 'AAPL', 'company_name': 'Apple'}
+    mock_data_repo.get_search_entries.return_value = [
+        {'ticker': 'AA', 'company_name': 'Alcoa', 'aliases': []},
+        {'ticker': 'AAPL', 'company_name': 'Apple', 'aliases': []},
+        {'ticker': 'MSFT', 'company_name': 'Microsoft', 'aliases': []}
     ]
-    mock_data_repo.search_tickers.return_value = mock_suggestions
     
     result = service.get_search_suggestions(query)
     
     assert result['success'] is True
     assert len(result['suggestions']) == 2
     assert result['count'] == 2
+    mock_data_repo.search_tickers.assert_not_called()
+
+def test_get_search_suggestions_falls_back_to_sql(service, mock_data_repo):
+    mock_data_repo.get_search_entries.side_effect = Exception("no such table: companies")
+    mock_data_repo.search_tickers.return_value = [{'ticker': 'AAPL', 'company_name': 'Apple'}]
+
+    result = service.get_search_suggestions("aa")
+
+    assert result['count'] == 1
+    mock_data_repo.search_tickers.assert_called_once_with("AA", limit=10)
+
+def test_get_search_suggestions_fulltext(service, mock_data_repo):
+    mock_data_repo.search_companies_fulltext.return_value = [
+        {'ticker': 'NVDA', 'company_name': 'NVIDIA', 'match_type': 'fulltext', 'priority': 3}
+    ]
+
+    result = service.get_search_suggestions("semiconductor", mode='fulltext', sector='Technology')
+
+    assert result['count'] == 1
+    mock_data_repo.search_companies_fulltext.assert_called_once_with(
+        "SEMICONDUCTOR", limit=10, sector='Technology', industry=None)
+    assert service.get_search_suggestions("x", mode='fuzzy')['success'] is False
 
 def test_get_metrics_data_success(service, mock_data_repo):
     ticker = "AAPL"
@@ -1,5 +1,8 @@
 import pytest
 import math
+import json
+import os
+from unittest.mock import patch
 from web_app.backend.core.financial_scorer import (
     _calc_ebit_ppe,
     _calc_gross_margin,
@@ -288,3 +291,270 @@ def test_calc_net_debt_to_ttm_operating_income():
     stock_data["data"]["net_debt"][-1] = 50.0
     result = _calc_net_debt_to_ttm_operating_income(stock_data)
     assert result[2] == 50.0 / abs(-40.0) * 1000
+
+def _random_stock(rng, i):
+    """Random stock record exercising gaps, zeros, negatives, short series and bad fields."""
+    n = rng.choice([0, 3, 4, 12, 19, 20, 21, 25, 32, 40])
+    def series(missing_rate, zero_rate=0.0, negative=True):
+        values = []
+        for _ in range(n + rng.choice([-2, 0, 0, 0, 3])):
+            r = rng.random()
+            if r < missing_rate:
+                values.append(None)
+            elif r < missing_rate + zero_rate:
+                values.append(rng.choice([0, 0.0]))
+            else:
+                value = rng.uniform(-50, 500) if negative else rng.uniform(1, 1000)
+                values.append(rng.choice([round(value, 2), int(value), value]))
+        return values
+    data = {
+        "period_end_date": [f"20{10 + q // 4}-Q{q % 4 + 1}" for q in range(n)],
+        "revenue": series(rng.choice([0.0, 0.0, 0.02, 0.2]), 0.03, negative=False),
+        "operating_income": series(rng.choice([0.0, 0.02, 0.2]), 0.03),
+        "ppe_net": series(0.05, 0.05),
+        "net_debt": series(0.05, 0.1),
+        "market_cap": series(0.1),
+    }
+    if rng.random() < 0.5:
+        data["cost_of_goods_sold"] = series(0.05)
+    else:
+        data["cost_of_goods_sold"] = []
+        data["cogs"] = series(0.05)
+    if rng.random() < 0.05:
+        data["revenue"] = None  # Not a list
+    if rng.random() < 0.05:
+        data["period_end_date"] = []
+        data["fiscal_quarter_key"] = [f"Q{q}" for q in range(n)]
+    return {"symbol": f"S{i}", "company_name": f"Stock {i}", "data": data}
+
+def test_vectorized_engine_matches_python_engine():
+    import random
+    import web_app.backend.core.financial_scorer as scorer
+    rng = random.Random(1234)
+    nyse = [_random_stock(rng, i) for i in range(400)]
+    nasdaq = [_random_stock(rng, i) for i in range(400, 800)]
+    nasdaq.append({"symbol": "NODATA", "company_name": "No Data"})
+
+    python_scores = scorer.calculate_scores_for_all_stocks(nyse, nasdaq, engine="python")
+    numpy_scores = scorer.calculate_scores_for_all_stocks(nyse, nasdaq, engine="numpy")
+
+    assert len(python_scores) > 100
+    # Exact equality, including float bits, periods, ranks and percentiles
+    assert numpy_scores == python_scores
+    for metric in METRICS:
+        assert any(s[metric.key] is not None for s in python_scores), metric.key
+
+def test_vectorized_engine_falls_back_for_custom_metrics():
+    import web_app.backend.core.financial_scorer as scorer
+    custom = MetricConfig(key="custom", display_name="Custom", description="",
+                          calculator=lambda s: (s["symbol"], s["symbol"], 1.0, "P1"))
+    original_metrics = scorer.METRICS
+    scorer.METRICS = original_metrics + [custom]
+    try:
+        stocks = [{"symbol": "A", "data": {"period_end_date": ["P1"], "revenue": [1.0]}}]
+        result = scorer.calculate_scores_for_all_stocks(stocks, [], engine="numpy")
+        assert result[0]["custom"] == 1.0
+        assert result[0]["custom_rank"] == 1
+    finally:
+        scorer.METRICS = original_metrics
+
+def test_rank_metric_ties():
+    metric = MetricConfig(key="m", display_name="M", description="", calculator=lambda x: None)
+    values = [5.0, 7.0, 5.0, None, 5.0, 1.0]
+
+    ordinal = [{"m": v} for v in values]
+    _rank_metric(ordinal, metric)
+    # Equal values keep their input order
+    assert [s["m_rank"] for s in ordinal] == [2, 1, 3, None, 4, 5]
+
+    average = [{"m": v} for v in values]
+    _rank_metric(average, metric, ties="average")
+    assert [s["m_rank"] for s in average] == [3.0, 1.0, 3.0, None, 3.0, 5.0]
+    assert average[0]["m_percentile"] == calculate_percentile(3.0, 5)
+
+    with pytest.raises(ValueError):
+        _rank_metric([{"m": 1.0}], metric, ties="dense")
+
+def test_calculate_total_percentile_average_ties():
+    m1 = MetricConfig(key="m1", display_name="M1", description="", calculator=lambda x: None)
+    m2 = MetricConfig(key="m2", display_name="M2", description="", calculator=lambda x: None)
+
+    import web_app.backend.core.financial_scorer as scorer
+    original_metrics = scorer.METRICS
+    scorer.METRICS = [m1, m2]
+    try:
+        all_stock_data = [
+            {"m1": 1, "m1_rank": 1, "m2": 1, "m2_rank": 3},  # Avg rank 2
+            {"m1": 1, "m1_rank": 2, "m2": 1, "m2_rank": 2},  # Avg rank 2
+            {"m1": 1, "m1_rank": 3, "m2": 1, "m2_rank": 1},  # Avg rank 2
+            {"m1": 1, "m1_rank": 4, "m2": 1, "m2_rank": 4},  # Avg rank 4
+            {"m1": 1, "m1_rank": 5, "m2": None, "m2_rank": None},
+        ]
+        _calculate_total_percentile(all_stock_data, ties="average")
+        assert [s["total_rank"] for s in all_stock_data] == [2.0, 2.0, 2.0, 4.0, None]
+        assert all_stock_data[3]["total_percentile"] == 25.0
+
+        _calculate_total_percentile(all_stock_data)
+        assert [s["total_rank"] for s in all_stock_data] == [1, 2, 3, 4, None]
+        assert all("_combined_rank" not in s for s in all_stock_data)
+    finally:
+        scorer.METRICS = original_metrics
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_parallel_mode_matches_serial(engine):
+    import random
+    import web_app.backend.core.financial_scorer as scorer
+    rng = random.Random(99)
+    nyse = [_random_stock(rng, i) for i in range(120)]
+    nasdaq = [_random_stock(rng, i) for i in range(120, 200)]
+
+    serial = scorer.calculate_scores_for_all_stocks(nyse, nasdaq, engine=engine)
+    parallel = scorer.calculate_scores_for_all_stocks(nyse, nasdaq, engine=engine, workers=2, chunk_size=30)
+    assert parallel == serial
+
+def test_iter_stocks_from_jsonl_trims_fields(tmp_path):
+    import web_app.backend.core.financial_scorer as scorer
+    test_file = os.path.join(tmp_path, "test.jsonl")
+    with open(test_file, 'w') as f:
+        f.write('{"symbol": "AAPL", "data": {"revenue": [1, 2], "unused": [3]}}\n')
+        f.write('\n')
+        f.write('{"symbol": "BAD", "data": {"revenue": [NaN, 2]}}\n')
+        f.write('invalid json\n')
+
+    stocks = list(scorer.iter_stocks_from_jsonl(test_file, fields=["revenue", "period_end_date"]))
+    assert [s["symbol"] for s in stocks] == ["AAPL", "BAD"]
+    assert stocks[0]["data"] == {"revenue": [1, 2]}
+    assert math.isnan(stocks[1]["data"]["revenue"][0])
+
+    assert list(scorer.iter_stocks_from_jsonl(os.path.join(tmp_path, "missing.jsonl"))) == []
+
+def test_get_required_fields():
+    import web_app.backend.core.financial_scorer as scorer
+    fields = scorer.get_required_fields()
+    assert "market_cap" in fields and "period_end_date" in fields
+    assert {"revenue", "operating_income", "ppe_net", "net_debt"} <= set(fields)
+
+    original_metrics = scorer.METRICS
+    scorer.METRICS = original_metrics + [MetricConfig(key="custom", display_name="Custom", description="",
+                                                      calculator=lambda x: None)]
+    try:
+        assert scorer.get_required_fields() is None
+    finally:
+        scorer.METRICS = original_metrics
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_calculate_scores_from_jsonl_matches_in_memory(tmp_path, engine):
+    import json
+    import random
+    import web_app.backend.core.financial_scorer as scorer
+    rng = random.Random(7)
+    nyse = [_random_stock(rng, i) for i in range(60)]
+    nasdaq = [_random_stock(rng, i) for i in range(60, 100)]
+    nyse_file = os.path.join(tmp_path, "nyse.jsonl")
+    nasdaq_file = os.path.join(tmp_path, "nasdaq.jsonl")
+    for filename, stocks in ((nyse_file, nyse), (nasdaq_file, nasdaq)):
+        with open(filename, 'w') as f:
+            for stock in stocks:
+                f.write(json.dumps(stock) + '\n')
+
+    expected = scorer.calculate_scores_for_all_stocks(nyse, nasdaq, engine=engine)
+    scores, counts = scorer.calculate_scores_from_jsonl(nyse_file, nasdaq_file, engine=engine)
+    assert counts == {"NYSE": 60, "NASDAQ": 40}
+    assert scores == expected
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_incremental_scoring_recomputes_changed_stocks(tmp_path, engine):
+    import copy
+    import random
+    import web_app.backend.core.financial_scorer as scorer
+    rng = random.Random(5)
+    nyse = [_random_stock(rng, i) for i in range(60)]
+    nasdaq = [_random_stock(rng, i) for i in range(60, 100)]
+    nasdaq.append({"symbol": "NODATA", "company_name": "No Data"})
+    cache_file = os.path.join(tmp_path, "metric_cache.json")
+
+    cache = scorer.MetricValueCache(cache_file).load()
+    first = scorer.calculate_scores_for_all_stocks(nyse, nasdaq, engine=engine, metric_cache=cache)
+    assert first == scorer.calculate_scores_for_all_stocks(nyse, nasdaq, engine=engine)
+    assert (cache.hits, cache.misses) == (0, 101)
+    cache.save()
+
+    # Change two stocks, drop one and add a new one
+    nyse = copy.deepcopy(nyse)
+    nyse[3]["data"]["revenue"] = [r * 2 if r is not None else None for r in nyse[3]["data"]["revenue"] or []]
+    nasdaq = nasdaq[:-1] + [_random_stock(rng, 500)]
+    nasdaq[0]["company_name"] = "Renamed"
+    del nyse[10]
+
+    cache = scorer.MetricValueCache(cache_file).load()
+    second = scorer.calculate_scores_for_all_stocks(nyse, nasdaq, engine=engine, metric_cache=cache)
+    assert second == scorer.calculate_scores_for_all_stocks(nyse, nasdaq, engine=engine)
+    assert (cache.hits, cache.misses) == (97, 3)
+    cache.save()
+
+    # Only stocks of the last run are kept
+    with open(cache_file) as f:
+        assert len(json.load(f)["stocks"]) == 100
+
+def test_metric_cache_dropped_when_metrics_change(tmp_path):
+    import random
+    import web_app.backend.core.financial_scorer as scorer
+    rng = random.Random(6)
+    stocks = [_random_stock(rng, i) for i in range(10)]
+    cache_file = os.path.join(tmp_path, "metric_cache.json")
+    cache = scorer.MetricValueCache(cache_file).load()
+    scorer.calculate_scores_for_all_stocks(stocks, [], metric_cache=cache)
+    cache.save()
+
+    original_metrics = scorer.METRICS
+    scorer.METRICS = original_metrics[:-1]
+    try:
+        cache = scorer.MetricValueCache(cache_file).load()
+        scorer.calculate_scores_for_all_stocks(stocks, [], metric_cache=cache)
+        assert cache.hits == 0
+    finally:
+        scorer.METRICS = original_metrics
+
+def test_scores_index_lookups(tmp_path):
+    import web_app.backend.core.financial_scorer as scorer
+    test_file = os.path.join(tmp_path, "scores.json")
+    scores_data = [
+        {"symbol": "AAPL", "company_name": "Apple", "total_percentile": 90.0, "market_cap": 3e12},
+        {"symbol": "msft", "company_name": "Microsoft", "total_percentile": None,
+         "ebit_ppe_percentile": 50.0, "market_cap": 2e12},
+        {"symbol": "AAPL", "company_name": "Duplicate", "total_percentile": 10.0, "market_cap": None},
+        {"symbol": "TINY", "company_name": "Tiny", "total_percentile": 95.0, "market_cap": 1e8},
+        {"symbol": "NONE", "company_name": "No metrics"},
+    ]
+    scorer.save_scores_to_json(scores_data, test_file)
+    assert os.path.exists(test_file + ".idx")
+
+    with patch('web_app.backend.core.financial_scorer.load_scores_from_json') as mock_load:
+        found = scorer.lookup_stocks(["aapl", "MSFT", "ZZZ", "AAPL"], test_file)
+        assert found["AAPL"]["company_name"] == "Apple"
+        assert found["MSFT"]["company_name"] == "Microsoft"
+        assert "ZZZ" not in found
+        assert scorer.lookup_stock("tiny", test_file)["company_name"] == "Tiny"
+
+        stocks, total = scorer.query_ranked_scores(filename=test_file)
+        assert [s["company_name"] for s in stocks] == ["Tiny", "Apple", "Duplicate", "Microsoft", "No metrics"]
+        assert total == 5
+        stocks, total = scorer.query_ranked_scores(limit=1, min_market_cap=1e9, filename=test_file)
+        assert [s["company_name"] for s in stocks] == ["Apple"]
+        assert total == 2
+        # Everything came from the index
+        mock_load.assert_not_called()
+
+def test_scores_index_rebuilt_when_stale(tmp_path):
+    import json
+    import web_app.backend.core.financial_scorer as scorer
+    test_file = os.path.join(tmp_path, "scores.json")
+    scorer.save_scores_to_json([{"symbol": "AAPL", "company_name": "Apple"}], test_file)
+
+    # Rewritten without going through save_scores_to_json
+    with open(test_file, 'w') as f:
+        json.dump({"scores": [{"symbol": "AAPL", "company_name": "Apple Inc."}]}, f)
+    assert scorer.lookup_stock("AAPL", test_file)["company_name"] == "Apple Inc."
+
+    os.remove(test_file)
+    assert scorer.lookup_stocks(["AAPL"], test_file) is None
@@ -54,3 +54,86 @@ def test_get_top_financial_scores(financial_scores_repo):
     financial_scores_repo.execute_query.return_value = [{'ticker': 'AAPL'}]
     result = financial_scores_repo.get_top_financial_scores(limit=1)
     assert len(result) == 1
+
+@pytest.fixture
+def scores_db(tmp_path):
+    import sqlite3
+    from web_app.backend.repositories.base_repository import close_all_pools
+    path = str(tmp_path / "scores.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE companies (id INTEGER PRIMARY KEY, ticker TEXT, company_name TEXT)")
+    conn.execute("""
+        CREATE TABLE financial_scores (
+            company_id INTEGER PRIMARY KEY, total_percentile REAL, total_rank INTEGER,
+            company_name TEXT, last_updated TIMESTAMP
+        )
+    """)
+    conn.executemany("INSERT INTO companies (id, ticker, company_name) VALUES (?, ?, ?)",
+                     [(1, 'AAPL', 'Apple'), (2, 'MSFT', 'Microsoft'), (3, 'GOOG', 'Alphabet')])
+    conn.execute("INSERT INTO financial_scores (company_id, total_percentile, total_rank) VALUES (3, 10.0, 9)")
+    conn.commit()
+    conn.close()
+    yield path
+    close_all_pools()
+
+def test_replace_all_financial_scores(scores_db):
+    repo = FinancialScoresRepository(scores_db)
+    assert repo.replace_all_financial_scores([
+        {'company_id': 1, 'total_percentile': 90.0, 'total_rank': 1},
+        {'company_id': 2, 'total_percentile': 40.0, 'total_rank': 2},
+    ]) == 2
+    assert repo.replace_all_financial_scores([
+        {'company_id': 2, 'total_percentile': 75.0, 'total_rank': 1},
+    ]) == 1
+
+    rows = repo.execute_query("SELECT company_id, total_percentile, total_rank, last_updated FROM financial_scores")
+    assert [(r['company_id'], r['total_percentile'], r['total_rank']) for r in rows] == [(2, 75.0, 1)]
+    assert rows[0]['last_updated'] is not None
+
+def test_replace_all_financial_scores_rolls_back_on_error(scores_db):
+    repo = FinancialScoresRepository(scores_db)
+    with pytest.raises(Exception):
+        repo.replace_all_financial_scores([
+            {'company_id': 1, 'total_percentile': 90.0, 'missing_column': 1},
+        ])
+    rows = repo.execute_query("SELECT company_id, total_percentile FROM financial_scores")
+    assert rows == [{'company_id': 3, 'total_percentile': 10.0}]
+
+def test_publish_scores_to_db(scores_db):
+    import web_app.backend.core.financial_scorer as scorer
+    scores = [
+        {"symbol": "AAPL", "company_name": "Apple Inc", "exchange": "NASDAQ", "ebit_ppe": 2.0,
+         "ebit_ppe_rank": 1, "ebit_ppe_percentile": 100.0, "total_percentile": 100.0, "total_rank": 1},
+        {"symbol": "msft", "company_name": "Microsoft", "exchange": "NASDAQ", "ebit_ppe": 1.0,
+         "ebit_ppe_rank": 2, "ebit_ppe_percentile": 50.0, "total_percentile": None, "total_rank": None},
+        {"symbol": "ZZZZ", "company_name": "Unknown", "exchange": "NYSE"},
+    ]
+    published, not_found = scorer.publish_scores_to_db(scores, db_path=scores_db)
+    assert (published, not_found) == (2, ["ZZZZ"])
+
+    repo = FinancialScoresRepository(scores_db)
+    # Metric columns are added on first publish; exchange has no column and is skipped
+    assert {"ebit_ppe", "ebit_ppe_rank", "ebit_ppe_percentile"} <= set(repo.get_columns())
+    assert "exchange" not in repo.get_columns()
+    rows = repo.execute_query("SELECT company_id, ebit_ppe, company_name, total_rank FROM financial_scores ORDER BY company_id")
+    assert rows == [
+        {"company_id": 1, "ebit_ppe": 2.0, "company_name": "Apple Inc", "total_rank": 1},
+        {"company_id": 2, "ebit_ppe": 1.0, "company_name": "Microsoft", "total_rank": None},
+    ]
+
+def test_publish_refuses_to_wipe_scores(scores_db):
+    import web_app.backend.core.financial_scorer as scorer
+    repo = FinancialScoresRepository(scores_db)
+    with pytest.raises(ValueError):
+        repo.replace_all_financial_scores([])
+
+    # Mostly unmatched symbols point at the wrong database, not delistings
+    scores = [{"symbol": "AAPL", "total_percentile": 100.0, "total_rank": 1}] + \
+             [{"symbol": f"ZZ{i}"} for i in range(3)]
+    with pytest.raises(ValueError):
+        scorer.publish_scores_to_db(scores, db_path=scores_db)
+    with pytest.raises(ValueError):
+        scorer.publish_scores_to_db([], db_path=scores_db)
+
+    rows = repo.execute_query("SELECT company_id, total_percentile FROM financial_scores")
+    assert rows == [{'company_id': 3, 'total_percentile': 10.0}]
@@ -0,0 +1,114 @@
+import os
+from datetime import datetime, timedelta
+import pytest
+
+from web_app.backend.repositories.finviz_snapshot_repository import FinvizSnapshotRepository
+from web_app.backend.services.finviz_snapshot_service import FinvizSnapshotService, FinvizSnapshot
+
+FIELDS = {'Short Float': '0.78%', 'Short Ratio': '2.29', 'Forward P/E': '30.12', 'Dividend Est.': '1.00 (0.43%)'}
+
+
+@pytest.fixture
+def snapshot_repo(tmp_path):
+    return FinvizSnapshotRepository(db_path=os.path.join(tmp_path, 'test.db'))
+
+
+class _Fetcher:
+    def __init__(self, fields=FIELDS):
+        self.fields = fields
+        self.calls = []
+        self.max_ages = []
+
+    def __call__(self, ticker, max_age=None):
+        self.calls.append(ticker)
+        self.max_ages.append(max_age)
+        if self.fields is None:
+            return None
+        return FinvizSnapshot(ticker, dict(self.fields))
+
+
+def test_repository_round_trip(snapshot_repo):
+    assert snapshot_repo.get_snapshot('AAPL') is None
+    assert snapshot_repo.upsert_snapshot('aapl', FIELDS, '2024-01-01T00:00:00')
+    assert snapshot_repo.upsert_snapshot('MSFT', {'Short Float': '1.10%'})
+
+    stored = snapshot_repo.get_snapshot('AAPL')
+    assert stored == {'ticker': 'AAPL', 'fields': FIELDS, 'scraped_at': '2024-01-01T00:00:00'}
+    assert snapshot_repo.get_field('AAPL', 'Dividend Est.') == '1.00 (0.43%)'
+    assert snapshot_repo.get_field('AAPL', 'Missing') is None
+    assert set(snapshot_repo.get_snapshots(['aapl', 'MSFT', 'GONE'])) == {'AAPL', 'MSFT'}
+
+    # A new scrape replaces the whole snapshot
+    snapshot_repo.upsert_snapshot('AAPL', {'Short Float': '0.80%'})
+    assert snapshot_repo.get_snapshot('AAPL')['fields'] == {'Short Float': '0.80%'}
+
+
+def test_fresh_snapshot_is_not_scraped_again(snapshot_repo):
+    fetcher = _Fetcher()
+    service = FinvizSnapshotService(snapshot_repo, fetcher=fetcher)
+
+    first = service.get_short_interest('aapl')
+    assert first['ticker'] == 'AAPL'
+    assert first['short_float'] == '0.78%'
+    # Every other field is served from the same stored snapshot
+    data = service.get_snapshot_data('AAPL')
+    assert data['fields']['Short Ratio'] == '2.29'
+    assert data['values']['Forward P/E'] == pytest.approx(30.12)
+    assert 'Dividend Est.' not in data['values']
+    assert data['fresh'] is True
+    assert fetcher.calls == ['AAPL']
+
+    service.get_snapshot('AAPL', refresh=True)
+    assert fetcher.calls == ['AAPL', 'AAPL']
+    # A refresh must not be answered from the HTTP cache
+    assert fetcher.max_ages == [None, 0]
+
+
+def test_stale_snapshot_is_rescraped(snapshot_repo):
+    stale = (datetime.now() - timedelta(hours=13)).isoformat()
+    snapshot_repo.upsert_snapshot('AAPL', {'Short Float': '5.00%'}, stale)
+    fetcher = _Fetcher()
+    service = FinvizSnapshotService(snapshot_repo, fetcher=fetcher)
+
+    assert service.get_short_interest('AAPL')['short_float'] == '0.78%'
+    assert fetcher.calls == ['AAPL']
+    assert snapshot_repo.get_snapshot('AAPL')['fields'] == FIELDS
+
+
+def test_failed_scrape_falls_back_to_stale_snapshot(snapshot_repo):
+    stale = (datetime.now() - timedelta(days=2)).isoformat()
+    snapshot_repo.upsert_snapshot('AAPL', {'Short Float': '-'}, stale)
+    service = FinvizSnapshotService(snapshot_repo, fetcher=_Fetcher(fields=None))
+
+    result = service.get_short_interest('AAPL')
+    assert result['short_float'] is None
+    assert result['scraped_at'] == stale
+    assert service.get_short_interest('GONE') is None
+    assert service.get_snapshot_data('GONE')['success'] is False
+
+
+def test_old_cached_page_is_revalidated_and_keeps_its_age(snapshot_repo):
+    old = (datetime.now() - timedelta(hours=20)).isoformat()
+    max_ages = []
+
+    def fetcher(ticker, max_age=None):
+        # The HTTP cache answers with an old page unless asked to revalidate
+        max_ages.append(max_age)
+        if max_age == 0:
+            return FinvizSnapshot(ticker, {'Short Float': '0.80%'})
+        return FinvizSnapshot(ticker, dict(FIELDS), old)
+
+    service = FinvizSnapshotService(snapshot_repo, fetcher=fetcher)
+    data = service.get_snapshot_data('AAPL')
+    assert max_ages == [None, 0]
+    assert data['fields'] == {'Short Float': '0.80%'}
+    assert data['fresh'] is True
+
+    # If revalidation fails the old page is stored with its real age, not as fresh
+    snapshot_repo.upsert_snapshot('MSFT', {'Short Float': '9.00%'}, (datetime.now() - timedelta(days=3)).isoformat())
+    service = FinvizSnapshotService(snapshot_repo, fetcher=lambda ticker, max_age=None:
+                                    None if max_age == 0 else FinvizSnapshot(ticker, dict(FIELDS), old))
+    data = service.get_snapshot_data('MSFT')
+    assert data['scraped_at'] == old
+    assert data['fresh'] is False
+    assert snapshot_repo.get_snapshot('MSFT')['scraped_at'] == old
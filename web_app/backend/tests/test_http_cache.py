@@ -0,0 +1,172 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+import requests
+
+from web_app.backend.utils.scrapers.http_cache import HttpCache, CachedResponse, response_fetched_at
+from web_app.backend.utils.scrapers.finviz_scraper import get_finviz_quote_url
+from web_app.backend.utils.scrapers.get_short_interest import scrape_finviz_snapshot
+
+ETAG = '"v1"'
+
+
+def _conditional_response(path, query, headers):
+    """Answer 304 to a matching If-None-Match on /etag; /private is marked no-store."""
+    if path == '/etag' and headers.get('If-None-Match') == ETAG:
+        return 304, {'ETag': ETAG}, b''
+    response_headers = {'Content-Type': 'text/html; charset=utf-8'}
+    if path == '/etag':
+        response_headers['ETag'] = ETAG
+    if path == '/private':
+        response_headers['Cache-Control'] = 'no-store'
+    return 200, response_headers, path * 200
+
+
+@pytest.fixture
+def server(local_server):
+    local_server.respond = _conditional_response
+    return local_server
+
+
+def test_fresh_pages_are_not_downloaded_again(server, make_engine, tmp_path):
+    engine = make_engine(cache=HttpCache(str(tmp_path), ttl=60))
+
+    first = engine.fetch(server.url + '/page')
+    second = engine.fetch(server.url + '/page')
+
+    assert server.hits('/page') == 1
+    assert 'X-Cache' not in first.headers
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.content == first.content
+    assert second.text == first.text
+    assert engine.get_stats()['requests'] == 1
+
+    # A new process sees the same entries on disk
+    assert make_engine(cache=HttpCache(str(tmp_path), ttl=60)).fetch(server.url + '/page').headers['X-Cache'] == 'HIT'
+    assert server.hits('/page') == 1
+
+
+def test_stale_pages_are_revalidated(server, make_engine, tmp_path):
+    cache = HttpCache(str(tmp_path), ttl=60)
+    engine = make_engine(cache=cache)
+    original = engine.fetch(server.url + '/etag')
+
+    # max_age=0 forces a conditional request even within the TTL
+    revalidated = engine.fetch(server.url + '/etag', max_age=0)
+    assert revalidated.headers['X-Cache'] == 'REVALIDATED'
+    assert revalidated.content == original.content
+    assert server.requests[-1][1].get('If-None-Match') == ETAG
+    # The 304 restarted the TTL
+    assert engine.fetch(server.url + '/etag').headers['X-Cache'] == 'HIT'
+    assert server.hits('/etag') == 2
+
+    # Without validators a stale page is downloaded in full
+    engine.fetch(server.url + '/plain')
+    assert 'X-Cache' not in engine.fetch(server.url + '/plain', max_age=0).headers
+    assert 'If-None-Match' not in server.requests[-1][1]
+
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['revalidations'], stats['misses']) == (1, 1, 3)
+    assert stats['bytes_saved'] == 2 * len(original.content)
+    assert stats['hit_rate'] == pytest.approx(0.4)
+
+
+def test_eviction_keeps_cache_within_max_bytes(server, make_engine, tmp_path):
+    cache = HttpCache(str(tmp_path), ttl=60)
+    engine = make_engine(cache=cache)
+    engine.fetch(server.url + '/a')
+    entry_size = cache.get_stats()['size_bytes']
+    cache.max_bytes = entry_size * 2 + entry_size // 2
+
+    time.sleep(0.01)
+    engine.fetch(server.url + '/b')
+    time.sleep(0.01)
+    # Reading /a makes /b the least recently used entry
+    engine.fetch(server.url + '/a')
+    engine.fetch(server.url + '/c')
+
+    stats = cache.get_stats()
+    assert stats['evictions'] == 1
+    assert stats['entries'] == 2
+    assert stats['size_bytes'] <= cache.max_bytes
+    assert cache.lookup(server.url + '/b') == (None, False)
+    assert cache.lookup(server.url + '/a')[1] is True
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_uncacheable_responses_are_not_stored(server, make_engine, tmp_path):
+    cache = HttpCache(str(tmp_path), ttl=60)
+    engine = make_engine(cache=cache)
+
+    engine.fetch(server.url + '/private')
+    engine.fetch(server.url + '/private')
+    assert server.hits('/private') == 2
+
+    error = requests.Response()
+    error.status_code = 404
+    error._content = b'missing'
+    assert cache.store(server.url + '/missing', error) is False
+    assert cache.get_stats()['entries'] == 0
+
+    cache.clear()
+    assert cache.get_stats()['size_bytes'] == 0
+
+
+def test_validate_rejects_unusable_bodies(server, make_engine, tmp_path):
+    cache = HttpCache(str(tmp_path), ttl=60)
+    engine = make_engine(cache=cache)
+    usable = lambda body: b'/good' in body
+
+    # A 200 the caller can't use (e.g. a block page) is not replayed from the cache
+    engine.fetch(server.url + '/blocked', validate=usable)
+    engine.fetch(server.url + '/blocked', validate=usable)
+    assert server.hits('/blocked') == 2
+    assert cache.get_stats()['entries'] == 0
+
+    # Entries stored before a validator was used are dropped on lookup
+    engine.fetch(server.url + '/stale-block')
+    assert 'X-Cache' not in engine.fetch(server.url + '/stale-block', validate=usable).headers
+    assert cache.get_stats()['entries'] == 0
+
+    engine.fetch(server.url + '/good', validate=usable)
+    assert engine.fetch(server.url + '/good', validate=usable).headers['X-Cache'] == 'HIT'
+
+
+def test_hits_survive_restart_in_lru_order(server, make_engine, tmp_path):
+    engine = make_engine(cache=HttpCache(str(tmp_path), ttl=60))
+    engine.fetch(server.url + '/a')
+    time.sleep(0.02)
+    engine.fetch(server.url + '/b')
+    time.sleep(0.02)
+    # Reading /a after /b was written makes /b least recently used, even for a new process
+    engine.fetch(server.url + '/a')
+
+    restarted = HttpCache(str(tmp_path), ttl=60)
+    entry_size = restarted.get_stats()['size_bytes'] // 2
+    restarted.max_bytes = entry_size * 2 + entry_size // 2
+    make_engine(cache=restarted).fetch(server.url + '/c')
+
+    assert restarted.lookup(server.url + '/b') == (None, False)
+    assert restarted.lookup(server.url + '/a')[1] is True
+
+
+
+def test_cached_pages_keep_their_fetch_time(server, make_engine, tmp_path):
+    cache = HttpCache(str(tmp_path), ttl=12 * 3600)
+    engine = make_engine(cache=cache)
+    url = get_finviz_quote_url('AAPL')
+    page = b'<table class="snapshot-table2"><tr><td>Short Float</td><td>0.78%</td></tr></table>'
+    stored_at = time.time() - 11 * 3600
+    key = cache._key(url)
+    with cache._lock:
+        cache._remember(key, cache._write(key, CachedResponse(url, page, {}, stored_at)))
+
+    # An 11h old page is still served from the cache, stamped with when it was really fetched
+    snapshot = scrape_finviz_snapshot('AAPL', engine=engine)
+    assert snapshot.short_float == '0.78%'
+    assert snapshot.scraped_at == datetime.fromtimestamp(stored_at).isoformat()
+    assert engine.get_stats()['requests'] == 0
+
+    downloaded = engine.fetch(server.url + '/page')
+    assert abs(datetime.fromisoformat(response_fetched_at(downloaded)) - datetime.now()) < timedelta(seconds=5)
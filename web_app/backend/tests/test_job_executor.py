@@ -0,0 +1,108 @@
+import threading
+import time
+import pytest
+from web_app.backend.services.job_executor import JobExecutor, PRIORITY_HIGH, PRIORITY_LOW
+
+@pytest.fixture
+def executor():
+    executor = JobExecutor(pool_sizes={'test': 1}, idle_timeout=0.2)
+    yield executor
+    executor.wait(timeout=5)
+
+def test_duplicate_jobs_are_ignored(executor):
+    release = threading.Event()
+    calls = []
+    def job():
+        release.wait(5)
+        calls.append(1)
+
+    assert executor.submit('test', 'aapl', job) is True
+    assert executor.submit('test', 'AAPL', job) is False
+    assert executor.is_active('test', 'AAPL')
+    # Same ticker under another job type is a separate job
+    assert executor.submit('other', 'AAPL', lambda: None) is True
+
+    release.set()
+    assert executor.wait(timeout=5)
+    assert calls == [1]
+    assert not executor.is_active('test', 'AAPL')
+
+def test_pool_size_caps_concurrency():
+    executor = JobExecutor(pool_sizes={'capped': 2}, idle_timeout=0.2)
+    lock = threading.Lock()
+    running = []
+    peak = []
+    def job():
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.pop()
+
+    for i in range(10):
+        executor.submit('capped', f'T{i}', job)
+    assert executor.get_status()['capped']['workers'] <= 2
+    assert executor.wait(timeout=5)
+    assert max(peak) <= 2
+    assert executor.get_status()['capped']['completed'] == 10
+
+def test_higher_priority_runs_first(executor):
+    release = threading.Event()
+    order = []
+    executor.submit('test', 'BLOCK', lambda: release.wait(5))
+    executor.submit('test', 'LOW', lambda: order.append('LOW'), priority=PRIORITY_LOW)
+    executor.submit('test', 'HIGH', lambda: order.append('HIGH'), priority=PRIORITY_HIGH)
+
+    jobs = {job['ticker']: job for job in executor.list_jobs('test')}
+    assert jobs['LOW']['state'] == 'queued'
+    assert executor.get_job('test', 'HIGH')['priority'] == PRIORITY_HIGH
+
+    release.set()
+    assert executor.wait(timeout=5)
+    assert order == ['HIGH', 'LOW']
+
+def test_failed_job_is_counted_and_released(executor):
+    def job():
+        raise RuntimeError("boom")
+
+    executor.submit('test', 'AAPL', job)
+    assert executor.wait(timeout=5)
+    status = executor.get_status()['test']
+    assert status['failed'] == 1
+    assert status['running'] == 0
+    # The slot is free again after a failure
+    assert executor.submit('test', 'AAPL', lambda: None) is True
+
+def test_idle_workers_exit(executor):
+    executor.submit('test', 'AAPL', lambda: None)
+    assert executor.wait(timeout=5)
+    deadline = time.time() + 5
+    while executor.get_status()['test']['workers'] and time.time() < deadline:
+        time.sleep(0.05)
+    assert executor.get_status()['test']['workers'] == 0
+
+def test_burst_scales_up_past_an_idle_worker():
+    executor = JobExecutor(pool_sizes={'burst': 4}, idle_timeout=2.0)
+    executor.submit('burst', 'FIRST', lambda: None)
+    assert executor.wait(timeout=5)
+    # One worker is now idle, waiting for more jobs
+    deadline = time.time() + 5
+    while executor._pools['burst'].idle_workers != 1 and time.time() < deadline:
+        time.sleep(0.01)
+
+    lock = threading.Lock()
+    running = []
+    peak = []
+    def job():
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.pop()
+
+    for i in range(20):
+        executor.submit('burst', f'T{i}', job)
+    assert executor.wait(timeout=5)
+    assert max(peak) == 4
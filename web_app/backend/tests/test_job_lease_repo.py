@@ -0,0 +1,77 @@
+import os
+import threading
+import tempfile
+import pytest
+from web_app.backend.repositories.job_lease_repository import JobLeaseRepository
+from web_app.backend.repositories.base_repository import close_all_pools
+from web_app.backend.services.job_executor import JobExecutor
+
+@pytest.fixture
+def temp_db():
+    fd, path = tempfile.mkstemp()
+    yield path
+    close_all_pools()
+    os.close(fd)
+    os.unlink(path)
+
+def test_lease_excludes_other_owners_until_expiry(temp_db):
+    repo = JobLeaseRepository(temp_db)
+    assert repo.try_acquire('pe', 'aapl', 'worker-1', ttl=60) is True
+    assert repo.try_acquire('pe', 'AAPL', 'worker-2', ttl=60) is False
+    assert repo.is_leased('pe', 'AAPL')
+    assert repo.get_leased_tickers('pe') == {'AAPL'}
+    # Other job types are independent
+    assert repo.try_acquire('growth', 'AAPL', 'worker-2', ttl=60) is True
+
+    # An expired lease can be taken over
+    assert repo.try_acquire('peers', 'MSFT', 'worker-1', ttl=-1) is True
+    assert not repo.is_leased('peers', 'MSFT')
+    assert repo.try_acquire('peers', 'MSFT', 'worker-2', ttl=60) is True
+    assert repo.renew('peers', 'MSFT', 'worker-1', ttl=60) is False
+
+def test_release_only_affects_owner(temp_db):
+    repo = JobLeaseRepository(temp_db)
+    repo.try_acquire('pe', 'AAPL', 'worker-1', ttl=60)
+    repo.try_acquire('pe', 'MSFT', 'worker-1', ttl=60)
+    repo.try_acquire('pe', 'GOOG', 'worker-2', ttl=60)
+
+    assert repo.release('pe', 'AAPL', 'worker-2') is False
+    assert repo.release('pe', 'AAPL', 'worker-1') is True
+    assert repo.release_owner('worker-1') == 1
+    assert [lease['ticker'] for lease in repo.get_active_leases()] == ['GOOG']
+
+def test_purge_expired(temp_db):
+    repo = JobLeaseRepository(temp_db)
+    repo.try_acquire('pe', 'AAPL', 'worker-1', ttl=-1)
+    repo.try_acquire('pe', 'MSFT', 'worker-1', ttl=60)
+    assert repo.purge_expired() == 1
+    assert repo.get_leased_tickers('pe') == {'MSFT'}
+
+def test_executors_share_leases(temp_db):
+    # Two executors stand in for two server processes
+    first = JobExecutor(idle_timeout=0.2, lease_repo=JobLeaseRepository(temp_db))
+    second = JobExecutor(idle_timeout=0.2, lease_repo=JobLeaseRepository(temp_db))
+    release = threading.Event()
+    calls = []
+
+    assert first.submit('pe', 'AAPL', lambda: (release.wait(5), calls.append('first'))) is True
+    assert second.submit('pe', 'AAPL', lambda: calls.append('second')) is False
+    assert second.is_active('pe', 'AAPL')
+    assert second.active_tickers('pe') == {'AAPL'}
+
+    release.set()
+    assert first.wait(timeout=5)
+    assert calls == ['first']
+    # The lease is released once the job finishes
+    assert not second.is_active('pe', 'AAPL')
+    assert second.submit('pe', 'AAPL', lambda: calls.append('second')) is True
+    assert second.wait(timeout=5)
+    assert calls == ['first', 'second']
+
+def test_executor_falls_back_without_database():
+    executor = JobExecutor(idle_timeout=0.2,
+                           lease_repo=JobLeaseRepository('/nonexistent/dir/jobs.db'))
+    calls = []
+    assert executor.submit('pe', 'AAPL', lambda: calls.append(1)) is True
+    assert executor.wait(timeout=5)
+    assert calls == [1]
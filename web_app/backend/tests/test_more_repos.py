@@ -57,6 +57,10 @@ def test_adjusted_pe_repo(temp_db):
     pe_by_ticker = repo.get_adjusted_pe_by_ticker('AAPL')
     assert pe_by_ticker['adjusted_pe_ratio'] == 25.5
 
+    pe_by_tickers = repo.get_adjusted_pe_by_tickers(['aapl', 'MSFT'])
+    assert list(pe_by_tickers) == ['AAPL']
+    assert pe_by_tickers['AAPL']['calculation_status'] == 'success'
+
 def test_data_repo_upserts(temp_db):
     # Need more tables for data repo
     conn = sqlite3.connect(temp_db)
@@ -97,3 +101,78 @@ def test_data_repo_upserts(temp_db):
     assert data['short_float'] == '1.5%'
     assert data['moat_score'] == 9.0
     assert data['adjusted_pe_ratio'] == 25.5
+
+def _add_growth_and_short_interest_tables(path):
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute("CREATE TABLE growth_estimates (company_id INTEGER PRIMARY KEY, current_year_growth REAL, next_year_growth REAL, last_updated TIMESTAMP, calculation_status TEXT)")
+    cursor.execute("CREATE TABLE short_interest (company_id INTEGER PRIMARY KEY, short_float TEXT, scraped_at TIMESTAMP, last_updated TIMESTAMP, calculation_status TEXT)")
+    cursor.execute("INSERT INTO companies (id, ticker, company_name) VALUES (2, 'MSFT', 'Microsoft')")
+    cursor.execute("INSERT INTO financial_scores (company_id, total_percentile, total_rank) VALUES (1, 88.0, 12)")
+    cursor.execute("INSERT INTO growth_estimates (company_id, current_year_growth, next_year_growth) VALUES (1, 5.0, 7.0)")
+    cursor.execute("INSERT INTO short_interest (company_id, short_float, scraped_at) VALUES (1, '0.8%', '2024-01-01')")
+    conn.commit()
+    conn.close()
+
+def test_data_repo_complete_data_joined(temp_db):
+    _add_growth_and_short_interest_tables(temp_db)
+    repo = DataRepository(db_path=temp_db)
+
+    data = repo.get_complete_data('aapl')
+    assert data == {
+        'ticker': 'AAPL',
+        'company_name': 'Apple',
+        'exchange': None,
+        'sector': None,
+        'industry': None,
+        'moat_score': 9.0,
+        'total_score_percentage': 95.0,
+        'total_score_percentile_rank': None,
+        'financial_total_percentile': 88.0,
+        'financial_total_rank': 12,
+        'adjusted_pe_ratio': 25.5,
+        'current_year_growth': 5.0,
+        'next_year_growth': 7.0,
+        'short_float': '0.8%',
+        'short_interest_scraped_at': '2024-01-01',
+    }
+
+    # Company without any related rows only gets the company fields
+    assert repo.get_complete_data('MSFT') == {
+        'ticker': 'MSFT',
+        'company_name': 'Microsoft',
+        'exchange': None,
+        'sector': None,
+        'industry': None,
+        'last_updated': None,
+    }
+    assert repo.get_complete_data('NOPE') is None
+
+def test_data_repo_complete_data_many(temp_db):
+    _add_growth_and_short_interest_tables(temp_db)
+    repo = DataRepository(db_path=temp_db)
+
+    results = repo.get_complete_data_many(['msft', 'AAPL', 'NOPE', 'AAPL'])
+    assert set(results) == {'AAPL', 'MSFT'}
+    assert results['AAPL'] == repo.get_complete_data('AAPL')
+    assert results['MSFT']['company_name'] == 'Microsoft'
+    assert repo.get_complete_data_many([]) == {}
+
+def test_data_repo_bulk_upsert_short_interest(temp_db):
+    _add_growth_and_short_interest_tables(temp_db)
+    repo = DataRepository(db_path=temp_db)
+    assert repo.get_complete_data('AAPL')['short_float'] == '0.8%'
+
+    stored = repo.bulk_upsert_short_interest([
+        {'ticker': 'aapl', 'short_float': '1.2%', 'status': 'success', 'scraped_at': '2024-02-01T00:00:00'},
+        {'ticker': 'MSFT', 'short_float': None, 'status': 'no_data'},
+        {'ticker': 'GONE', 'short_float': '9.9%', 'status': 'success'},
+    ])
+
+    assert stored == 2
+    rows = {row['company_id']: row for row in repo.execute_query("SELECT * FROM short_interest")}
+    assert len(rows) == 2
+    assert rows[1]['short_float'] == '1.2%' and rows[1]['scraped_at'] == '2024-02-01T00:00:00'
+    assert rows[2]['calculation_status'] == 'no_data' and rows[2]['scraped_at']
+    # Cached records of the touched companies are invalidated
+    assert repo.get_complete_data('AAPL')['short_float'] == '1.2%'
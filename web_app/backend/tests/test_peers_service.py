@@ -10,6 +10,8 @@ def mock_repos():
     data_repo.financial_scores_repo = MagicMock()
     data_repo.company_repo = MagicMock()
     data_repo.adjusted_pe_repo = MagicMock()
+    # No ui_cache table unless a test provides rows
+    data_repo.get_ui_cache_data_many.return_value = None
     return peers_repo, data_repo
 
 @pytest.fixture
@@ -18,7 +20,12 @@ def peers_service(mock_repos):
     # Patch AdjustedPERepository and AdjustedPEService during init
     with patch('web_app.backend.services.peers_service.AdjustedPERepository'), \
          patch('web_app.backend.services.peers_service.AdjustedPEService'):
-        return PeersService(peers_repo, data_repo)
+        service = PeersService(peers_repo, data_repo)
+    # Replace the process-wide short interest queue so tests never scrape
+    service.short_interest_queue = MagicMock()
+    service.short_interest_queue.request.return_value = True
+    service.short_interest_queue.get_unknown_result.return_value = (None, None)
+    return service
 
 def test_get_peers_ticker_not_found(peers_service, mock_repos):
     peers_repo, data_repo = mock_repos
@@ -56,19 +63,89 @@ def test_get_peers_success(peers_service, mock_repos):
         'estimated_cost_cents': 0.1
     }]
     
-    # Mock _get_ticker_data to avoid complex nested mocks for now
-    with patch.object(peers_service, '_get_ticker_data') as mock_get_data:
-        mock_get_data.side_effect = [
-            {'ticker': 'AAPL', 'company_name': 'Apple Inc'},
-            {'ticker': 'MSFT', 'company_name': 'Microsoft'}
-        ]
-        
+    data_repo.get_complete_data_many.return_value = {
+        'MSFT': {'ticker': 'MSFT', 'company_name': 'Microsoft', 'adjusted_pe_ratio': 30.0, 'short_float': '0.5%'}
+    }
+
+    with patch.object(peers_service, '_trigger_pe_calculation'):
         result = peers_service.get_peers("AAPL")
-        
-        assert result['success'] is True
-        assert result['main_ticker']['ticker'] == 'AAPL'
-        assert len(result['peers']) == 1
-        assert result['peers'][0]['ticker'] == 'MSFT'
+
+    assert result['success'] is True
+    assert result['main_ticker']['ticker'] == 'AAPL'
+    assert result['main_ticker']['company_name'] == 'Apple Inc'
+    assert len(result['peers']) == 1
+    assert result['peers'][0]['ticker'] == 'MSFT'
+    assert result['peers'][0]['adjusted_pe_ratio'] == 30.0
+
+def test_get_peers_batches_lookups_and_defers_fetches(peers_service, mock_repos):
+    peers_repo, data_repo = mock_repos
+    data_repo.get_complete_data.return_value = {
+        'ticker': 'AAPL', 'company_name': 'Apple Inc', 'adjusted_pe_ratio': 28.0, 'short_float': '0.7%'
+    }
+    peer_tickers = [f'P{i}' for i in range(10)]
+    peers_repo.get_peer_analysis.return_value = [{
+        'peers': [{'ticker': t, 'name': f'Peer {t}'} for t in peer_tickers] + [{'ticker': 'GONE', 'name': 'Gone Co'}],
+    }]
+    data_repo.get_complete_data_many.return_value = {
+        t: {'ticker': t, 'company_name': f'Peer {t}', 'adjusted_pe_ratio': None, 'short_float': None}
+        for t in peer_tickers
+    }
+    data_repo.adjusted_pe_repo.get_adjusted_pe_by_tickers.return_value = {
+        'P0': {'adjusted_pe_ratio': None, 'calculation_status': 'no_data'}
+    }
+
+    with patch.object(peers_service, '_trigger_pe_calculation') as mock_pe:
+        result = peers_service.get_peers("AAPL")
+
+    assert result['success'] is True
+    # One batch load for all peers and one PE status lookup, regardless of peer count
+    data_repo.get_complete_data_many.assert_called_once()
+    data_repo.adjusted_pe_repo.get_adjusted_pe_by_tickers.assert_called_once()
+    data_repo.financial_scores_repo.get_financial_scores_by_ticker.assert_not_called()
+
+    peers = {p['ticker']: p for p in result['peers']}
+    assert peers['P0']['adjusted_pe_unavailable'] is True
+    assert peers['GONE']['company_name'] == 'Gone Co'
+    assert peers['GONE']['adjusted_pe_unavailable'] is True
+
+    # Missing data is deferred to background work rather than fetched inline
+    assert sorted(call.args[0] for call in mock_pe.call_args_list) == peer_tickers[1:]
+    queued = [call.args[0] for call in peers_service.short_interest_queue.request.call_args_list]
+    assert queued == peer_tickers + ['GONE']
+    assert all(peers[t]['short_interest_loading'] is True for t in peer_tickers + ['GONE'])
+    assert result['main_ticker']['short_interest_loading'] is False
+
+def test_get_peers_served_from_ui_cache(peers_service, mock_repos):
+    peers_repo, data_repo = mock_repos
+    data_repo.get_complete_data.return_value = {'ticker': 'AAPL', 'company_name': 'Apple Inc'}
+    peers_repo.get_peer_analysis.return_value = [{
+        'peers': [{'ticker': 'MSFT', 'name': 'Microsoft'}, {'ticker': 'NEW', 'name': 'New Co'}],
+    }]
+    data_repo.get_ui_cache_data_many.return_value = {
+        'AAPL': {'ticker': 'AAPL', 'company_name': 'Apple Inc', 'adjusted_pe_ratio': 28.0,
+                 'pe_status': 'success', 'short_float': '0.7%'},
+        'MSFT': {'ticker': 'MSFT', 'company_name': 'Microsoft', 'total_score_percentile_rank': 80.0,
+                 'adjusted_pe_ratio': None, 'pe_status': 'no_data', 'short_float': '0.5%'},
+    }
+    # A company without a ui_cache row yet falls back to complete data
+    data_repo.get_complete_data_many.return_value = {
+        'NEW': {'ticker': 'NEW', 'company_name': 'New Co', 'adjusted_pe_ratio': 12.0, 'short_float': '3.0%'}
+    }
+
+    with patch.object(peers_service, '_trigger_pe_calculation') as mock_pe:
+        result = peers_service.get_peers("AAPL")
+
+    assert result['success'] is True
+    data_repo.get_complete_data_many.assert_called_once_with(['NEW'])
+    # PE status comes from the ui_cache rows instead of a second query
+    data_repo.adjusted_pe_repo.get_adjusted_pe_by_tickers.assert_not_called()
+    mock_pe.assert_not_called()
+
+    assert result['main_ticker']['adjusted_pe_ratio'] == 28.0
+    peers = {p['ticker']: p for p in result['peers']}
+    assert peers['MSFT']['total_score_percentile_rank'] == 80.0
+    assert peers['MSFT']['adjusted_pe_unavailable'] is True
+    assert peers['NEW']['adjusted_pe_ratio'] == 12.0
 
 def test_find_peers_ticker_not_found(peers_service, mock_repos):
     peers_repo, data_repo = mock_repos
@@ -112,14 +189,42 @@ def test_get_ticker_data_exists(peers_service, mock_repos):
 def test_get_ticker_data_not_exists(peers_service, mock_repos):
     peers_repo, data_repo = mock_repos
     data_repo.get_complete_data.return_value = None
-    
-    with patch.object(peers_service, '_fetch_short_interest_for_unknown_ticker') as mock_fetch:
-        mock_fetch.return_value = "2.0%"
-        result = peers_service._get_ticker_data("UNKNOWN")
-        
-        assert result['ticker'] == 'UNKNOWN'
-        assert result['short_float'] == "2.0%"
-        assert result['adjusted_pe_unavailable'] is True
+
+    result = peers_service._get_ticker_data("UNKNOWN")
+
+    assert result['ticker'] == 'UNKNOWN'
+    assert result['short_float'] is None
+    assert result['short_interest_loading'] is True
+    assert result['adjusted_pe_unavailable'] is True
+    peers_service.short_interest_queue.request.assert_called_once_with("UNKNOWN", None)
+
+def test_get_ticker_data_unknown_uses_scraped_result(peers_service, mock_repos):
+    peers_repo, data_repo = mock_repos
+    data_repo.get_complete_data.return_value = None
+    peers_service.short_interest_queue.get_unknown_result.return_value = ("2.0%", "2024-01-01T00:00:00")
+
+    result = peers_service._get_ticker_data("UNKNOWN")
+
+    assert result['short_float'] == "2.0%"
+    assert result['short_interest_loading'] is False
+    peers_service.short_interest_queue.request.assert_not_called()
+
+def test_get_ticker_data_missing_short_float_is_queued(peers_service, mock_repos):
+    peers_repo, data_repo = mock_repos
+    data_repo.get_complete_data.return_value = {
+        'ticker': 'AAPL',
+        'adjusted_pe_ratio': 25.0,
+        'short_float': None,
+        'short_interest_scraped_at': '2024-01-01T00:00:00'
+    }
+
+    with patch('os.chdir') as mock_chdir:
+        result = peers_service._get_ticker_data("AAPL")
+
+    assert result['short_float'] is None
+    assert result['short_interest_loading'] is True
+    peers_service.short_interest_queue.request.assert_called_once_with("AAPL", '2024-01-01T00:00:00')
+    mock_chdir.assert_not_called()
 
 def test_get_ticker_data_trigger_pe_calc(peers_service, mock_repos):
     peers_repo, data_repo = mock_repos
@@ -128,26 +233,13 @@ def test_get_ticker_data_trigger_pe_calc(peers_service, mock_repos):
         'symbol': 'AAPL',
         'adjusted_pe_ratio': None
     }
-    data_repo.adjusted_pe_repo.get_adjusted_pe_by_ticker.return_value = None
+    data_repo.adjusted_pe_repo.get_adjusted_pe_by_tickers.return_value = {}
     
-    with patch('threading.Thread') as mock_thread:
-        result = peers_service._get_ticker_data("AAPL")
-        assert result['adjusted_pe_ratio'] is None
-        # Should have triggered background calculation
-        assert mock_thread.called
-
-def test_fetch_short_interest_for_unknown_ticker(peers_service):
-    with patch('os.chdir'), \
-         patch('os.getcwd'), \
-         patch('web_app.backend.services.peers_service.scrape_ticker_short_interest') as mock_scrape:
-        
-        # In case it's None due to import failure in some environments
-        if mock_scrape is None:
-            pytest.skip("scrape_ticker_short_interest not available")
-            
-        mock_scrape.return_value = {'short_float': '5.0%'}
-        result = peers_service._fetch_short_interest_for_unknown_ticker("AAPL")
-        assert result == '5.0%'
+    peers_service.executor = MagicMock()
+    result = peers_service._get_ticker_data("AAPL")
+    assert result['adjusted_pe_ratio'] is None
+    # Should have queued background calculation
+    assert peers_service.executor.submit.call_args[0][:2] == ('pe', 'AAPL')
 
 def test_find_peers_ai_logic(peers_service):
     # This tests the _find_peers_ai internal method
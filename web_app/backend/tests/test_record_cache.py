@@ -0,0 +1,97 @@
+import sqlite3
+import time
+from unittest.mock import patch
+from web_app.backend.repositories.data_repository import DataRepository
+from web_app.backend.repositories.record_cache import RecordCache
+from web_app.backend.tests.test_more_repos import temp_db, _add_growth_and_short_interest_tables
+
+def test_lru_eviction_and_stats():
+    cache = RecordCache(max_entries=2)
+    for key in ('A', 'B'):
+        cache.put(key, {'ticker': key}, None, cache.begin_load())
+    assert cache.get('A') == {'ticker': 'A'}
+    cache.put('C', {'ticker': 'C'}, None, cache.begin_load())
+
+    # B was least recently used
+    assert cache.get('B') is None
+    assert cache.get('A') is not None and cache.get('C') is not None
+    stats = cache.get_stats()
+    assert (stats['size'], stats['hits'], stats['misses'], stats['evictions']) == (2, 3, 1, 1)
+
+def test_entries_expire_after_ttl():
+    cache = RecordCache(ttl=10)
+    cache.put('A', {'ticker': 'A'}, 1, cache.begin_load())
+    with patch('time.monotonic', return_value=time.monotonic() + 11):
+        assert cache.get('A') is None
+
+def test_version_invalidation_and_racing_loads():
+    cache = RecordCache()
+    cache.put('A', {'ticker': 'A'}, 1, cache.begin_load())
+    cache.put('B', {'ticker': 'B'}, 2, cache.begin_load())
+    cache.invalidate_company(1)
+    assert cache.get('A') is None
+    assert cache.get('B') == {'ticker': 'B'}
+
+    # A load that started before a write must not be cached
+    token = cache.begin_load()
+    cache.invalidate_company(2)
+    assert not cache.put('B', {'ticker': 'B', 'stale': True}, 2, token)
+    assert cache.get('B') is None
+
+    cache.put('B', {'ticker': 'B'}, 2, cache.begin_load())
+    cache.invalidate_all()
+    assert cache.get('B') is None
+
+def test_cached_records_are_copies():
+    cache = RecordCache()
+    record = {'ticker': 'A'}
+    cache.put('A', record, 1, cache.begin_load())
+    record['in_watchlist'] = True
+    cache.get('A')['mutated'] = True
+    assert cache.get('A') == {'ticker': 'A'}
+
+def test_complete_data_cache_invalidated_by_upserts(temp_db):
+    _add_growth_and_short_interest_tables(temp_db)
+    conn = sqlite3.connect(temp_db)
+    conn.execute("ALTER TABLE financial_scores ADD COLUMN last_updated TIMESTAMP")
+    conn.commit()
+    conn.close()
+    repo = DataRepository(db_path=temp_db)
+    writer = DataRepository(db_path=temp_db)
+    cache = repo.record_cache
+
+    first = repo.get_complete_data('AAPL')
+    with patch.object(repo, 'execute_query', side_effect=AssertionError("cache miss")):
+        assert repo.get_complete_data('AAPL') == first
+        assert repo.get_complete_data_many(['aapl']) == {'AAPL': first}
+
+    # Writes through any repository instance invalidate the shared cache
+    writer.upsert_growth_estimates('AAPL', 20.0, 30.0, 'success')
+    assert repo.get_complete_data('AAPL')['current_year_growth'] == 20.0
+    writer.upsert_short_interest('AAPL', '2.0%', 'success')
+    assert repo.get_complete_data('AAPL')['short_float'] == '2.0%'
+    writer.financial_scores_repo.create_or_update_financial_scores(1, {'total_percentile': 50.0})
+    assert repo.get_complete_data('AAPL')['financial_total_percentile'] == 50.0
+    writer.ai_scores_repo.create_or_update_ai_scores(1, {'moat_score': 3.0})
+    assert repo.get_complete_data('AAPL')['moat_score'] == 3.0
+    writer.financial_scores_repo.replace_all_financial_scores([{'company_id': 1, 'total_percentile': 60.0}])
+    assert repo.get_complete_data('AAPL')['financial_total_percentile'] == 60.0
+    assert cache.get_stats()['invalidations'] >= 5
+
+def test_complete_data_cache_invalidated_by_deletes(temp_db):
+    _add_growth_and_short_interest_tables(temp_db)
+    conn = sqlite3.connect(temp_db)
+    conn.execute("ALTER TABLE financial_scores ADD COLUMN last_updated TIMESTAMP")
+    conn.commit()
+    conn.close()
+    repo = DataRepository(db_path=temp_db)
+    writer = DataRepository(db_path=temp_db)
+    writer.financial_scores_repo.create_or_update_financial_scores(1, {'total_percentile': 50.0})
+    writer.ai_scores_repo.create_or_update_ai_scores(1, {'moat_score': 3.0})
+    assert repo.get_complete_data('AAPL')['financial_total_percentile'] == 50.0
+
+    # Deleted rows must not be served from the cache until its TTL expires
+    writer.financial_scores_repo.delete_financial_scores(1)
+    assert repo.get_complete_data('AAPL').get('financial_total_percentile') is None
+    writer.ai_scores_repo.delete_ai_scores(1)
+    assert repo.get_complete_data('AAPL').get('moat_score') is None
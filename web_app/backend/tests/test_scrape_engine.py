@@ -0,0 +1,129 @@
+import io
+import sys
+import threading
+import time
+
+import pytest
+import requests
+
+from web_app.backend.utils.scrapers.scrape_engine import TokenBucket, ProgressReporter
+from web_app.backend.utils.scrapers import get_short_interest
+
+SNAPSHOT_PAGE = """
+<html><body>
+<table class="snapshot-table2">
+  <tr><td>Index</td><td>S&amp;P 500</td><td>P/E</td><td>25.10</td></tr>
+  <tr><td>Short Float</td><td>{short_float}</td><td>Short Ratio</td><td>1.20</td></tr>
+</table>
+</body></html>
+"""
+
+
+def _finviz_response(path, query, headers):
+    if path == '/quote.ashx':
+        ticker = query['t'][0]
+        return 200, {}, SNAPSHOT_PAGE.format(short_float='-' if ticker == 'NONE' else '2.35%')
+    return 200, {}, path
+
+
+@pytest.fixture
+def stub(local_server):
+    local_server.respond = _finviz_response
+    return local_server
+
+
+def test_retries_throttled_and_failed_responses(stub, make_engine):
+    stub.scripts['/flaky'] = [(429, {'Retry-After': '2'}), (503, {})]
+    sleeps = []
+    engine = make_engine(sleeps)
+
+    response = engine.fetch(stub.url + '/flaky')
+
+    assert response.status_code == 200
+    assert stub.hits('/flaky') == 3
+    # Retry-After wins over the computed backoff; the second wait is jittered
+    assert sleeps[0] == 2.0
+    assert 0 <= sleeps[1] <= 0.02
+    assert engine.get_stats() == {'requests': 3, 'retries': 2, 'failures': 0}
+
+
+def test_gives_up_after_max_retries_and_skips_client_errors(stub, make_engine):
+    stub.scripts['/down'] = [(500, {})] * 5
+    stub.scripts['/missing'] = [(404, {})]
+    engine = make_engine([], max_retries=2)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        engine.fetch(stub.url + '/down')
+    assert stub.hits('/down') == 3
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        engine.fetch(stub.url + '/missing')
+    assert stub.hits('/missing') == 1
+    assert engine.get_stats()['failures'] == 2
+
+
+def test_token_bucket_limits_rate():
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(rate=4.0, capacity=2, clock=lambda: now[0], sleep=sleep)
+    for _ in range(6):
+        bucket.acquire()
+
+    # Two tokens of burst, then one every quarter second
+    assert abs(now[0] - 1.0) < 1e-9
+    assert len(sleeps) == 4
+
+
+def test_map_respects_per_host_limit(stub, make_engine):
+    stub.delay = 0.05
+    engine = make_engine(per_host_limit=2, max_workers=6)
+    progress = ProgressReporter(6, every=100, stream=io.StringIO())
+
+    results = list(engine.map(lambda i: engine.fetch(f"{stub.url}/item{i}").text, range(6), progress=progress))
+
+    assert sorted(result for _, result, _ in results) == [f"/item{i}" for i in range(6)]
+    assert stub.max_in_flight <= 2
+    assert progress.done == 6 and progress.failed == 0
+
+
+def test_map_stops_submitting_when_consumer_stops(make_engine):
+    engine = make_engine(max_workers=2)
+    calls = []
+    lock = threading.Lock()
+
+    def work(i):
+        with lock:
+            calls.append(i)
+        time.sleep(0.01)
+        return i
+
+    results = engine.map(work, range(100))
+    for count, _ in enumerate(results, 1):
+        if count == 3:
+            break
+    results.close()
+
+    # Only the submission window ahead of the consumer ran, not the other items
+    time.sleep(0.05)
+    assert len(calls) <= 3 + engine.max_workers * 2
+    assert len(calls) < 100
+
+
+def test_scrape_ticker_short_interest_against_stub(stub, make_engine, monkeypatch):
+    finviz = sys.modules[get_short_interest.get_finviz_quote_url.__module__]
+    monkeypatch.setattr(finviz, 'FINVIZ_QUOTE_URL', stub.url + '/quote.ashx?t={ticker}')
+    stub.scripts['/quote.ashx'] = [(503, {})]
+    engine = make_engine([])
+
+    result = get_short_interest.scrape_ticker_short_interest('aapl', engine)
+    assert result['ticker'] == 'AAPL'
+    assert result['short_float'] == '2.35%'
+    assert engine.get_stats()['retries'] == 1
+
+    stub.scripts['/quote.ashx'] = [(404, {})]
+    assert get_short_interest.scrape_ticker_short_interest('GONE', engine) is None
@@ -0,0 +1,108 @@
+import json
+import os
+
+from web_app.backend.utils.scrapers.scrape_journal import ScrapeJournal
+
+
+def _record(short_float):
+    return {'company_name': 'Name', 'exchange': 'NYSE', 'short_float': short_float, 'scraped_at': '2024-01-01T00:00:00'}
+
+
+def test_append_resume_and_compact(tmp_path):
+    path = os.path.join(tmp_path, 'short_interest.json')
+    journal = ScrapeJournal(path, compact_interval=0)
+    assert journal.load()['tickers'] == {}
+    journal.append('AAPL', _record('0.8%'))
+    journal.append('MSFT', _record(None))
+    journal.checkpoint()
+
+    # A crashed run leaves only the journal; a new run replays it
+    assert not os.path.exists(path)
+    resumed = ScrapeJournal(path)
+    data = resumed.load()
+    assert set(data['tickers']) == {'AAPL', 'MSFT'}
+    assert data['tickers']['AAPL']['short_float'] == '0.8%'
+    assert set(resumed.replayed) == {'AAPL', 'MSFT'}
+
+    resumed.close()
+    assert not os.path.exists(resumed.journal_path)
+    with open(path) as f:
+        compacted = json.load(f)
+    assert compacted['total_scraped'] == 2
+    assert compacted['last_updated']
+    assert ScrapeJournal(path).load()['tickers'] == compacted['tickers']
+
+
+def test_torn_journal_line_is_dropped(tmp_path):
+    path = os.path.join(tmp_path, 'short_interest.json')
+    journal = ScrapeJournal(path, compact_interval=0)
+    journal.load()
+    journal.append('AAPL', _record('0.8%'))
+    journal.checkpoint()
+    with open(journal.journal_path, 'a') as f:
+        f.write('{"ticker": "MSFT", "short_fl')
+
+    resumed = ScrapeJournal(path, compact_interval=0)
+    assert set(resumed.load()['tickers']) == {'AAPL'}
+    # New results start on a fresh line instead of extending the torn one
+    resumed.append('NVDA', _record('1.1%'))
+    resumed.checkpoint()
+    assert set(ScrapeJournal(path).load()['tickers']) == {'AAPL', 'NVDA'}
+
+
+def test_periodic_compaction_keeps_journal_short(tmp_path):
+    path = os.path.join(tmp_path, 'short_interest.json')
+    journal = ScrapeJournal(path, compact_interval=3)
+    journal.load()
+    for i in range(7):
+        journal.append(f'T{i}', _record(f'{i}%'))
+    journal.checkpoint()
+
+    with open(path) as f:
+        assert len(json.load(f)['tickers']) == 6
+    with open(journal.journal_path) as f:
+        assert len(f.readlines()) == 1
+    assert len(ScrapeJournal(path).load()['tickers']) == 7
+
+
+class _FlakyRepo:
+    def __init__(self, failures):
+        self.failures = failures
+        self.imported = []
+
+    def bulk_upsert_short_interest(self, rows):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError('database is locked')
+        self.imported.extend(row['ticker'] for row in rows)
+        return len(rows)
+
+    def upsert_snapshots(self, snapshots):
+        return len(snapshots)
+
+
+def test_failed_imports_stay_pending_across_runs(tmp_path):
+    import pytest
+    from web_app.backend.utils.scrapers import get_short_interest
+
+    path = os.path.join(tmp_path, 'short_interest.json')
+    journal = ScrapeJournal(path, compact_interval=0)
+    journal.load()
+    for ticker in ('AAPL', 'MSFT'):
+        journal.append(ticker, dict(_record('0.8%'), imported=False))
+    repo = _FlakyRepo(failures=1)
+    rows = get_short_interest.unimported_rows(journal.data)
+
+    # A failed import is raised, not swallowed, and the results stay unimported
+    with pytest.raises(RuntimeError):
+        get_short_interest.import_results((repo, repo), rows, [], journal)
+    journal.close()
+    resumed = ScrapeJournal(path)
+    data = resumed.load()
+    assert [row['ticker'] for row in get_short_interest.unimported_rows(data)] == ['AAPL', 'MSFT']
+
+    # The next run imports them and the marks survive compaction
+    assert get_short_interest.import_results((repo, repo), get_short_interest.unimported_rows(data), [], resumed) == 2
+    resumed.close()
+    assert repo.imported == ['AAPL', 'MSFT']
+    assert get_short_interest.unimported_rows(ScrapeJournal(path).load()) == []
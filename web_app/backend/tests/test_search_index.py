@@ -0,0 +1,99 @@
+import sqlite3
+import pytest
+from web_app.backend.repositories.base_repository import close_all_pools
+from web_app.backend.repositories.data_repository import DataRepository
+from web_app.backend.services.search_index import TickerSearchIndex
+
+COMPANIES = [
+    (1, 'AAPL', 'Apple Inc.'),
+    (2, 'AMZN', 'Amazon.com, Inc.'),
+    (3, 'T', 'AT&T Inc.'),
+    (4, 'GOOGL', 'Alphabet Inc.'),
+    (5, 'BRK.B', 'Berkshire Hathaway'),
+    (6, 'APLE', 'Apple Hospitality REIT'),
+]
+
+@pytest.fixture
+def companies_db(tmp_path):
+    path = str(tmp_path / "companies.db")
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE companies (id INTEGER PRIMARY KEY, ticker TEXT UNIQUE, company_name TEXT,
+                 exchange TEXT, sector TEXT, industry TEXT, updated_at TIMESTAMP)""")
+    conn.execute("CREATE TABLE ticker_aliases (company_id INTEGER, ticker TEXT, is_primary INTEGER)")
+    conn.executemany("INSERT INTO companies (id, ticker, company_name) VALUES (?, ?, ?)", COMPANIES)
+    conn.executemany("INSERT INTO ticker_aliases VALUES (?, ?, ?)",
+                     [(cid, ticker, 1) for cid, ticker, _ in COMPANIES] + [(4, 'GOOG', 0), (5, 'BRK-B', 0)])
+    conn.commit()
+    conn.close()
+    yield path
+    close_all_pools()
+
+def test_search_matches_sql_ranking(companies_db):
+    repo = DataRepository(companies_db)
+    index = TickerSearchIndex(repo)
+    for query in ['A', 'AP', 'APPLE', 'AM', 'AL', 'T', 'B', 'Z']:
+        expected = repo.search_tickers(query, limit=10)
+        assert index.search(query, limit=10) == expected, query
+    assert [s['ticker'] for s in index.search('A', limit=2)] == ['AAPL', 'AMZN']
+
+def test_search_aliases_and_normalized_names(companies_db):
+    index = TickerSearchIndex(DataRepository(companies_db))
+    assert [(s['ticker'], s['match_type']) for s in index.search('GOOG')] == [('GOOGL', 'ticker')]
+    assert [s['ticker'] for s in index.search('BRK-')] == ['BRK.B']
+    # Punctuation-free and whitespace-insensitive name prefixes
+    assert [s['ticker'] for s in index.search('att')] == ['T']
+    assert [s['ticker'] for s in index.search('  apple   hosp')] == ['APLE']
+    # One suggestion per company even when ticker and name both match
+    assert [s['ticker'] for s in index.search('APPLE')] == ['AAPL', 'APLE']
+    assert index.search('   ') == []
+
+def test_search_does_not_query_database(companies_db):
+    repo = DataRepository(companies_db)
+    index = TickerSearchIndex(repo)
+    assert index.refresh()
+    repo.execute_query = repo.execute_single = None
+    repo.company_repo.execute_query = repo.company_repo.execute_single = None
+    assert len(index.search('A')) == 5
+
+def test_index_refreshes_when_companies_change(companies_db):
+    repo = DataRepository(companies_db)
+    index = TickerSearchIndex(repo, refresh_interval=3600)
+    assert index.search('NV') == []
+
+    # Writes through the repository are picked up immediately
+    company_id = repo.company_repo.create_company('NVDA', 'NVIDIA Corp')
+    assert [s['ticker'] for s in index.search('NV')] == ['NVDA']
+    repo.company_repo.add_ticker_alias(company_id, 'NVD')
+    assert [s['ticker'] for s in index.search('NVD')] == ['NVDA']
+
+    # Writes from elsewhere are picked up on the next periodic check
+    conn = sqlite3.connect(companies_db)
+    conn.execute("INSERT INTO companies (id, ticker, company_name) VALUES (8, 'NVO', 'Novo Nordisk')")
+    conn.commit()
+    conn.close()
+    assert [s['ticker'] for s in index.search('NV')] == ['NVDA']
+    index.refresh_interval = 0
+    assert [s['ticker'] for s in index.search('NV')] == ['NVDA', 'NVO']
+
+def test_index_sees_renames_from_other_processes(companies_db):
+    repo = DataRepository(companies_db)
+    index = TickerSearchIndex(repo, refresh_interval=0)
+    assert [s['ticker'] for s in index.search('AMZ')] == ['AMZN']
+    change_count = repo.get_companies_change_count()
+
+    # Same-length ticker and name edits keep the row count and lengths unchanged
+    conn = sqlite3.connect(companies_db)
+    conn.execute("UPDATE companies SET ticker = 'AMZX' WHERE id = 2")
+    conn.execute("UPDATE companies SET company_name = 'Apple Corp.' WHERE id = 1")
+    conn.commit()
+    conn.close()
+
+    assert repo.get_companies_change_count() == change_count
+    assert [s['ticker'] for s in index.search('AMZ')] == ['AMZX']
+    assert [s['ticker'] for s in index.search('apple c')] == ['AAPL']
+
+    # Edits through another repository's update_company bump updated_at
+    other = DataRepository(companies_db)
+    signature = repo.get_search_signature()
+    other.company_repo.update_company(3, sector='Telecom')
+    assert repo.get_search_signature() != signature
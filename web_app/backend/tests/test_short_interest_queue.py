@@ -0,0 +1,86 @@
+import time
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+from web_app.backend.services.short_interest_queue import ShortInterestFetchQueue, get_short_interest_queue
+
+def _wait_until_idle(fetch_queue, ticker, timeout=5.0):
+    deadline = time.time() + timeout
+    while fetch_queue.is_pending(ticker) and time.time() < deadline:
+        time.sleep(0.01)
+
+def test_request_returns_immediately_and_persists_result():
+    data_repo = MagicMock()
+    data_repo.upsert_short_interest.return_value = True
+    scraper = MagicMock(return_value={'short_float': '3.1%'})
+    fetch_queue = ShortInterestFetchQueue(data_repo, scraper)
+
+    assert fetch_queue.request('aapl') is True
+    _wait_until_idle(fetch_queue, 'AAPL')
+
+    scraper.assert_called_once_with('AAPL')
+    data_repo.upsert_short_interest.assert_called_once_with('AAPL', '3.1%', status='success')
+
+def test_duplicate_requests_are_scraped_once():
+    data_repo = MagicMock()
+    calls = []
+    def slow_scraper(ticker):
+        calls.append(ticker)
+        time.sleep(0.05)
+        return {'short_float': None}
+    fetch_queue = ShortInterestFetchQueue(data_repo, slow_scraper)
+
+    for _ in range(5):
+        assert fetch_queue.request('MSFT') is True
+    _wait_until_idle(fetch_queue, 'MSFT')
+
+    assert calls == ['MSFT']
+    data_repo.upsert_short_interest.assert_called_once_with('MSFT', None, status='no_data')
+
+def test_recent_attempt_is_not_retried():
+    scraper = MagicMock()
+    fetch_queue = ShortInterestFetchQueue(MagicMock(), scraper)
+
+    recent = datetime.now().isoformat()
+    assert fetch_queue.request('AAPL', recent) is False
+
+    stale = (datetime.now() - timedelta(hours=2)).isoformat()
+    assert fetch_queue.request('AAPL', stale) is True
+    _wait_until_idle(fetch_queue, 'AAPL')
+    scraper.assert_called_once_with('AAPL')
+
+def test_unknown_ticker_result_kept_in_memory():
+    data_repo = MagicMock()
+    data_repo.upsert_short_interest.return_value = False  # Not in companies table
+    fetch_queue = ShortInterestFetchQueue(data_repo, MagicMock(return_value={'short_float': '9.9%'}))
+
+    fetch_queue.request('PRIV')
+    _wait_until_idle(fetch_queue, 'PRIV')
+
+    short_float, scraped_at = fetch_queue.get_unknown_result('priv')
+    assert short_float == '9.9%'
+    assert scraped_at is not None
+
+def test_scraper_failure_records_error():
+    data_repo = MagicMock()
+    fetch_queue = ShortInterestFetchQueue(data_repo, MagicMock(side_effect=RuntimeError("boom")))
+
+    fetch_queue.request('AAPL')
+    _wait_until_idle(fetch_queue, 'AAPL')
+
+    data_repo.upsert_short_interest.assert_called_once_with('AAPL', None, status='error')
+
+def test_no_scraper_never_reports_loading():
+    fetch_queue = ShortInterestFetchQueue(MagicMock(), None)
+    assert fetch_queue.request('AAPL') is False
+
+def test_shared_queue_is_keyed_by_database(tmp_path):
+    first_repo = MagicMock(db_path=str(tmp_path / 'first.db'))
+    second_repo = MagicMock(db_path=str(tmp_path / 'second.db'))
+
+    first = get_short_interest_queue(first_repo, MagicMock())
+    assert get_short_interest_queue(first_repo, MagicMock()) is first
+
+    second = get_short_interest_queue(second_repo, MagicMock())
+    assert second is not first
+    assert second.data_repo is second_repo
@@ -0,0 +1,78 @@
+import os
+import pytest
+
+from web_app.backend.utils.scrapers.snapshot_parser import (
+    parse_snapshot_table, parse_snapshot_value, parse_finviz_snapshot, benchmark, _parse_with_beautifulsoup
+)
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'finviz_quote.html')
+
+
+@pytest.fixture(scope='module')
+def page():
+    with open(FIXTURE, 'rb') as f:
+        return f.read()
+
+
+def test_matches_beautifulsoup_parser(page):
+    fields = parse_snapshot_table(page)
+    assert fields == _parse_with_beautifulsoup(page)
+    assert fields['Index'] == 'S&P 500'
+    assert fields['Short Float'] == '0.78%'
+    assert fields['52W High'] == '260.10 -10.52%'
+    # Empty values are skipped and repeated labels keep the last value
+    assert 'Trades' not in fields
+    assert fields['EPS next Y'] == '10.12%'
+
+
+def test_pages_without_snapshot_table():
+    assert parse_snapshot_table('<html><table class="other"><tr><td>a</td><td>b</td></tr></table></html>') is None
+    assert parse_finviz_snapshot(b'', 'AAPL') is None
+    fields = parse_snapshot_table('<table class="snapshot-table2"><tr><td>Short Float</td><td>-</td></tr>')
+    assert fields == {'Short Float': '-'}
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('0.78%', 0.78),
+    ('-34.01%', -34.01),
+    ('14.84B', 14.84e9),
+    ('115.64M', 115.64e6),
+    ('2.5K', 2500.0),
+    ('1.2T', 1.2e12),
+    ('43,902,301', 43902301.0),
+    ('35.42', 35.42),
+    ('-', None),
+    ('', None),
+    (None, None),
+    ('1.00 (0.43%)', None),
+    ('Yes / Yes', None),
+    ('Oct 31 AMC', None),
+])
+def test_parse_snapshot_value(text, expected):
+    value = parse_snapshot_value(text)
+    if expected is None:
+        assert value is None
+    else:
+        assert value == pytest.approx(expected)
+
+
+def test_typed_snapshot(page):
+    snapshot = parse_finviz_snapshot(page, 'aapl')
+    assert snapshot.ticker == 'AAPL'
+    assert snapshot.short_float == '0.78%'
+    assert snapshot.number('Short Interest') == pytest.approx(115.64e6)
+    assert snapshot.number('Option/Short') is None
+    numbers = snapshot.numbers()
+    assert numbers['Market Cap'] == pytest.approx(3457.21e9)
+    assert 'Earnings' not in numbers
+
+    no_data = parse_finviz_snapshot('<table class="snapshot-table2"><tr><td>Short Float</td><td>-</td></tr></table>', 'X')
+    assert no_data.short_float is None
+
+
+@pytest.mark.slow
+def test_benchmark_fixture(page):
+    result = benchmark(page, rounds=50, baseline_rounds=3)
+    print(f"\nsnapshot parser {result['snapshot_parser_ms']:.3f} ms/page, "
+          f"BeautifulSoup {result['beautifulsoup_ms']:.3f} ms/page ({result['speedup']:.0f}x)")
+    assert result['speedup'] > 5
@@ -0,0 +1,140 @@
+import sqlite3
+import pytest
+from web_app.backend.repositories.base_repository import close_all_pools
+from web_app.backend.repositories.data_repository import DataRepository
+from web_app.backend.repositories.ui_cache_repository import UICacheRepository, two_year_forward_pe
+
+@pytest.fixture
+def ui_db(tmp_path):
+    path = str(tmp_path / "ui.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE companies (id INTEGER PRIMARY KEY, ticker TEXT UNIQUE, company_name TEXT,
+                                exchange TEXT, sector TEXT, industry TEXT, updated_at TIMESTAMP);
+        CREATE TABLE ticker_aliases (company_id INTEGER, ticker TEXT, is_primary INTEGER);
+        CREATE TABLE ai_scores (company_id INTEGER PRIMARY KEY, moat_score REAL, total_score_percentage REAL,
+                                total_score_percentile_rank REAL, last_updated TIMESTAMP);
+        CREATE TABLE financial_scores (company_id INTEGER PRIMARY KEY, total_percentile REAL, total_rank INTEGER,
+                                       last_updated TIMESTAMP);
+        CREATE TABLE adjusted_pe_calculations (company_id INTEGER PRIMARY KEY, adjusted_pe_ratio REAL,
+                                               adjusted_oi_after_tax REAL, updated_ev REAL,
+                                               calculation_status TEXT, last_updated TEXT);
+        CREATE TABLE growth_estimates (company_id INTEGER PRIMARY KEY, current_year_growth REAL, next_year_growth REAL,
+                                       last_updated TIMESTAMP, calculation_status TEXT);
+        CREATE TABLE short_interest (company_id INTEGER PRIMARY KEY, short_float TEXT, scraped_at TIMESTAMP,
+                                     last_updated TIMESTAMP, calculation_status TEXT);
+        INSERT INTO companies (id, ticker, company_name, sector) VALUES (1, 'AAPL', 'Apple', 'Technology');
+        INSERT INTO companies (id, ticker, company_name, sector) VALUES (2, 'MSFT', 'Microsoft', 'Technology');
+        INSERT INTO ai_scores (company_id, total_score_percentage) VALUES (1, 80.0);
+        INSERT INTO adjusted_pe_calculations (company_id, adjusted_pe_ratio, calculation_status) VALUES (1, 30.0, 'success');
+        INSERT INTO growth_estimates (company_id, current_year_growth, next_year_growth) VALUES (1, 10.0, 10.0);
+    """)
+    conn.commit()
+    conn.close()
+    yield path
+    close_all_pools()
+
+def test_rebuild_materializes_derived_fields(ui_db):
+    repo = UICacheRepository(ui_db)
+    assert repo.rebuild() == 2
+
+    row = repo.get_row('aapl')
+    assert row['company_id'] == 1
+    assert row['sector'] == 'Technology'
+    assert row['total_score_percentage'] == 80.0
+    assert row['two_year_annualized_growth'] == pytest.approx(10.0)
+    assert row['two_year_forward_pe'] == pytest.approx(30.0 / 1.21)
+    assert repo.get_row('MSFT')['two_year_forward_pe'] is None
+    assert set(repo.get_rows(['AAPL', 'msft', 'NOPE'])) == {'AAPL', 'MSFT'}
+
+def test_write_paths_refresh_rows(ui_db):
+    data_repo = DataRepository(ui_db)
+    data_repo.rebuild_ui_cache()
+
+    data_repo.upsert_growth_estimates('MSFT', 21.0, 0.0, 'success')
+    data_repo.adjusted_pe_repo.upsert_adjusted_pe('MSFT', {'calculation_status': 'success'}, 22.0, '2024-01-01')
+    data_repo.ai_scores_repo.create_or_update_ai_scores(2, {'total_score_percentage': 70.0})
+    data_repo.financial_scores_repo.create_or_update_financial_scores(2, {'total_percentile': 65.0, 'total_rank': 3})
+    data_repo.upsert_short_interest('MSFT', '1.1%', 'success')
+
+    row = data_repo.ui_cache_repo.get_row('MSFT')
+    assert row['adjusted_pe_ratio'] == 22.0
+    assert row['two_year_forward_pe'] == pytest.approx(two_year_forward_pe(22.0, row['two_year_annualized_growth']))
+    assert (row['total_score_percentage'], row['financial_total_percentile'], row['short_float']) == (70.0, 65.0, '1.1%')
+
+    # A renamed ticker moves its row
+    data_repo.company_repo.update_company(2, ticker='MSFT2')
+    assert data_repo.ui_cache_repo.get_row('MSFT') is None
+    assert data_repo.ui_cache_repo.get_row('MSFT2')['company_id'] == 2
+
+    # Bulk score publishing refreshes every row
+    data_repo.financial_scores_repo.replace_all_financial_scores([{'company_id': 1, 'total_percentile': 99.0}])
+    assert data_repo.ui_cache_repo.get_row('AAPL')['financial_total_percentile'] == 99.0
+    assert data_repo.ui_cache_repo.get_row('MSFT2')['financial_total_percentile'] is None
+
+def test_get_ui_cache_data_reads_through(ui_db):
+    data_repo = DataRepository(ui_db)
+    # Without the table rows are computed on the fly
+    assert data_repo.get_ui_cache_data('AAPL')['two_year_annualized_growth'] == pytest.approx(10.0)
+
+    data_repo.ui_cache_repo.ensure_table()
+    assert data_repo.ui_cache_repo.get_row('AAPL') is None
+    assert data_repo.get_ui_cache_data('AAPL')['ticker'] == 'AAPL'
+    assert data_repo.ui_cache_repo.get_row('AAPL') is not None
+    assert data_repo.get_ui_cache_data('NOPE') is None
+
+def test_get_ui_cache_data_many(ui_db):
+    data_repo = DataRepository(ui_db)
+    # Callers fall back to complete data until the table exists
+    assert data_repo.get_ui_cache_data_many(['AAPL']) is None
+
+    data_repo.rebuild_ui_cache()
+    rows = data_repo.get_ui_cache_data_many(['aapl', 'MSFT', 'NOPE'])
+    assert set(rows) == {'AAPL', 'MSFT'}
+    assert rows['AAPL']['pe_status'] == 'success'
+
+    # Stale rows are recomputed before they are served
+    conn = sqlite3.connect(ui_db)
+    conn.execute("INSERT INTO ai_scores (company_id, total_score_percentile_rank) VALUES (2, 42.0)")
+    conn.commit()
+    conn.close()
+    data_repo.ui_cache_repo.execute_update("UPDATE ui_cache SET refreshed_at = '2000-01-01T00:00:00'")
+    assert data_repo.get_ui_cache_data_many(['MSFT'])['MSFT']['total_score_percentile_rank'] == 42.0
+
+def test_outdated_table_is_ignored_then_recreated(ui_db):
+    conn = sqlite3.connect(ui_db)
+    conn.execute("CREATE TABLE ui_cache (ticker TEXT PRIMARY KEY, company_name TEXT, total_score REAL)")
+    conn.execute("INSERT INTO ui_cache VALUES ('AAPL', 'Old Apple', 1.0)")
+    conn.commit()
+    conn.close()
+    data_repo = DataRepository(ui_db)
+
+    assert data_repo.ui_cache_repo.table_exists() is False
+    assert data_repo.get_ui_cache_data('AAPL')['company_name'] == 'Apple'
+    # Write paths don't try to refresh rows of the outdated table
+    data_repo.upsert_growth_estimates('MSFT', 5.0, 5.0, 'success')
+
+    assert data_repo.rebuild_ui_cache() == 2
+    assert data_repo.ui_cache_repo.table_exists() is True
+    assert data_repo.ui_cache_repo.get_row('AAPL')['company_id'] == 1
+
+def test_deletes_and_stale_rows_refresh_ui_cache(ui_db):
+    data_repo = DataRepository(ui_db)
+    data_repo.rebuild_ui_cache()
+
+    data_repo.ai_scores_repo.delete_ai_scores(1)
+    data_repo.adjusted_pe_repo.delete_adjusted_pe(1)
+    row = data_repo.ui_cache_repo.get_row('AAPL')
+    assert row['total_score_percentage'] is None
+    assert row['two_year_forward_pe'] is None
+
+    # A write made outside the repositories shows up once the row is past ROW_MAX_AGE
+    conn = sqlite3.connect(ui_db)
+    conn.execute("INSERT INTO ai_scores (company_id, total_score_percentage) VALUES (2, 55.0)")
+    conn.commit()
+    conn.close()
+    assert data_repo.get_ui_cache_data('MSFT')['total_score_percentage'] is None
+    data_repo.ui_cache_repo.execute_update(
+        "UPDATE ui_cache SET refreshed_at = '2000-01-01T00:00:00' WHERE ticker = 'MSFT'")
+    assert data_repo.get_ui_cache_data('MSFT')['total_score_percentage'] == 55.0
+    assert data_repo.ui_cache_repo.get_row('MSFT')['total_score_percentage'] == 55.0
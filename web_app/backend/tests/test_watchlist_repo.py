@@ -95,3 +95,91 @@ def test_watchlist_operations(temp_db):
     
     # Test removing non-existent
     assert repo.remove_from_watchlist('MSFT') is False # Company exists but not in watchlist
+
+def _add_growth_and_pe(path):
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO adjusted_pe_calculations (company_id, adjusted_pe_ratio, calculation_status) VALUES (1, 24.2, 'success')")
+    conn.execute("INSERT INTO growth_estimates (company_id, current_year_growth, next_year_growth, calculation_status) VALUES (1, 10.0, 10.0, 'success')")
+    conn.commit()
+    conn.close()
+
+def test_get_watchlist_derived_columns(temp_db):
+    _add_growth_and_pe(temp_db)
+    repo = WatchlistRepository(db_path=temp_db)
+    repo.add_to_watchlist('AAPL')
+    repo.add_to_watchlist('MSFT')
+
+    rows = {row['ticker']: row for row in repo.get_watchlist()}
+    assert abs(rows['AAPL']['two_year_annualized_growth'] - 10.0) < 1e-9
+    assert abs(rows['AAPL']['two_year_forward_pe'] - 20.0) < 1e-9
+    assert rows['MSFT']['two_year_annualized_growth'] is None
+    assert rows['MSFT']['two_year_forward_pe'] is None
+
+def test_get_watchlist_reads_ui_cache(temp_db):
+    _add_growth_and_pe(temp_db)
+    conn = sqlite3.connect(temp_db)
+    conn.execute("ALTER TABLE financial_scores ADD COLUMN total_rank INTEGER")
+    conn.execute("ALTER TABLE short_interest ADD COLUMN scraped_at TEXT")
+    conn.commit()
+    conn.close()
+    repo = WatchlistRepository(db_path=temp_db)
+    repo.add_to_watchlist('AAPL')
+    repo.add_to_watchlist('MSFT')
+    expected = repo.get_watchlist()
+
+    repo.ui_cache_repo.rebuild()
+    # A value only present in ui_cache shows that rows are read from it
+    conn = sqlite3.connect(temp_db)
+    conn.execute("UPDATE ui_cache SET sector = 'Cached' WHERE ticker = 'AAPL'")
+    conn.commit()
+    conn.close()
+
+    rows = repo.get_watchlist()
+    assert [row['ticker'] for row in rows] == [row['ticker'] for row in expected]
+    cached = {row['ticker']: row for row in rows}
+    assert cached['AAPL']['sector'] == 'Cached'
+    assert abs(cached['AAPL']['two_year_forward_pe'] - 20.0) < 1e-9
+    assert set(rows[0]) == set(expected[0])
+
+def test_get_watchlist_ignores_outdated_ui_cache(temp_db, monkeypatch):
+    _add_growth_and_pe(temp_db)
+    conn = sqlite3.connect(temp_db)
+    conn.execute("CREATE TABLE ui_cache (ticker TEXT PRIMARY KEY, company_name TEXT)")
+    conn.commit()
+    conn.close()
+    repo = WatchlistRepository(db_path=temp_db)
+    repo.add_to_watchlist('AAPL')
+
+    rows = repo.get_watchlist()
+    assert [row['ticker'] for row in rows] == ['AAPL']
+    assert abs(rows[0]['two_year_forward_pe'] - 20.0) < 1e-9
+
+    # Any database error on the ui_cache path falls back to the source tables
+    monkeypatch.setattr(repo.ui_cache_repo, 'table_exists', lambda: True)
+    def broken():
+        raise sqlite3.OperationalError('no such column: u.company_id')
+    monkeypatch.setattr(repo, '_query_cached_watchlist', broken)
+    assert [row['ticker'] for row in repo.get_watchlist()] == ['AAPL']
+
+def test_get_watchlist_refreshes_stale_ui_cache_rows(temp_db):
+    _add_growth_and_pe(temp_db)
+    conn = sqlite3.connect(temp_db)
+    conn.execute("ALTER TABLE financial_scores ADD COLUMN total_rank INTEGER")
+    conn.execute("ALTER TABLE short_interest ADD COLUMN scraped_at TEXT")
+    conn.commit()
+    conn.close()
+    repo = WatchlistRepository(db_path=temp_db)
+    repo.add_to_watchlist('AAPL')
+    repo.ui_cache_repo.rebuild()
+
+    # A write made outside the repositories, after which the row ages out
+    conn = sqlite3.connect(temp_db)
+    conn.execute("UPDATE companies SET sector = 'Changed' WHERE ticker = 'AAPL'")
+    conn.execute("UPDATE ui_cache SET refreshed_at = '2000-01-01T00:00:00'")
+    conn.commit()
+    conn.close()
+
+    rows = repo.get_watchlist()
+    assert rows[0]['sector'] == 'Changed'
+    assert 'refreshed_at' not in rows[0]
+    assert repo.ui_cache_repo.get_row('AAPL')['sector'] == 'Changed'
@@ -1,7 +1,7 @@
 import pytest
 from unittest.mock import MagicMock, patch
 from datetime import datetime, timedelta, timezone
-from web_app.backend.services.watchlist_service import WatchlistService
+from web_app.backend.services.watchlist_service import WatchlistService, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
 
 @pytest.fixture
 def mock_repos():
@@ -12,7 +12,11 @@ def mock_repos():
 @pytest.fixture
 def watchlist_service(mock_repos):
     watchlist_repo, data_repo = mock_repos
-    return WatchlistService(watchlist_repo, data_repo)
+    service = WatchlistService(watchlist_repo, data_repo)
+    # Keep background jobs off the shared executor
+    service.executor = MagicMock()
+    service.executor.active_tickers.return_value = set()
+    return service
 
 def test_get_watchlist_enriched(watchlist_service, mock_repos):
     watchlist_repo, data_repo = mock_repos
@@ -24,21 +28,24 @@ def test_get_watchlist_enriched(watchlist_service, mock_repos):
             'adjusted_pe_ratio': 20.0,
             'short_float': '1.5%',
             'adjusted_oi_after_tax': 100.0,
-            'updated_ev': 2000.0
+            'updated_ev': 2000.0,
+            'two_year_annualized_growth': 10.0,
+            'two_year_forward_pe': 20.0 / 1.21
         }
     ]
     watchlist_repo.get_watchlist.return_value = mock_data
-    data_repo.calculate_two_year_annualized_growth.return_value = 10.0
     
     result = watchlist_service.get_watchlist()
     
     assert result['success'] is True
     item = result['watchlist'][0]
+    # Derived columns come from the repository as-is
     assert item['two_year_annualized_growth'] == 10.0
-    assert item['two_year_forward_pe'] is not None
-    # growth_multiplier = (1 + 0.1)^2 = 1.21
-    # forward_PE = 20 / 1.21 = 16.5289...
     assert abs(item['two_year_forward_pe'] - 16.5289) < 0.001
+    assert item['growth_loading'] is False
+    assert item['adjusted_pe_loading'] is False
+    assert item['short_interest_loading'] is False
+    data_repo.calculate_two_year_annualized_growth.assert_not_called()
 
 def test_forward_pe_can_use_quickfs_fallback(watchlist_service, mock_repos):
     watchlist_repo, data_repo = mock_repos
@@ -51,11 +58,12 @@ def test_forward_pe_can_use_quickfs_fallback(watchlist_service, mock_repos):
             'adjusted_oi_after_tax': None,
             'updated_ev': None,
             'quickfs_ev': 4800.0,
-            'growth_status': 'success'
+            'growth_status': 'success',
+            'two_year_annualized_growth': 5.25,
+            'two_year_forward_pe': 16.0 / 1.0525 ** 2
         }
     ]
     watchlist_repo.get_watchlist.return_value = mock_data
-    data_repo.calculate_two_year_annualized_growth.return_value = 5.2
 
     result = watchlist_service.get_watchlist()
     item = result['watchlist'][0]
@@ -77,10 +85,15 @@ def test_growth_retry_triggered_for_stale_error(watchlist_service, mock_repos):
     ]
 
     with patch.object(watchlist_service, '_trigger_growth_fetch') as mock_growth:
-        result = watchlist_service.get_watchlist()
-        item = result['watchlist'][0]
-        mock_growth.assert_called_once_with('FDS')
-        assert item['growth_loading'] is True
+        item = watchlist_service.get_watchlist()['watchlist'][0]
+        # Reading the watchlist only reports the missing data
+        mock_growth.assert_not_called()
+        assert item['growth_loading'] is False
+        assert item['data_missing'] is True
+
+        result = watchlist_service.schedule_missing()
+        mock_growth.assert_called_once_with('FDS', priority=PRIORITY_NORMAL)
+        assert result['scheduled']['growth'] == ['FDS']
 
 def test_growth_no_retry_for_recent_error(watchlist_service, mock_repos):
     watchlist_repo, _ = mock_repos
@@ -96,8 +109,8 @@ def test_growth_no_retry_for_recent_error(watchlist_service, mock_repos):
     ]
 
     with patch.object(watchlist_service, '_trigger_growth_fetch') as mock_growth:
-        result = watchlist_service.get_watchlist()
-        item = result['watchlist'][0]
+        item = watchlist_service.get_watchlist()['watchlist'][0]
+        watchlist_service.schedule_missing()
         mock_growth.assert_not_called()
         assert item['growth_loading'] is False
 
@@ -115,9 +128,9 @@ def test_add_to_watchlist_success(watchlist_service, mock_repos):
         
         assert result['success'] is True
         assert 'added to watchlist' in result['message']
-        mock_pe.assert_called_once_with("AAPL")
-        mock_growth.assert_called_once_with("AAPL")
-        mock_si.assert_called_once_with("AAPL")
+        mock_pe.assert_called_once_with("AAPL", priority=PRIORITY_HIGH)
+        mock_growth.assert_called_once_with("AAPL", priority=PRIORITY_HIGH)
+        mock_si.assert_called_once_with("AAPL", priority=PRIORITY_HIGH)
 
 def test_add_to_watchlist_already_exists(watchlist_service, mock_repos):
     watchlist_repo, data_repo = mock_repos
@@ -148,7 +161,77 @@ def test_calculate_missing_adjusted_pe_for_all(watchlist_service, mock_repos):
         None # MSFT missing
     ])
     
-    with patch('threading.Thread') as mock_thread:
-        watchlist_service.calculate_missing_adjusted_pe_for_all()
-        # Should only trigger for MSFT
-        assert mock_thread.call_count == 1
+    watchlist_service.calculate_missing_adjusted_pe_for_all()
+    # Should only trigger for MSFT, behind interactive requests
+    watchlist_service.executor.submit.assert_called_once()
+    args, kwargs = watchlist_service.executor.submit.call_args
+    assert args[:2] == ('pe', 'MSFT')
+    assert kwargs['priority'] == PRIORITY_LOW
+
+def test_watchlist_reports_queued_jobs_as_loading(watchlist_service, mock_repos):
+    watchlist_repo, data_repo = mock_repos
+    watchlist_repo.get_watchlist.return_value = [{'ticker': 'AAPL'}]
+    watchlist_service.executor.active_tickers.return_value = {'AAPL'}
+
+    with patch.object(watchlist_service, '_trigger_pe_calculation') as mock_pe, \
+         patch.object(watchlist_service, '_trigger_growth_fetch') as mock_growth, \
+         patch.object(watchlist_service, '_trigger_short_interest_fetch') as mock_si:
+        item = watchlist_service.get_watchlist()['watchlist'][0]
+        result = watchlist_service.schedule_missing()
+
+    assert item['adjusted_pe_loading'] is True
+    assert item['growth_loading'] is True
+    assert item['short_interest_loading'] is True
+    assert item['data_missing'] is False
+    # Already queued, so nothing is submitted again
+    mock_pe.assert_not_called()
+    mock_growth.assert_not_called()
+    mock_si.assert_not_called()
+    assert result['scheduled'] == {'pe': [], 'growth': [], 'short_interest': []}
+
+def test_get_watchlist_never_submits_jobs(watchlist_service, mock_repos):
+    watchlist_repo, _ = mock_repos
+    watchlist_repo.get_watchlist.return_value = [
+        {'ticker': 'AAPL'},
+        {'ticker': 'MSFT', 'pe_status': 'no_data', 'growth_status': 'no_data', 'short_interest_status': 'no_data'},
+    ]
+
+    rows = watchlist_service.get_watchlist()['watchlist']
+
+    watchlist_service.executor.submit.assert_not_called()
+    # Nothing is queued, so nothing is loading and the page must schedule AAPL
+    assert [row['adjusted_pe_loading'] for row in rows] == [False, False]
+    assert [row['data_missing'] for row in rows] == [True, False]
+
+def test_schedule_missing_reports_only_queued_jobs(watchlist_service, mock_repos):
+    watchlist_repo, _ = mock_repos
+    watchlist_repo.get_watchlist.return_value = [{'ticker': 'AAPL', 'growth_status': 'no_data',
+                                                  'short_interest_status': 'no_data'}]
+    # A submit that fails is not reported as scheduled, so the page doesn't wait on it
+    watchlist_service.executor.submit.side_effect = RuntimeError('executor shut down')
+
+    result = watchlist_service.schedule_missing()
+
+    assert result['scheduled'] == {'pe': [], 'growth': [], 'short_interest': []}
+    assert watchlist_service.get_watchlist()['watchlist'][0]['data_missing'] is True
+
+def test_schedule_missing_batches_one_watchlist_read(watchlist_service, mock_repos):
+    watchlist_repo, _ = mock_repos
+    watchlist_repo.get_watchlist.return_value = [
+        {'ticker': 'aapl', 'adjusted_pe_ratio': 25.0, 'current_year_growth': 5.0, 'next_year_growth': 6.0},
+        {'ticker': 'MSFT', 'pe_status': 'no_data', 'growth_status': 'no_data', 'short_interest_status': 'error'},
+        {'ticker': 'NVDA', 'adjusted_pe_ratio': 40.0, 'short_float': '1.1%',
+         'growth_status': 'success', 'current_year_growth': 30.0},
+    ]
+    watchlist_service.executor.active_tickers.side_effect = lambda job_type: {'AAPL'} if job_type == 'short_interest' else set()
+
+    with patch.object(watchlist_service, '_trigger_pe_calculation') as mock_pe, \
+         patch.object(watchlist_service, '_trigger_growth_fetch') as mock_growth, \
+         patch.object(watchlist_service, '_trigger_short_interest_fetch') as mock_si:
+        result = watchlist_service.schedule_missing(priority=PRIORITY_LOW)
+
+    watchlist_repo.get_watchlist.assert_called_once()
+    mock_pe.assert_not_called()
+    mock_growth.assert_called_once_with('NVDA', priority=PRIORITY_LOW)
+    mock_si.assert_not_called()
+    assert result == {'success': True, 'scheduled': {'pe': [], 'growth': ['NVDA'], 'short_interest': []}}
@@ -6,10 +6,19 @@ Uses GOOGL as an example.
 """
 
 import requests
-from bs4 import BeautifulSoup
 import time
 import sys
 
+try:
+    from utils.scrapers.scrape_engine import get_scrape_engine
+    from utils.scrapers.snapshot_parser import has_snapshot_table, parse_snapshot_table
+except ImportError:
+    from .scrape_engine import get_scrape_engine
+    from .snapshot_parser import has_snapshot_table, parse_snapshot_table
+
+# Quote page URL; tests point this at a local server
+FINVIZ_QUOTE_URL = "https://finviz.com/quote.ashx?t={ticker}"
+
 # User agent to avoid being blocked
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
@@ -26,15 +35,16 @@ def get_finviz_quote_url(ticker):
         str: URL to the Finviz quote page
     """
     ticker_upper = ticker.strip().upper()
-    return f"https://finviz.com/quote.ashx?t={ticker_upper}"
+    return FINVIZ_QUOTE_URL.format(ticker=ticker_upper)
 
 
-def scrape_short_interest(ticker):
+def scrape_short_interest(ticker, engine=None):
     """
     Scrape short interest information from Finviz for a given ticker.
     
     Args:
         ticker: Stock ticker symbol (e.g., 'GOOGL')
+        engine: ScrapeEngine to fetch with (defaults to the shared engine)
         
     Returns:
         dict: Dictionary containing short interest data, or None if error
@@ -46,39 +56,18 @@ def scrape_short_interest(ticker):
     print(f"URL: {url}")
     
     try:
-        # Make request with headers to avoid being blocked
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        response.raise_for_status()
-        
-        # Parse HTML
-        soup = BeautifulSoup(response.content, 'html.parser')
+        # Make request with headers to avoid being blocked; the engine rate
+        # limits, retries throttled requests and raises on error statuses
+        response = (engine or get_scrape_engine()).fetch(url, validate=has_snapshot_table, headers=HEADERS)
         
-        # Find the snapshot table (contains fundamental data)
+        # Read the label/value pairs of the snapshot table (contains fundamental data)
         # Finviz displays data in a table with class 'snapshot-table2'
-        snapshot_table = soup.find('table', class_='snapshot-table2')
+        data = parse_snapshot_table(response.content)
         
-        if not snapshot_table:
+        if data is None:
             print(f"Error: Could not find data table for {ticker_upper}")
             return None
         
-        # Extract all table rows
-        rows = snapshot_table.find_all('tr')
-        
-        # Dictionary to store all found data
-        data = {}
-        
-        # Parse table rows - Finviz uses a 2-column format
-        for row in rows:
-            cells = row.find_all('td')
-            if len(cells) >= 2:
-                # Process pairs of cells (label, value)
-                for i in range(0, len(cells) - 1, 2):
-                    label = cells[i].get_text(strip=True)
-                    value = cells[i + 1].get_text(strip=True)
-                    
-                    if label and value:
-                        data[label] = value
-        
         # Look for short interest related fields
         short_interest_data = {}
         
@@ -2,22 +2,25 @@
 """
 Batch Short Float Scraper
 Scrapes Finviz for "Short Float" metric for tickers that are in both scores.json and stock_tickers_clean.json
-Saves results to short_interest.json
+Journals results as they arrive (resumable after a crash), compacts them into short_interest.json
+and bulk imports them into the short_interest and finviz_snapshots tables
 """
 
 import json
 import os
 import sys
 import time
-from datetime import datetime
 import requests
-from bs4 import BeautifulSoup
 
 # Add web_app to path for relative imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from utils.scrapers.finviz_scraper import HEADERS
+from utils.scrapers.finviz_scraper import HEADERS, get_finviz_quote_url
+from utils.scrapers.scrape_engine import ScrapeEngine, ProgressReporter, get_scrape_engine
+from utils.scrapers.http_cache import HttpCache, response_fetched_at
+from utils.scrapers.snapshot_parser import has_snapshot_table, parse_finviz_snapshot
+from utils.scrapers.scrape_journal import ScrapeJournal
 
 # File paths
 SCORES_FILE = "data/scores.json"
@@ -25,12 +28,14 @@ TICKER_FILE = "data/stock_tickers_clean.json"
 SHORT_INTEREST_FILE = "data/short_interest.json"
 TICKER_DEFINITIONS_FILE = "data/ticker_definitions.json"
 
-# Rate limiting - delay between requests (in seconds)
-REQUEST_DELAY = 1.0  # 1 second delay between requests to be respectful
+# Rate limiting - sustained requests per second to Finviz, and concurrent requests
+REQUESTS_PER_SECOND = 2.0
+MAX_CONCURRENT_REQUESTS = 4
 
 # Batch processing
-BATCH_SIZE = 100  # Save progress every N tickers
-SAVE_INTERVAL = 10  # Save progress every N successful scrapes
+BATCH_SIZE = 100  # Import results into the database every N scraped tickers
+SAVE_INTERVAL = 10  # Sync the journal to disk every N processed tickers
+COMPACT_INTERVAL = 1000  # Fold the journal into SHORT_INTEREST_FILE every N results
 
 
 def load_scored_tickers():
@@ -165,104 +170,144 @@ def get_tickers_to_scrape():
     return tickers_to_scrape
 
 
-def load_existing_short_interest():
+def open_database_importer():
     """
-    Load existing short interest data if file exists.
+    Get the repositories the batch job imports results into.
     
     Returns:
-        dict: Dictionary with existing short interest data
+        tuple: (DataRepository, FinvizSnapshotRepository), or None if the database isn't available
     """
-    if os.path.exists(SHORT_INTEREST_FILE):
-        try:
-            with open(SHORT_INTEREST_FILE, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Warning: Could not load existing {SHORT_INTEREST_FILE}: {e}")
-            return {"tickers": {}, "last_updated": None, "total_scraped": 0}
-    
-    return {"tickers": {}, "last_updated": None, "total_scraped": 0}
+    try:
+        from repositories.base_repository import DB_PATH
+        from repositories.data_repository import DataRepository
+        from repositories.finviz_snapshot_repository import FinvizSnapshotRepository
+    except ImportError as e:
+        print(f"Warning: Database import disabled: {e}")
+        return None
+    if not os.path.exists(DB_PATH):
+        print(f"Warning: Database not found at {DB_PATH}; results will only be saved to {SHORT_INTEREST_FILE}")
+        return None
+    return DataRepository(DB_PATH), FinvizSnapshotRepository(DB_PATH)
 
 
-def save_short_interest(data):
+def import_results(importer, short_interest_rows, snapshots, journal=None):
     """
-    Save short interest data to JSON file.
+    Bulk upsert pending results into the short_interest and finviz_snapshots tables.
     
     Args:
-        data: Dictionary containing short interest data
+        importer: Repositories from open_database_importer()
+        short_interest_rows: Dicts with ticker, short_float, status and scraped_at
+        snapshots: Dicts with ticker, fields and scraped_at
+        journal: ScrapeJournal whose records of the imported tickers are marked imported
+        
+    Returns:
+        int: Number of short_interest rows stored
+        
+    Raises:
+        Exception: If the import failed; the rows stay unmarked so they can be retried
     """
-    try:
-        data["last_updated"] = datetime.now().isoformat()
-        with open(SHORT_INTEREST_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-        return True
-    except Exception as e:
-        print(f"Error saving {SHORT_INTEREST_FILE}: {e}")
-        return False
+    data_repo, snapshot_repo = importer
+    stored = 0
+    if snapshots:
+        snapshot_repo.upsert_snapshots(snapshots)
+    if short_interest_rows:
+        stored = data_repo.bulk_upsert_short_interest(short_interest_rows)
+    if journal is not None:
+        journal.mark([row['ticker'] for row in short_interest_rows], imported=True)
+    return stored
+
+
+def unimported_rows(short_interest_data):
+    """short_interest rows for results in the short interest file not yet imported into the database."""
+    return [short_interest_row(ticker, record)
+            for ticker, record in short_interest_data.get("tickers", {}).items()
+            if not record.get('imported')]
+
 
+def short_interest_row(ticker, record):
+    """short_interest table row for a journal record."""
+    return {
+        'ticker': ticker,
+        'short_float': record.get('short_float'),
+        'status': 'success' if record.get('short_float') else 'no_data',
+        'scraped_at': record.get('scraped_at')
+    }
 
-def scrape_ticker_short_interest(ticker):
+
+def scrape_finviz_snapshot(ticker, engine=None, max_age=None):
     """
-    Scrape short float for a single ticker.
-    Only extracts the "Short Float" metric from Finviz.
+    Fetch a ticker's Finviz quote page and parse its whole snapshot table.
     
     Args:
         ticker: Stock ticker symbol
+        engine: ScrapeEngine to fetch with (defaults to the shared engine)
+        max_age: Seconds a cached page may be reused (defaults to the cache TTL; 0 revalidates)
         
     Returns:
-        dict: Short float data or None if error
+        FinvizSnapshot: Every snapshot field, or None if error. Its scraped_at
+        is when the page was fetched, which is earlier for cached pages
     """
     ticker_upper = ticker.strip().upper()
-    url = f"https://finviz.com/quote.ashx?t={ticker_upper}"
+    url = get_finviz_quote_url(ticker_upper)
     
     try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        snapshot_table = soup.find('table', class_='snapshot-table2')
-        
-        if not snapshot_table:
-            return None
-        
-        # Extract all data from table
-        data = {}
-        rows = snapshot_table.find_all('tr')
-        
-        for row in rows:
-            cells = row.find_all('td')
-            if len(cells) >= 2:
-                for i in range(0, len(cells) - 1, 2):
-                    label = cells[i].get_text(strip=True)
-                    value = cells[i + 1].get_text(strip=True)
-                    if label and value:
-                        data[label] = value
-        
-        # Only extract "Short Float" metric
-        short_float = None
-        if 'Short Float' in data:
-            short_float = data['Short Float']
-        
-        if short_float:
-            return {
-                'ticker': ticker_upper,
-                'short_float': short_float,
-                'scraped_at': datetime.now().isoformat()
-            }
-        else:
-            # Return empty dict to indicate ticker was checked but no short float data found
-            return {
-                'ticker': ticker_upper,
-                'short_float': None,
-                'scraped_at': datetime.now().isoformat(),
-                'note': 'No short float data available'
-            }
-        
+        # Pages without a snapshot table (block or captcha pages) are never cached
+        response = (engine or get_scrape_engine()).fetch(url, max_age=max_age, validate=has_snapshot_table,
+                                                         headers=HEADERS)
+        return parse_finviz_snapshot(response.content, ticker_upper, scraped_at=response_fetched_at(response))
     except requests.exceptions.RequestException as e:
         return None
     except Exception as e:
         return None
 
 
+def short_interest_from_snapshot(snapshot):
+    """
+    Short float result for a parsed snapshot, as returned by scrape_ticker_short_interest.
+    
+    Args:
+        snapshot: FinvizSnapshot of the ticker
+        
+    Returns:
+        dict: Short float data
+    """
+    # Only extract "Short Float" metric
+    short_float = snapshot.short_float
+    
+    if short_float:
+        return {
+            'ticker': snapshot.ticker,
+            'short_float': short_float,
+            'scraped_at': snapshot.scraped_at
+        }
+    else:
+        # Return empty dict to indicate ticker was checked but no short float data found
+        return {
+            'ticker': snapshot.ticker,
+            'short_float': None,
+            'scraped_at': snapshot.scraped_at,
+            'note': 'No short float data available'
+        }
+
+
+def scrape_ticker_short_interest(ticker, engine=None):
+    """
+    Scrape short float for a single ticker.
+    Only extracts the "Short Float" metric from Finviz.
+    
+    Args:
+        ticker: Stock ticker symbol
+        engine: ScrapeEngine to fetch with (defaults to the shared engine)
+        
+    Returns:
+        dict: Short float data or None if error
+    """
+    snapshot = scrape_finviz_snapshot(ticker, engine)
+    if not snapshot:
+        return None
+    return short_interest_from_snapshot(snapshot)
+
+
 def main():
     """Main function to batch scrape short interest data."""
     print("=" * 80)
@@ -285,35 +330,52 @@ def main():
     
     print()
     
-    # Load existing data
+    # Load existing data, replaying results journaled by an interrupted run
     print(f"Loading existing data from {SHORT_INTEREST_FILE}...")
-    short_interest_data = load_existing_short_interest()
+    journal = ScrapeJournal(SHORT_INTEREST_FILE, compact_interval=COMPACT_INTERVAL)
+    short_interest_data = journal.load()
     existing_tickers = set(short_interest_data.get("tickers", {}).keys())
     
     print(f"Already have data for {len(existing_tickers)} tickers")
+    if journal.replayed:
+        print(f"Recovered {len(journal.replayed)} results from {journal.journal_path}")
     print()
     
+    importer = open_database_importer()
+    if importer:
+        # Results an earlier run saved but failed or didn't get to import; upserts make this idempotent
+        backlog = unimported_rows(short_interest_data)
+        if backlog:
+            print(f"Importing {len(backlog)} saved results not yet in the database...")
+            try:
+                import_results(importer, backlog, [], journal)
+                journal.compact()
+            except Exception as e:
+                print(f"Error importing saved results into the database (will retry next run): {e}")
+    
     # Filter out already scraped tickers
     tickers_to_scrape = [(t, n, e) for t, n, e in tickers if t not in existing_tickers]
     
     if not tickers_to_scrape:
+        journal.close()
         print("All tickers have already been scraped!")
         print(f"Total tickers with data: {len(existing_tickers)}")
         return
     
     print(f"Need to scrape {len(tickers_to_scrape)} tickers")
-    print(f"Estimated time: ~{len(tickers_to_scrape) * REQUEST_DELAY / 60:.1f} minutes")
+    print(f"Estimated time: ~{len(tickers_to_scrape) / REQUESTS_PER_SECOND / 60:.1f} minutes")
     print()
     
     # Ask for confirmation
     response = input("Continue with scraping? (yes/no): ").strip().lower()
     if response not in ['yes', 'y']:
+        journal.close()
         print("Cancelled.")
         return
     
     print()
     print("Starting batch scraping...")
-    print(f"Delay between requests: {REQUEST_DELAY} seconds")
+    print(f"Rate limit: {REQUESTS_PER_SECOND} requests/second, {MAX_CONCURRENT_REQUESTS} at a time")
     print("=" * 80)
     print()
     
@@ -321,53 +383,70 @@ def main():
     success_count = 0
     error_count = 0
     no_data_count = 0
+    imported_count = 0
     start_time = time.time()
+    pending_rows = []
+    pending_snapshots = []
     
-    # Scrape each ticker
-    for i, (ticker, name, exchange) in enumerate(tickers_to_scrape, 1):
-        print(f"[{i}/{len(tickers_to_scrape)}] Scraping {ticker} ({name})...", end=" ", flush=True)
-        
-        result = scrape_ticker_short_interest(ticker)
-        
-        if result:
-            if result.get('short_float'):
-                # Has short float data
-                short_interest_data["tickers"][ticker] = {
+    # Pages cached by an earlier run within the cache TTL are not downloaded again
+    engine = ScrapeEngine(rate=REQUESTS_PER_SECOND, per_host_limit=MAX_CONCURRENT_REQUESTS,
+                          max_workers=MAX_CONCURRENT_REQUESTS, headers=HEADERS, cache=HttpCache())
+    progress = ProgressReporter(len(tickers_to_scrape), every=SAVE_INTERVAL, label="Scraped")
+    
+    # Scrape concurrently; results arrive in completion order on this thread
+    results = engine.map(lambda entry: scrape_finviz_snapshot(entry[0], engine),
+                         tickers_to_scrape, progress=progress)
+    try:
+        for i, ((ticker, name, exchange), snapshot, _) in enumerate(results, 1):
+            if snapshot:
+                result = short_interest_from_snapshot(snapshot)
+                record = {
                     'company_name': name,
                     'exchange': exchange,
                     'short_float': result['short_float'],
                     'scraped_at': result['scraped_at']
                 }
-                success_count += 1
-                print(f"✓ Short Float: {result['short_float']}")
+                if result['short_float']:
+                    # Has short float data
+                    success_count += 1
+                else:
+                    # No short float data available
+                    record['note'] = 'No short float data available'
+                    no_data_count += 1
+                record['imported'] = False
+                journal.append(ticker, record)
+                pending_rows.append(short_interest_row(ticker, record))
+                pending_snapshots.append({'ticker': ticker, 'fields': snapshot.fields,
+                                          'scraped_at': snapshot.scraped_at})
             else:
-                # No short float data available
-                short_interest_data["tickers"][ticker] = {
-                    'company_name': name,
-                    'exchange': exchange,
-                    'short_float': None,
-                    'scraped_at': result['scraped_at'],
-                    'note': 'No short float data available'
-                }
-                no_data_count += 1
-                print("✓ (no short float data)")
-        else:
-            error_count += 1
-            print("✗ Error")
-        
-        # Save progress periodically
-        if i % SAVE_INTERVAL == 0:
-            short_interest_data["total_scraped"] = len(short_interest_data["tickers"])
-            if save_short_interest(short_interest_data):
-                print(f"  [Progress saved: {i}/{len(tickers_to_scrape)}]")
-        
-        # Rate limiting delay
-        if i < len(tickers_to_scrape):  # Don't delay after last request
-            time.sleep(REQUEST_DELAY)
-    
-    # Final save
-    short_interest_data["total_scraped"] = len(short_interest_data["tickers"])
-    save_short_interest(short_interest_data)
+                error_count += 1
+                print(f"  ✗ Error scraping {ticker} ({name})")
+            
+            # Make the journal durable periodically
+            if i % SAVE_INTERVAL == 0:
+                journal.checkpoint()
+            
+            # Import into the database in batches; a failed batch stays pending and is retried
+            if importer and len(pending_rows) >= BATCH_SIZE:
+                journal.checkpoint()
+                try:
+                    imported_count += import_results(importer, pending_rows, pending_snapshots, journal)
+                    pending_rows, pending_snapshots = [], []
+                except Exception as e:
+                    print(f"  ✗ Error importing {len(pending_rows)} results into the database "
+                          f"(will retry with the next batch): {e}")
+    finally:
+        # Cancel tickers not yet started, so an interrupted run stops scraping
+        results.close()
+        engine.close()
+        if importer and pending_rows:
+            try:
+                imported_count += import_results(importer, pending_rows, pending_snapshots, journal)
+            except Exception as e:
+                print(f"Error importing {len(pending_rows)} results into the database "
+                      f"(they will be imported on the next run): {e}")
+        # Final save: fold the journal, with import marks, into the JSON file
+        journal.close()
     
     # Display summary
     elapsed_time = time.time() - start_time
@@ -380,7 +459,14 @@ def main():
     print(f"  ✓ Success (no short float data): {no_data_count}")
     print(f"  ✗ Errors: {error_count}")
     print(f"Total time: {elapsed_time / 60:.1f} minutes")
+    stats = engine.get_stats()
+    print(f"HTTP requests: {stats['requests']} ({stats['retries']} retries, {stats['failures']} failed)")
+    cache_stats = stats['cache']
+    print(f"HTTP cache: {cache_stats['hits']} hits, {cache_stats['revalidations']} revalidated, "
+          f"{cache_stats['misses']} misses, {cache_stats['bytes_saved'] / 1e6:.1f} MB not downloaded")
     print(f"Data saved to: {SHORT_INTEREST_FILE}")
+    if importer:
+        print(f"Imported into database: {imported_count} short interest rows")
     print(f"Total tickers in file: {len(short_interest_data['tickers'])}")
     print("=" * 80)
 
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+On-disk HTTP response cache for scrapers.
+Stores response bodies keyed by URL with a TTL, revalidates stale entries with
+ETag/Last-Modified conditional requests and evicts least recently used entries
+beyond a size bound.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'http_cache')
+
+# Seconds a stored page is served without contacting the server; matches the
+# Finviz snapshot freshness window
+DEFAULT_TTL = 12 * 3600.0
+
+# Bytes on disk (compressed) before least recently used entries are evicted
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Response headers kept with an entry
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+# Header carrying the epoch time a cached response was stored or last revalidated
+STORED_AT_HEADER = 'X-Cache-Stored-At'
+
+_SUFFIX = '.cache'
+
+
+class CachedResponse:
+    """One stored response: body, selected headers and when it was stored or last revalidated."""
+
+    def __init__(self, url: str, body: bytes, headers: Dict[str, str], stored_at: float):
+        self.url = url
+        self.body = body
+        self.headers = headers
+        self.stored_at = stored_at
+
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry."""
+        validators = {}
+        if self.headers.get('ETag'):
+            validators['If-None-Match'] = self.headers['ETag']
+        if self.headers.get('Last-Modified'):
+            validators['If-Modified-Since'] = self.headers['Last-Modified']
+        return validators
+
+    def to_response(self, source: str) -> requests.Response:
+        """
+        Build a requests.Response for callers that expect one; X-Cache tells
+        where it came from and X-Cache-Stored-At when its body was fetched.
+        """
+        response = requests.Response()
+        response.status_code = 200
+        response.url = self.url
+        response._content = self.body
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.headers['X-Cache'] = source
+        response.headers[STORED_AT_HEADER] = repr(self.stored_at)
+        response.encoding = get_encoding_from_headers(response.headers)
+        return response
+
+
+def response_fetched_at(response: requests.Response) -> str:
+    """ISO timestamp of when a response's body was fetched: its cache store time, or now if downloaded."""
+    stored_at = response.headers.get(STORED_AT_HEADER)
+    if stored_at:
+        try:
+            return datetime.fromtimestamp(float(stored_at)).isoformat()
+        except (TypeError, ValueError, OverflowError, OSError):
+            pass
+    return datetime.now().isoformat()
+
+
+class HttpCache:
+    """
+    Disk cache of GET responses keyed by URL.
+
+    Each entry is one file: a JSON metadata line followed by the
+    zlib-compressed body, written to a temporary file and renamed into
+    place so concurrent readers and crashes never see a partial entry.
+    Only 200 responses without Cache-Control: no-store are stored, and
+    callers can pass a validate callback to reject bodies they can't use
+    (e.g. block pages served with a 200). Hits update the entry file's
+    mtime, so LRU order survives a restart.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, ttl: float = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> (size on disk, last access time); built from the directory on first use
+        self._index: Optional[Dict[str, Tuple[int, float]]] = None
+        self._total_bytes = 0
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+        self.bytes_downloaded = 0
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def _load_index(self) -> Dict[str, Tuple[int, float]]:
+        if self._index is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._index = {}
+            for name in os.listdir(self.directory):
+                if name.endswith(_SUFFIX):
+                    try:
+                        stat = os.stat(os.path.join(self.directory, name))
+                    except OSError:
+                        continue
+                    self._index[name[:-len(_SUFFIX)]] = (stat.st_size, stat.st_mtime)
+            self._total_bytes = sum(size for size, _ in self._index.values())
+        return self._index
+
+    def _read(self, key: str) -> Optional[CachedResponse]:
+        try:
+            with open(self._path(key), 'rb') as f:
+                meta = json.loads(f.readline())
+                body = zlib.decompress(f.read())
+        except (OSError, ValueError, zlib.error):
+            return None
+        return CachedResponse(meta['url'], body, meta['headers'], meta['stored_at'])
+
+    def _write(self, key: str, entry: CachedResponse) -> int:
+        meta = json.dumps({'url': entry.url, 'headers': entry.headers, 'stored_at': entry.stored_at})
+        payload = meta.encode('utf-8') + b'\n' + zlib.compress(entry.body, 6)
+        tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, self._path(key))
+        return len(payload)
+
+    def _remember(self, key: str, size: int) -> None:
+        index = self._load_index()
+        previous = index.get(key)
+        if previous:
+            self._total_bytes -= previous[0]
+        index[key] = (size, time.time())
+        self._total_bytes += size
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        index = self._load_index()
+        if self._total_bytes <= self.max_bytes:
+            return
+        for key, _ in sorted(index.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._discard(key)
+            self.evictions += 1
+
+    def _discard(self, key: str) -> None:
+        """Remove one entry. Caller must hold the lock."""
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+        entry = self._load_index().pop(key, None)
+        if entry:
+            self._total_bytes -= entry[0]
+
+    def lookup(self, url: str, max_age: Optional[float] = None,
+               validate: Optional[Callable[[bytes], bool]] = None) -> Tuple[Optional[CachedResponse], bool]:
+        """
+        Find a stored response for a URL.
+
+        Args:
+            url: Request URL
+            max_age: Seconds an entry stays fresh (defaults to ttl; 0 forces revalidation)
+            validate: Called with the stored body; an entry it rejects is removed
+
+        Returns:
+            tuple: (entry or None, whether it is fresh); a fresh entry counts as a hit
+        """
+        key = self._key(url)
+        with self._lock:
+            if key not in self._load_index():
+                return None, False
+            entry = self._read(key)
+            if entry is None or entry.url != url:
+                return None, False
+            if validate is not None and not validate(entry.body):
+                self._discard(key)
+                return None, False
+            fresh = entry.age() < (self.ttl if max_age is None else max_age)
+            if fresh:
+                self.hits += 1
+                self.bytes_saved += len(entry.body)
+                now = time.time()
+                size, _ = self._index[key]
+                self._index[key] = (size, now)
+                try:
+                    os.utime(self._path(key), (now, now))
+                except OSError:
+                    pass
+            return entry, fresh
+
+    def discard(self, url: str) -> None:
+        """Remove the entry for a URL, e.g. when its body turned out to be unusable."""
+        with self._lock:
+            self._discard(self._key(url))
+
+    def revalidated(self, entry: CachedResponse, response: requests.Response) -> CachedResponse:
+        """Record a 304 for a stale entry, restarting its TTL and updating its validators."""
+        for name in STORED_HEADERS:
+            if response.headers.get(name):
+                entry.headers[name] = response.headers[name]
+        entry.stored_at = time.time()
+        key = self._key(entry.url)
+        with self._lock:
+            self.revalidations += 1
+            self.bytes_saved += len(entry.body)
+            try:
+                self._remember(key, self._write(key, entry))
+            except OSError as e:
+                print(f"Error updating HTTP cache entry for {entry.url}: {e}")
+        return entry
+
+    def store(self, url: str, response: requests.Response,
+              validate: Optional[Callable[[bytes], bool]] = None) -> bool:
+        """
+        Record a downloaded response, storing it if it is cacheable.
+
+        Args:
+            url: Request URL
+            response: The downloaded response
+            validate: Called with the body; a body it rejects is not stored
+
+        Returns:
+            bool: True if the response was stored
+        """
+        with self._lock:
+            self.misses += 1
+            self.bytes_downloaded += len(response.content)
+        if response.status_code != 200 or 'no-store' in response.headers.get('Cache-Control', '').lower():
+            return False
+        if validate is not None and not validate(response.content):
+            self.discard(url)
+            return False
+        headers = {name: response.headers[name] for name in STORED_HEADERS if response.headers.get(name)}
+        entry = CachedResponse(url, response.content, headers, time.time())
+        key = self._key(url)
+        with self._lock:
+            try:
+                self._remember(key, self._write(key, entry))
+            except OSError as e:
+                print(f"Error writing HTTP cache entry for {url}: {e}")
+                return False
+            self.stores += 1
+            self._evict()
+        return True
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            for key in list(self._load_index()):
+                self._discard(key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters, bandwidth saved and the current size."""
+        with self._lock:
+            index = self._load_index()
+            requests_seen = self.hits + self.revalidations + self.misses
+            return {
+                'entries': len(index),
+                'size_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'revalidations': self.revalidations,
+                'misses': self.misses,
+                'stores': self.stores,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits + self.revalidations) / requests_seen if requests_seen else 0.0,
+                'bytes_saved': self.bytes_saved,
+                'bytes_downloaded': self.bytes_downloaded,
+            }
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Concurrent HTTP engine for scrapers.
+Shares one keep-alive session across worker threads, rate limits each host with
+a token bucket, caps concurrent requests per host and retries throttled or
+failed requests with jittered exponential backoff. An optional on-disk HTTP
+cache serves pages fetched within its TTL without touching the network.
+"""
+
+import itertools
+import random
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from utils.scrapers.http_cache import HttpCache
+except ImportError:
+    from .http_cache import HttpCache
+
+# Requests per second allowed to one host, and the burst the bucket can save up
+DEFAULT_RATE = 2.0
+DEFAULT_BURST = 4
+
+# Concurrent requests in flight to one host
+DEFAULT_PER_HOST_LIMIT = 4
+
+# Worker threads used by ScrapeEngine.map
+DEFAULT_MAX_WORKERS = 8
+
+# Attempts after the first one, and backoff bounds in seconds
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_BACKOFF_MAX = 30.0
+
+DEFAULT_TIMEOUT = 10
+
+# Responses worth retrying: throttling and transient server errors
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Tokens refill continuously at rate per second up to capacity; acquire
+    blocks until a token is available.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def try_acquire(self) -> float:
+        """
+        Take a token if one is available.
+
+        Returns:
+            float: 0 if a token was taken, otherwise seconds until one will be
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self) -> None:
+        """Block until a token is taken."""
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return
+            self._sleep(wait)
+
+
+class ProgressReporter:
+    """Prints throughput and an ETA every few completed items."""
+
+    def __init__(self, total: int, every: int = 10, label: str = "Progress", stream=None):
+        self.total = total
+        self.every = max(1, every)
+        self.label = label
+        self.stream = stream or sys.stdout
+        self.done = 0
+        self.failed = 0
+        self.started_at = time.monotonic()
+
+    def __call__(self, item: Any, result: Any, error: Optional[BaseException]) -> None:
+        self.done += 1
+        if error is not None or result is None:
+            self.failed += 1
+        if self.done % self.every == 0 or self.done == self.total:
+            elapsed = time.monotonic() - self.started_at
+            rate = self.done / elapsed if elapsed > 0 else 0.0
+            eta = (self.total - self.done) / rate if rate > 0 else 0.0
+            print(f"  [{self.label}: {self.done}/{self.total}, {self.failed} failed, "
+                  f"{rate:.1f}/s, ETA {eta / 60:.1f} min]", file=self.stream, flush=True)
+
+
+class ScrapeEngine:
+    """
+    Rate-limited, retrying HTTP client shared by scraper threads.
+
+    fetch() is safe to call from any thread, including background job workers.
+    With a cache, fresh pages are served from disk without using a rate
+    limit token, and stale ones are revalidated with a conditional GET.
+    map() runs a per-item function over a thread pool and yields results as
+    they complete, so batch jobs can save progress as they go.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST,
+                 per_host_limit: int = DEFAULT_PER_HOST_LIMIT, max_workers: int = DEFAULT_MAX_WORKERS,
+                 max_retries: int = DEFAULT_MAX_RETRIES, backoff_base: float = DEFAULT_BACKOFF_BASE,
+                 backoff_max: float = DEFAULT_BACKOFF_MAX, timeout: float = DEFAULT_TIMEOUT,
+                 headers: Optional[Dict[str, str]] = None, session: Optional[requests.Session] = None,
+                 cache: Optional[HttpCache] = None, sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self.per_host_limit = per_host_limit
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.cache = cache
+        self._sleep = sleep
+
+        if session is None:
+            session = requests.Session()
+            # One pooled connection per concurrent request, kept alive between requests
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(per_host_limit, max_workers))
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        if headers:
+            session.headers.update(headers)
+        self.session = session
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._hosts_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+
+    def _host_limits(self, url: str) -> Tuple[TokenBucket, threading.BoundedSemaphore]:
+        host = urlsplit(url).netloc.lower()
+        with self._hosts_lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst, sleep=self._sleep)
+                self._buckets[host] = bucket
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return bucket, self._host_slots[host]
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Seconds to wait before retry number attempt (0-based), honoring Retry-After."""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after:
+                try:
+                    return min(self.backoff_max, max(0.0, float(retry_after)))
+                except ValueError:
+                    pass
+        # Full jitter keeps workers that failed together from retrying together
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def fetch(self, url: str, max_age: Optional[float] = None,
+              validate: Optional[Callable[[bytes], bool]] = None, **kwargs) -> requests.Response:
+        """
+        GET a URL within the host's rate and concurrency limits.
+
+        Retries connection errors, timeouts and RETRY_STATUSES responses up to
+        max_retries times. With a cache, a page stored less than max_age
+        seconds ago (the cache TTL by default; 0 always revalidates) is
+        returned without a request, and a stale one is sent with
+        If-None-Match/If-Modified-Since so a 304 reuses the stored body.
+        validate, if given, is called with a body before it is cached or served
+        from the cache, so unusable pages (e.g. block pages) are not replayed.
+
+        Returns:
+            requests.Response: A successful (non-error status) response; its
+            X-Cache header is HIT or REVALIDATED when served from the cache
+
+        Raises:
+            requests.exceptions.RequestException: If the last attempt failed
+        """
+        if self.cache is None:
+            return self._download(url, **kwargs)
+
+        cached, fresh = self.cache.lookup(url, max_age, validate)
+        if fresh:
+            return cached.to_response('HIT')
+        if cached is not None:
+            kwargs['headers'] = dict(kwargs.get('headers') or {}, **cached.validators())
+        response = self._download(url, **kwargs)
+        if response.status_code == 304 and cached is not None:
+            response.close()
+            return self.cache.revalidated(cached, response).to_response('REVALIDATED')
+        self.cache.store(url, response, validate)
+        return response
+
+    def _download(self, url: str, **kwargs) -> requests.Response:
+        """GET a URL from the network, rate limited and retried."""
+        kwargs.setdefault('timeout', self.timeout)
+        bucket, slots = self._host_limits(url)
+        attempt = 0
+        while True:
+            bucket.acquire()
+            response = None
+            error = None
+            with slots:
+                self._count('requests')
+                try:
+                    response = self.session.get(url, **kwargs)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    error = e
+
+            retryable = error is not None or response.status_code in RETRY_STATUSES
+            if not retryable:
+                try:
+                    response.raise_for_status()
+                except requests.exceptions.RequestException:
+                    self._count('failures')
+                    raise
+                return response
+            if attempt >= self.max_retries:
+                self._count('failures')
+                if error is not None:
+                    raise error
+                response.raise_for_status()
+            self._count('retries')
+            delay = self._backoff(attempt, response)
+            if response is not None:
+                # Release the connection back to the pool before waiting
+                response.close()
+            self._sleep(delay)
+            attempt += 1
+
+    def map(self, func: Callable[[Any], Any], items: Iterable[Any],
+            progress: Optional[Callable[[Any, Any, Optional[BaseException]], None]] = None
+            ) -> Iterator[Tuple[Any, Any, Optional[BaseException]]]:
+        """
+        Run func over items concurrently.
+
+        Yields (item, result, error) in completion order; error is the
+        exception func raised, if any. progress, if given, is called with the
+        same triple after each item. At most max_workers * 2 items are
+        submitted ahead of the consumer, and items not yet started are
+        cancelled if the consumer stops early (an exception, Ctrl-C or
+        closing the generator).
+        """
+        items = iter(items)
+        window = self.max_workers * 2
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='scrape')
+        pending: Dict[Any, Any] = {}
+        try:
+            for item in itertools.islice(items, window):
+                pending[pool.submit(func, item)] = item
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    error = future.exception()
+                    result = None if error is not None else future.result()
+                    if progress is not None:
+                        progress(item, result, error)
+                    yield item, result, error
+                    for next_item in itertools.islice(items, 1):
+                        pending[pool.submit(func, next_item)] = next_item
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get request, retry and failure counters, and the cache's counters if there is one."""
+        with self._stats_lock:
+            stats = {'requests': self.requests, 'retries': self.retries, 'failures': self.failures}
+        if self.cache is not None:
+            stats['cache'] = self.cache.get_stats()
+        return stats
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_default_engine: Optional[ScrapeEngine] = None
+_default_engine_lock = threading.Lock()
+
+
+def get_scrape_engine() -> ScrapeEngine:
+    """
+    Get the process-wide engine, so every scraper shares one session, one rate
+    limit per host and the on-disk HTTP cache.
+    """
+    global _default_engine
+    with _default_engine_lock:
+        if _default_engine is None:
+            _default_engine = ScrapeEngine(cache=HttpCache())
+        return _default_engine
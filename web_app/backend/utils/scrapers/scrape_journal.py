@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Append-only journal for resumable batch scrapes.
+Results are appended to a JSONL journal next to a compacted JSON file, so a
+checkpoint costs one line per result instead of rewriting the whole file.
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+# Compact the journal into the JSON file after this many appended results
+DEFAULT_COMPACT_INTERVAL = 1000
+
+
+def _write_json_atomic(path: str, data: Dict[str, Any]) -> None:
+    """Write JSON to a temporary file and rename it over path, so readers never see a partial file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ScrapeJournal:
+    """
+    Crash-safe store of per-ticker scrape results.
+
+    The compacted file keeps the {"tickers": {...}, "last_updated", "total_scraped"}
+    layout of the batch scraper's JSON output. Each new result is appended
+    as one JSON line to the journal; load() replays the journal over the
+    compacted file, ignoring a line torn by a crash, and compact() folds the
+    journal back in with an atomic rename before truncating it. A crash
+    between the two only means the journal is replayed again, which is
+    idempotent.
+    """
+
+    def __init__(self, path: str, journal_path: Optional[str] = None,
+                 compact_interval: int = DEFAULT_COMPACT_INTERVAL):
+        self.path = path
+        self.journal_path = journal_path or f"{os.path.splitext(path)[0]}.journal.jsonl"
+        self.compact_interval = compact_interval
+        self.data: Dict[str, Any] = {"tickers": {}, "last_updated": None, "total_scraped": 0}
+        # Results recovered from the journal by load(), not yet compacted
+        self.replayed: Dict[str, Dict[str, Any]] = {}
+        self._journal = None
+        self._appended = 0
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Load the compacted file and replay the journal over it.
+
+        Returns:
+            dict: The merged data; its "tickers" dict is updated in place by append()
+        """
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    self.data = json.load(f)
+                self.data.setdefault("tickers", {})
+            except Exception as e:
+                print(f"Warning: Could not load existing {self.path}: {e}")
+
+        self.replayed = {}
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'rb+') as f:
+                content = f.read()
+                end = content.rfind(b'\n') + 1
+                if end < len(content):
+                    # Drop a line torn by a crash mid-append, so new appends start on a fresh line
+                    f.truncate(end)
+            for line in content[:end].splitlines():
+                try:
+                    entry = json.loads(line)
+                    ticker = entry.pop('ticker')
+                except (ValueError, KeyError, AttributeError):
+                    continue
+                self.data["tickers"][ticker] = entry
+                self.replayed[ticker] = entry
+        self.data["total_scraped"] = len(self.data["tickers"])
+        return self.data
+
+    def append(self, ticker: str, record: Dict[str, Any]) -> None:
+        """Record one ticker's result in memory and in the journal, compacting every compact_interval results."""
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'a')
+        self._journal.write(json.dumps(dict(record, ticker=ticker)) + '\n')
+        self.data["tickers"][ticker] = record
+        self._appended += 1
+        if self.compact_interval and self._appended % self.compact_interval == 0:
+            self.compact()
+
+    def mark(self, tickers, **fields) -> None:
+        """
+        Set fields on already recorded results.
+
+        Marks are kept in memory and written by the next compaction; a crash
+        before then loses them, leaving the results as they were journaled.
+        """
+        for ticker in tickers:
+            record = self.data["tickers"].get(ticker)
+            if record is not None:
+                record.update(fields)
+
+    def checkpoint(self) -> None:
+        """Make every appended result durable."""
+        if self._journal is not None:
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+
+    def compact(self) -> None:
+        """Fold the journal into the compacted file and start an empty journal."""
+        self.checkpoint()
+        self.data["total_scraped"] = len(self.data["tickers"])
+        self.data["last_updated"] = datetime.now().isoformat()
+        _write_json_atomic(self.path, self.data)
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def close(self) -> None:
+        """Compact and release the journal file."""
+        self.compact()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Fast parser for the Finviz quote page snapshot table.
+Scans the raw HTML for the snapshot-table2 table and reads its label/value
+cells directly, instead of building a full BeautifulSoup tree for the page.
+"""
+
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from html import unescape
+from typing import Dict, Optional, Union
+
+_TABLE_START = re.compile(r'<table\b[^>]*\bsnapshot-table2\b[^>]*>', re.IGNORECASE)
+_TABLE_END = re.compile(r'</table\s*>', re.IGNORECASE)
+_ROW_START = re.compile(r'<tr\b', re.IGNORECASE)
+_CELL = re.compile(r'<td\b[^>]*>(.*?)</td\s*>', re.IGNORECASE | re.DOTALL)
+_TAG = re.compile(r'<[^>]*>')
+_NUMBER = re.compile(r'([-+]?(?:\d[\d,]*(?:\.\d*)?|\.\d+))([%KMBT]?)')
+
+# Scale of the magnitude suffixes Finviz uses for counts and dollar amounts
+SUFFIX_MULTIPLIERS = {'K': 1e3, 'M': 1e6, 'B': 1e9, 'T': 1e12}
+
+DEFAULT_BENCHMARK_FIXTURE = os.path.join(os.path.dirname(__file__), '..', '..', 'tests', 'fixtures', 'finviz_quote.html')
+
+
+def _cell_text(cell: str) -> str:
+    """Text of a cell's markup, with each text node stripped (like get_text(strip=True))."""
+    parts = []
+    for part in _TAG.split(cell):
+        if '&' in part:
+            part = unescape(part)
+        part = part.strip()
+        if part:
+            parts.append(part)
+    return ''.join(parts)
+
+
+def parse_snapshot_table(html: Union[str, bytes]) -> Optional[Dict[str, str]]:
+    """
+    Extract the label -> value pairs of a quote page's snapshot table.
+
+    Cells are read in pairs within each row; pairs with an empty label or
+    value are skipped, and a repeated label keeps its last value.
+
+    Returns:
+        dict: Label to raw value text, or None if the page has no snapshot table
+    """
+    if isinstance(html, bytes):
+        html = html.decode('utf-8', errors='replace')
+    start = _TABLE_START.search(html)
+    if not start:
+        return None
+    end = _TABLE_END.search(html, start.end())
+    table = html[start.end():end.start() if end else len(html)]
+
+    data = {}
+    for row in _ROW_START.split(table)[1:]:
+        cells = _CELL.findall(row)
+        for i in range(0, len(cells) - 1, 2):
+            label = _cell_text(cells[i])
+            value = _cell_text(cells[i + 1])
+            if label and value:
+                data[label] = value
+    return data
+
+
+def has_snapshot_table(html: Union[str, bytes]) -> bool:
+    """Check whether a page has a snapshot table, i.e. isn't a block, captcha or error page."""
+    if isinstance(html, bytes):
+        html = html.decode('utf-8', errors='replace')
+    return _TABLE_START.search(html) is not None
+
+
+def parse_snapshot_value(text: Optional[str]) -> Optional[float]:
+    """
+    Convert a snapshot value to a number.
+
+    Percentages keep their percent units ("0.78%" -> 0.78), magnitude suffixes
+    are expanded ("14.84B" -> 14840000000.0) and thousands separators are
+    dropped. Placeholders ("-") and compound or text values ("1.00 (0.43%)",
+    "Yes / Yes") give None.
+    """
+    if not text:
+        return None
+    match = _NUMBER.fullmatch(text.strip())
+    if not match:
+        return None
+    try:
+        number = float(match.group(1).replace(',', ''))
+    except ValueError:
+        return None
+    return number * SUFFIX_MULTIPLIERS.get(match.group(2), 1)
+
+
+@dataclass
+class FinvizSnapshot:
+    """Parsed snapshot table of one ticker's quote page."""
+    ticker: str
+    fields: Dict[str, str]
+    scraped_at: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    def get(self, label: str) -> Optional[str]:
+        """Raw value text for a label, or None if the page doesn't show it."""
+        return self.fields.get(label)
+
+    def number(self, label: str) -> Optional[float]:
+        """Numeric value for a label (see parse_snapshot_value)."""
+        return parse_snapshot_value(self.fields.get(label))
+
+    def numbers(self) -> Dict[str, float]:
+        """Every field with a numeric value, converted."""
+        values = {}
+        for label, text in self.fields.items():
+            value = parse_snapshot_value(text)
+            if value is not None:
+                values[label] = value
+        return values
+
+    @property
+    def short_float(self) -> Optional[str]:
+        """Short Float as shown ("0.78%"), or None if Finviz has no figure."""
+        value = self.fields.get('Short Float')
+        return value if value and value != '-' else None
+
+
+def parse_finviz_snapshot(html: Union[str, bytes], ticker: str,
+                          scraped_at: Optional[str] = None) -> Optional[FinvizSnapshot]:
+    """
+    Parse a quote page into a FinvizSnapshot, or None if it has no snapshot table.
+
+    scraped_at is when the page was fetched (defaults to now); pass the cache
+    store time for pages served from the HTTP cache.
+    """
+    fields = parse_snapshot_table(html)
+    if fields is None:
+        return None
+    if scraped_at is None:
+        return FinvizSnapshot(ticker.strip().upper(), fields)
+    return FinvizSnapshot(ticker.strip().upper(), fields, scraped_at)
+
+
+def _parse_with_beautifulsoup(html: Union[str, bytes]) -> Optional[Dict[str, str]]:
+    """The previous tree-based parser, kept as the benchmark baseline."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    snapshot_table = soup.find('table', class_='snapshot-table2')
+    if not snapshot_table:
+        return None
+    data = {}
+    for row in snapshot_table.find_all('tr'):
+        cells = row.find_all('td')
+        for i in range(0, len(cells) - 1, 2):
+            label = cells[i].get_text(strip=True)
+            value = cells[i + 1].get_text(strip=True)
+            if label and value:
+                data[label] = value
+    return data
+
+
+def benchmark(html: Union[str, bytes], rounds: int = 200, baseline_rounds: int = 10) -> Dict[str, float]:
+    """
+    Time parse_snapshot_table against the BeautifulSoup parser on one page.
+
+    Returns:
+        dict: Milliseconds per parse for each parser, and the speedup
+    """
+    started = time.perf_counter()
+    for _ in range(rounds):
+        parse_snapshot_table(html)
+    fast_ms = (time.perf_counter() - started) * 1000 / rounds
+
+    started = time.perf_counter()
+    for _ in range(baseline_rounds):
+        _parse_with_beautifulsoup(html)
+    soup_ms = (time.perf_counter() - started) * 1000 / baseline_rounds
+
+    return {'snapshot_parser_ms': fast_ms, 'beautifulsoup_ms': soup_ms,
+            'speedup': soup_ms / fast_ms if fast_ms else float('inf')}
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--benchmark':
+        path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_BENCHMARK_FIXTURE
+        with open(path, 'rb') as f:
+            page = f.read()
+        fields = parse_snapshot_table(page)
+        if fields != _parse_with_beautifulsoup(page):
+            print("Warning: parsers disagree on this page")
+        result = benchmark(page)
+        print(f"{len(page)} bytes, {len(fields or {})} fields")
+        print(f"  snapshot parser: {result['snapshot_parser_ms']:.3f} ms/page")
+        print(f"  BeautifulSoup:   {result['beautifulsoup_ms']:.3f} ms/page")
+        print(f"  speedup:         {result['speedup']:.1f}x")
+    else:
+        print("Usage: python snapshot_parser.py --benchmark [html_file]")
@@ -12,7 +12,8 @@ import api, {
   getList,
   getMetrics,
   getFinancials,
-  calculateMissingAdjustedPE
+  calculateMissingAdjustedPE,
+  scheduleMissingWatchlistData
 } from './index';
 
 vi.mock('axios', async () => {
@@ -140,4 +141,12 @@ describe('API Functions', () => {
     expect(api.post).toHaveBeenCalledWith('/calculate_missing_adjusted_pe');
     expect(result).toEqual(mockData);
   });
+
+  it('scheduleMissingWatchlistData should call correct endpoint', async () => {
+    const mockData = { success: true };
+    (api.post as any).mockResolvedValue({ data: mockData });
+    const result = await scheduleMissingWatchlistData();
+    expect(api.post).toHaveBeenCalledWith('/watchlist/schedule_missing');
+    expect(result).toEqual(mockData);
+  });
 });
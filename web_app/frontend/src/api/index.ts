@@ -71,4 +71,9 @@ export const calculateMissingAdjustedPE = async () => {
   return response.data;
 };
 
+export const scheduleMissingWatchlistData = async () => {
+  const response = await api.post('/watchlist/schedule_missing');
+  return response.data;
+};
+
 export default api;
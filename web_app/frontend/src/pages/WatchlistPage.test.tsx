@@ -13,6 +13,7 @@ vi.mock('../api', () => ({
   addToWatchlist: vi.fn(),
   removeFromWatchlist: vi.fn(),
   calculateMissingAdjustedPE: vi.fn(),
+  scheduleMissingWatchlistData: vi.fn(),
 }));
 
 // Mock useNavigate
@@ -267,4 +268,33 @@ describe('WatchlistPage', () => {
       expect(loadingStates.length).toBeGreaterThan(0);
     });
   });
+
+  it('schedules rows with missing data and refetches once jobs are queued', async () => {
+    const missingRow = {
+      ticker: 'AAPL',
+      company_name: 'Apple',
+      financial_loading: false,
+      adjusted_pe_loading: false,
+      growth_loading: false,
+      short_interest_loading: false,
+      data_missing: true
+    };
+    (api.getWatchlist as any)
+      .mockResolvedValueOnce({ success: true, watchlist: [missingRow] })
+      .mockResolvedValue({
+        success: true,
+        watchlist: [{ ...missingRow, adjusted_pe_loading: true, data_missing: false }]
+      });
+    (api.scheduleMissingWatchlistData as any).mockResolvedValueOnce({
+      success: true,
+      scheduled: { pe: ['AAPL'], growth: [], short_interest: [] }
+    });
+
+    renderWatchlistPage();
+
+    await waitFor(() => {
+      expect(api.scheduleMissingWatchlistData).toHaveBeenCalledTimes(1);
+      expect(api.getWatchlist).toHaveBeenCalledTimes(2);
+    });
+  });
 });
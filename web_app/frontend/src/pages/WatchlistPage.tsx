@@ -24,6 +24,7 @@ interface WatchlistItem {
   growth_loading: boolean;
   short_interest_loading: boolean;
   financial_loading: boolean;
+  data_missing: boolean;
   two_year_annualized_growth: number | null;
   two_year_forward_pe: number | null;
 }
@@ -70,10 +71,17 @@ const WatchlistPage: React.FC = () => {
 
   useEffect(() => {
     fetchWatchlist();
-    // Trigger calculation of missing adjusted PE data
-    calculateMissingAdjustedPE();
   }, []);
 
+  // Fetching the watchlist never starts work, so queue missing data explicitly.
+  // Rows stay missing without a job when one was lost (e.g. a server restart),
+  // so this runs again whenever a fetch finds such rows.
+  useEffect(() => {
+    if (watchlist.some(item => item.data_missing)) {
+      scheduleMissingData();
+    }
+  }, [watchlist]);
+
   // Polling logic for loading states
   useEffect(() => {
     const isAnyItemLoading = watchlist.some(
@@ -89,12 +97,17 @@ const WatchlistPage: React.FC = () => {
     }
   }, [watchlist]);
 
-  const calculateMissingAdjustedPE = async () => {
+  const scheduleMissingData = async () => {
     try {
-      await api.calculateMissingAdjustedPE();
-      console.log('Triggered calculation of missing adjusted PE data');
+      const data = await api.scheduleMissingWatchlistData();
+      const scheduled: string[][] = Object.values(data?.scheduled || {});
+      if (scheduled.some(tickers => tickers.length > 0)) {
+        console.log('Scheduled fetches of missing watchlist data');
+        // Refetch so the queued jobs show as loading and polling starts
+        fetchWatchlist(true);
+      }
     } catch (error) {
-      console.error('Failed to trigger adjusted PE calculations:', error);
+      console.error('Failed to schedule missing watchlist data:', error);
     }
   };
 